@@ -16,7 +16,10 @@ def parse_arguments():
     parser = argparse.ArgumentParser(description='CIVD SKK Migas Scraper')
     parser.add_argument('--run-once', action='store_true', help='Run the scraper once and exit')
     parser.add_argument('--analyze-js', action='store_true', help='Analyze JavaScript to find API endpoints')
-    parser.add_argument('--download-attachments', action='store_true', help='Download tender attachments')
+    parser.add_argument('--download-attachments', action='store_true', help='Download tender attachments (always on; kept for backward compatibility)')
+    parser.add_argument('--drain-attachments', action='store_true', help='Only download pending and due attachment jobs, then exit')
+    parser.add_argument('--incremental', action='store_true', help='Stop paginating once a page only contains tenders seen by earlier runs')
+    parser.add_argument('--export', action='store_true', help='Also write CSV and JSON snapshots of the run next to the tender database')
     parser.add_argument('--output-dir', type=str, default='data', help='Output directory for scraped data')
     return parser.parse_args()
 
@@ -48,6 +51,13 @@ def main():
         print("JavaScript analysis completed")
         return
         
+    # Download attachment jobs left by earlier runs without scraping
+    if args.drain_attachments:
+        print("Downloading pending attachment jobs...")
+        scraper.drain_attachment_jobs()
+        print("Attachment jobs processed")
+        return
+        
     # Run scraper once if requested
     if args.run_once:
         print("Running scraper once...")
@@ -58,26 +68,10 @@ def main():
             logger.error("Failed to initialize session")
             return
             
-        # Run scraper with download_attachments=True by default
-        results = scraper.run_scraper(download_attachments=True)
+        # Run scraper with download_attachments=True by default; attachments are downloaded while scraping
+        scraper.run_scraper(download_attachments=True, incremental=args.incremental or None, collect_results=False,
+                            export=['csv', 'json'] if args.export else None)
         
-        # Download attachments if requested (this is now redundant but kept for backward compatibility)
-        if args.download_attachments and results:
-            print("Downloading attachments...")
-            logger.info("Downloading attachments")
-            
-            # Download attachments for Undangan Prakualifikasi
-            if 'prakualifikasi' in results and results['prakualifikasi']:
-                for item in results['prakualifikasi']:
-                    if 'attachment_url' in item and item['attachment_url']:
-                        scraper.download_attachment(item['attachment_url'], output_dir, 'prakualifikasi')
-                        
-            # Download attachments for Pelelangan Umum
-            if 'pelelangan' in results and results['pelelangan']:
-                for item in results['pelelangan']:
-                    if 'attachment_url' in item and item['attachment_url']:
-                        scraper.download_attachment(item['attachment_url'], output_dir, 'pelelangan')
-                        
         print("Scraper run completed")
         return
         
@@ -93,26 +87,10 @@ def main():
                 time.sleep(60)  # Wait a minute before retrying
                 continue
                 
-            # Run scraper with download_attachments=True by default
-            results = scraper.run_scraper(download_attachments=True)
+            # Run scraper with download_attachments=True by default; attachments are downloaded while scraping
+            scraper.run_scraper(download_attachments=True, incremental=args.incremental or None, collect_results=False,
+                            export=['csv', 'json'] if args.export else None)
             
-            # Download attachments if requested (this is now redundant but kept for backward compatibility)
-            if args.download_attachments and results:
-                print("Downloading attachments...")
-                logger.info("Downloading attachments")
-                
-                # Download attachments for Undangan Prakualifikasi
-                if 'prakualifikasi' in results and results['prakualifikasi']:
-                    for item in results['prakualifikasi']:
-                        if 'attachment_url' in item and item['attachment_url']:
-                            scraper.download_attachment(item['attachment_url'], output_dir, 'prakualifikasi')
-                            
-                # Download attachments for Pelelangan Umum
-                if 'pelelangan' in results and results['pelelangan']:
-                    for item in results['pelelangan']:
-                        if 'attachment_url' in item and item['attachment_url']:
-                            scraper.download_attachment(item['attachment_url'], output_dir, 'pelelangan')
-                            
             # Sleep for 3 hours
             print(f"Sleeping for 3 hours until {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             time.sleep(3 * 60 * 60)
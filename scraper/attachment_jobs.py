@@ -0,0 +1,151 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Status job attachment
+PENDING = 'pending'
+IN_PROGRESS = 'in_progress'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attachment_jobs (
+    key TEXT PRIMARY KEY,
+    section TEXT NOT NULL,
+    url TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL,
+    last_error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attachment_jobs_state ON attachment_jobs (state, next_attempt_at);
+"""
+
+class AttachmentJobQueue:
+    """SQLite-backed attachment job queue that survives across runs.
+
+    Every attachment key (file_id or URL) has one row with its state:
+    pending, in_progress, done or failed. A done job is never requested
+    again while its file still exists. A failed job waits retry_base_delay
+    seconds, doubling per attempt up to retry_max_delay, and is given up
+    after max_attempts. in_progress rows older than stale_after seconds are
+    left over from a crashed run and become claimable again. clock returns
+    the current time in seconds and can be replaced in tests.
+    """
+
+    def __init__(self, path, max_attempts=8, retry_base_delay=900, retry_max_delay=86400, stale_after=3600, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.stale_after = stale_after
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Satu koneksi dipakai bersama oleh worker download, dijaga dengan lock
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls, config, path):
+        """Build the queue from the [downloads] section of config.ini"""
+        return cls(
+            path,
+            max_attempts=config.getint('downloads', 'max_attempts', fallback=8),
+            retry_base_delay=config.getfloat('downloads', 'retry_base_delay', fallback=900),
+            retry_max_delay=config.getfloat('downloads', 'retry_max_delay', fallback=86400),
+            stale_after=config.getfloat('downloads', 'stale_after', fallback=3600),
+        )
+
+    def _is_claimable(self, row, now):
+        if row['state'] == PENDING:
+            return True
+        if row['state'] == IN_PROGRESS:
+            return now - row['updated_at'] > self.stale_after
+        if row['state'] == FAILED:
+            return row['attempts'] < self.max_attempts and (row['next_attempt_at'] or 0) <= now
+        # Job selesai diunduh ulang hanya jika filenya hilang
+        return not (row['result'] and os.path.exists(row['result']))
+
+    def claim(self, section, url, key=None):
+        """Register a job and mark it in_progress if it is due; return False if it should not run now"""
+        key = key or url
+        now = self.clock()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT * FROM attachment_jobs WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO attachment_jobs (key, section, url, state, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, section, url, IN_PROGRESS, now, now)
+                )
+                return True
+            if not self._is_claimable(row, now):
+                return False
+            self._conn.execute(
+                "UPDATE attachment_jobs SET section = ?, url = ?, state = ?, updated_at = ? WHERE key = ?",
+                (section, url, IN_PROGRESS, now, key)
+            )
+            return True
+
+    def due(self, limit=None):
+        """Return (section, url, key) of jobs left pending by earlier runs or whose retry time has come"""
+        now = self.clock()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM attachment_jobs WHERE state != ? ORDER BY next_attempt_at, created_at", (DONE,)
+            ).fetchall()
+        jobs = [(row['section'], row['url'], row['key']) for row in rows if self._is_claimable(row, now)]
+        return jobs[:limit] if limit else jobs
+
+    def complete(self, key, result=None):
+        """Mark a job done and remember where its file was stored"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE attachment_jobs SET state = ?, attempts = attempts + 1, result = ?, last_error = NULL, "
+                "next_attempt_at = NULL, updated_at = ? WHERE key = ?",
+                (DONE, result if isinstance(result, str) else None, self.clock(), key)
+            )
+
+    def fail(self, key, error=None):
+        """Mark a job failed and schedule its next attempt with exponential backoff"""
+        now = self.clock()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT attempts FROM attachment_jobs WHERE key = ?", (key,)).fetchone()
+            attempts = (row['attempts'] if row else 0) + 1
+            delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempts - 1))
+            self._conn.execute(
+                "UPDATE attachment_jobs SET state = ?, attempts = ?, last_error = ?, next_attempt_at = ?, updated_at = ? WHERE key = ?",
+                (FAILED, attempts, error, now + delay, now, key)
+            )
+        if attempts >= self.max_attempts:
+            logger.warning(f"Giving up on attachment {key} after {attempts} attempts")
+        else:
+            logger.info(f"Attachment {key} failed (attempt {attempts}), retrying in {delay / 60:.0f} min")
+
+    def release(self, key):
+        """Put a claimed job back to pending without counting an attempt"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE attachment_jobs SET state = ?, updated_at = ? WHERE key = ? AND state = ?",
+                (PENDING, self.clock(), key, IN_PROGRESS)
+            )
+
+    def counts(self):
+        """Return the number of jobs per state"""
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) AS n FROM attachment_jobs GROUP BY state").fetchall()
+        return {row['state']: row['n'] for row in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,306 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 65536
+
+# Magic bytes format attachment yang dikenal; docx, xlsx dan pptx adalah arsip zip
+FILE_SIGNATURES = (
+    (b'%PDF-', 'pdf'),
+    (b'PK\x03\x04', 'zip'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'ole'),  # doc/xls lama
+    (b'Rar!\x1a\x07', 'rar'),
+)
+HTML_MARKERS = (b'<!doctype html', b'<html', b'<head', b'<body', b'<script')
+
+def sniff_content(chunk):
+    """Classify the first bytes of a download.
+
+    Returns the name of a known file type, 'html' for what looks like an
+    error page, or None if the bytes are not recognized.
+    """
+    for signature, kind in FILE_SIGNATURES:
+        if chunk.startswith(signature):
+            return kind
+    # PDF boleh diawali sampah hingga 1024 byte sebelum header %PDF-
+    if b'%PDF-' in chunk[:1024]:
+        return 'pdf'
+    if chunk.lstrip()[:512].lower().startswith(HTML_MARKERS):
+        return 'html'
+    return None
+
+class PartialDownload:
+    """An interrupted or in-progress download kept as <key hash>.part with a small metadata file.
+
+    The metadata records the source URL, the validator (ETag or
+    Last-Modified) and the expected total size, so the transfer can resume
+    with a Range request against the same URL and version.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.meta_path = f"{path}.json"
+        self.meta = {}
+        if os.path.exists(self.meta_path) and os.path.exists(self.path):
+            try:
+                with open(self.meta_path, 'r', encoding='utf-8') as f:
+                    self.meta = json.load(f)
+            except Exception:
+                self.meta = {}
+
+    @property
+    def size(self):
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def can_resume(self, url):
+        """A partial file can resume only against the URL it was started from, if that server accepts ranges"""
+        return self.size > 0 and self.meta.get('resumable') and self.meta.get('url') == url
+
+    def start(self, url, validator=None, total=None, resumable=False, expected=None):
+        """Begin a new transfer, dropping any bytes from an earlier one"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        open(self.path, 'wb').close()
+        self.meta = {'url': url, 'validator': validator, 'total': total, 'resumable': resumable, 'expected': expected or {}}
+        self._save_meta()
+
+    def _save_meta(self):
+        with open(self.meta_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+
+    def append(self, chunks):
+        """Append byte chunks to the partial file, flushing as it goes"""
+        with open(self.path, 'ab') as f:
+            for chunk in chunks:
+                if chunk:
+                    f.write(chunk)
+
+    def is_complete(self):
+        total = self.meta.get('total')
+        return bool(total) and self.size == total
+
+    def discard(self):
+        for path in (self.path, self.meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+class AttachmentStore:
+    """Content-addressed attachment storage with a manifest.
+
+    File contents live once under blobs/<aa>/<sha256>, no matter how many
+    tenders or sections list them. manifest.json maps category/key (the
+    file_id, or the URL or name when there is none) to the blob, the
+    original file name and the source URL. Blobs are written to a temp file
+    while hashing and renamed into place, so a crash never leaves a partial
+    blob behind. HTTP downloads go through partial/<key hash>.part first so
+    an interrupted transfer can be resumed instead of starting over.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.blob_dir = os.path.join(root, 'blobs')
+        self.manifest_path = os.path.join(root, 'manifest.json')
+        self.partial_dir = os.path.join(root, 'partial')
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def _read(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('entries', {})
+        except Exception as e:
+            logger.error(f"Error loading attachment manifest {self.manifest_path}: {str(e)}")
+            return {}
+
+    def load(self):
+        """Load the manifest written by earlier runs or by another process"""
+        entries = self._read()
+        with self._lock:
+            self._entries.update(entries)
+        if entries:
+            logger.debug(f"Loaded attachment manifest with {len(entries)} entries from {self.manifest_path}")
+
+    def _save(self):
+        # Dipanggil dengan self._lock terkunci
+        data = {'updated_at': time.time(), 'entries': self._entries}
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            tmp_path = f"{self.manifest_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.manifest_path)
+        except Exception as e:
+            logger.error(f"Error saving attachment manifest to {self.manifest_path}: {str(e)}")
+
+    @staticmethod
+    def entry_key(category, name, file_id=None, url=None):
+        """Manifest key of one attachment of one category"""
+        return f"{category}/{file_id or url or name}"
+
+    def blob_path(self, sha256):
+        return os.path.join(self.blob_dir, sha256[:2], sha256)
+
+    def path(self, entry):
+        """Return the blob path of a manifest entry if the blob still exists"""
+        if not entry:
+            return None
+        blob = self.blob_path(entry['sha256'])
+        return blob if os.path.exists(blob) else None
+
+    def get(self, category, name, file_id=None, url=None):
+        """Return the manifest entry of an attachment whose blob exists, or None"""
+        with self._lock:
+            entry = self._entries.get(self.entry_key(category, name, file_id, url))
+        return entry if self.path(entry) else None
+
+    def find(self, name=None, file_id=None, category=None):
+        """Find an entry by file_id or file name, optionally within one category"""
+        with self._lock:
+            entries = list(self._entries.values())
+
+        normalized = name.replace(' ', '_') if name else None
+        for entry in entries:
+            if category and entry['category'] != category:
+                continue
+            if file_id and entry.get('file_id') == file_id and self.path(entry):
+                return entry
+            if normalized and normalized in entry['name'].replace(' ', '_') and self.path(entry):
+                return entry
+        return None
+
+    def link(self, entry, category, name, file_id=None, url=None):
+        """Register an already stored blob under another category or key without copying it"""
+        return self._add(entry['sha256'], entry['size'], category, name, file_id, url)
+
+    def _add(self, sha256, size, category, name, file_id, url):
+        entry = {
+            'sha256': sha256,
+            'size': size,
+            'category': category,
+            'name': name,
+            'file_id': file_id,
+            'url': url,
+            'stored_at': time.time(),
+        }
+        with self._lock:
+            # Gabungkan dengan manifest di disk agar entri dari proses lain (web app, scraper terjadwal) tidak tertimpa
+            self._entries.update(self._read())
+            self._entries[self.entry_key(category, name, file_id, url)] = entry
+            self._save()
+        return entry
+
+    def put_stream(self, chunks, category, name, file_id=None, url=None):
+        """Hash and store an iterable of byte chunks, return the manifest entry"""
+        os.makedirs(self.blob_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.blob_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    if chunk:
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+            return self._commit(tmp_path, digest.hexdigest(), size, category, name, file_id, url)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def put_file(self, path, category, name, file_id=None, url=None, move=False):
+        """Store a file from disk, streaming it in chunks; move=True consumes the source file"""
+        if not move:
+            with open(path, 'rb') as f:
+                return self.put_stream(iter(lambda: f.read(CHUNK_SIZE), b''), category, name, file_id, url)
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+        entry = self._commit(path, digest.hexdigest(), os.path.getsize(path), category, name, file_id, url)
+        if os.path.exists(path):
+            os.remove(path)
+        return entry
+
+    def _commit(self, tmp_path, sha256, size, category, name, file_id, url):
+        blob = self.blob_path(sha256)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        if os.path.exists(blob):
+            # Isi yang sama sudah tersimpan; cukup tambahkan entri manifest
+            logger.info(f"Attachment {name} is identical to stored blob {sha256[:12]}, not storing it twice")
+        else:
+            try:
+                os.replace(tmp_path, blob)
+            except OSError:
+                # Sumber ada di filesystem lain (misalnya direktori download Chrome di /tmp): salin lewat file sementara
+                fd, staging = tempfile.mkstemp(dir=self.blob_dir, suffix='.tmp')
+                os.close(fd)
+                shutil.copyfile(tmp_path, staging)
+                os.replace(staging, blob)
+        return self._add(sha256, size, category, name, file_id, url)
+
+    def partial(self, key):
+        """Return the resumable partial download for a manifest key"""
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return PartialDownload(os.path.join(self.partial_dir, f"{name}.part"))
+
+    def commit_partial(self, partial, category, name, file_id=None, url=None):
+        """Verify a finished partial download and move it into the blob store.
+
+        The size must match the total the server announced, and the sha256 or
+        md5 digest too if the server sent one. Returns the manifest entry, or
+        None if a check fails; on a checksum mismatch the partial file is
+        discarded so the next attempt starts over.
+        """
+        expected = partial.meta.get('expected')
+        total = partial.meta.get('total')
+        if total and partial.size != total:
+            logger.warning(f"Partial download of {name} has {partial.size} of {total} bytes, not storing it")
+            return None
+
+        sha256 = hashlib.sha256()
+        md5 = hashlib.md5()
+        with open(partial.path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                sha256.update(chunk)
+                md5.update(chunk)
+
+        for algorithm, digest in (('sha256', sha256), ('md5', md5)):
+            if expected and expected.get(algorithm) and expected[algorithm] != digest.hexdigest():
+                logger.warning(f"{algorithm} checksum mismatch for {name}, discarding the download")
+                partial.discard()
+                return None
+
+        entry = self._commit(partial.path, sha256.hexdigest(), partial.size, category, name, file_id, url)
+        partial.discard()
+        return entry
+
+def expected_digests(headers):
+    """Read the checksums a server announces for the full file (Digest sha-256, Content-MD5)"""
+    expected = {}
+    for part in headers.get('Digest', '').split(','):
+        algorithm, _, value = part.strip().partition('=')
+        if algorithm.lower() == 'sha-256' and value:
+            try:
+                expected['sha256'] = base64.b64decode(value).hex()
+            except Exception:
+                pass
+
+    content_md5 = headers.get('Content-MD5')
+    if content_md5:
+        try:
+            expected['md5'] = base64.b64decode(content_md5).hex()
+        except Exception:
+            pass
+    return expected
@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+import urllib.parse
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+def host_key(url):
+    """Breaker name of the host serving url"""
+    return f"host:{urllib.parse.urlparse(url).netloc.lower()}"
+
+def template_key(template):
+    """Breaker name of an attachment URL template"""
+    return f"template:{template}"
+
+class CircuitBreakers:
+    """Named circuit breakers for download endpoints (URL templates, hosts, Selenium).
+
+    A breaker opens after failure_threshold consecutive failures and then
+    rejects calls for reset_timeout seconds. After that it is half-open and
+    lets one trial call through: a success closes it, a failure opens it
+    again. A trial that never reports back is given up after reset_timeout.
+    clock returns the current time in seconds and can be replaced in tests.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=300, clock=time.time):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        """Build the breakers from the [downloads] section of config.ini"""
+        return cls(
+            failure_threshold=config.getint('downloads', 'breaker_threshold', fallback=5),
+            reset_timeout=config.getfloat('downloads', 'breaker_reset_timeout', fallback=300),
+        )
+
+    def _breaker(self, name):
+        # Dipanggil dengan self._lock terkunci
+        return self._breakers.setdefault(name, {'state': CLOSED, 'failures': 0, 'opened_at': 0, 'trial_at': None})
+
+    def _available(self, breaker, now):
+        if breaker['state'] == CLOSED:
+            return True
+        if breaker['state'] == OPEN:
+            return now - breaker['opened_at'] >= self.reset_timeout
+        # Half-open: hanya satu percobaan sekaligus
+        return breaker['trial_at'] is None or now - breaker['trial_at'] >= self.reset_timeout
+
+    def state(self, name):
+        with self._lock:
+            return self._breaker(name)['state']
+
+    def available(self, *names):
+        """Check without side effects whether calls through all named breakers would be allowed"""
+        now = self.clock()
+        with self._lock:
+            return all(self._available(self._breaker(name), now) for name in names)
+
+    def allow(self, *names):
+        """Return True and start a half-open trial where needed if all named breakers let a call through"""
+        now = self.clock()
+        with self._lock:
+            breakers = [(name, self._breaker(name)) for name in names]
+            if not all(self._available(breaker, now) for _, breaker in breakers):
+                return False
+            for name, breaker in breakers:
+                if breaker['state'] == OPEN:
+                    breaker['state'] = HALF_OPEN
+                    logger.info(f"Circuit breaker {name} is half-open, trying one call")
+                if breaker['state'] == HALF_OPEN:
+                    breaker['trial_at'] = now
+            return True
+
+    def success(self, name):
+        with self._lock:
+            breaker = self._breaker(name)
+            if breaker['state'] != CLOSED:
+                logger.info(f"Circuit breaker {name} closed again")
+            breaker.update(state=CLOSED, failures=0, trial_at=None)
+
+    def failure(self, name):
+        with self._lock:
+            breaker = self._breaker(name)
+            breaker['failures'] += 1
+            if breaker['state'] == HALF_OPEN or (breaker['state'] == CLOSED and breaker['failures'] >= self.failure_threshold):
+                logger.warning(f"Circuit breaker {name} opened after {breaker['failures']} consecutive failures, "
+                               f"pausing it for {self.reset_timeout:.0f}s")
+                breaker.update(state=OPEN, opened_at=self.clock(), trial_at=None)
+
+class DownloadBudget:
+    """Per-run time and failure budget for attachment downloads; 0 disables a limit"""
+
+    def __init__(self, max_seconds=1800, max_failures=50, clock=time.time):
+        self.max_seconds = max_seconds
+        self.max_failures = max_failures
+        self.clock = clock
+        self.failures = 0
+        self._started_at = None
+        self._reported = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        """Build the budget from the [downloads] section of config.ini"""
+        return cls(
+            max_seconds=config.getfloat('downloads', 'run_time_budget', fallback=1800),
+            max_failures=config.getint('downloads', 'run_failure_budget', fallback=50),
+        )
+
+    def start(self):
+        with self._lock:
+            if self._started_at is None:
+                self._started_at = self.clock()
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+
+    def exhausted(self):
+        """Return True once the run has spent its time or failure budget"""
+        with self._lock:
+            elapsed = self.clock() - self._started_at if self._started_at else 0
+            reason = None
+            if self.max_seconds and elapsed > self.max_seconds:
+                reason = f"{elapsed:.0f}s spent"
+            elif self.max_failures and self.failures >= self.max_failures:
+                reason = f"{self.failures} failed downloads"
+            if reason and not self._reported:
+                self._reported = True
+                logger.warning(f"Attachment download budget exhausted ({reason}), deferring remaining downloads to the next run")
+            return reason is not None
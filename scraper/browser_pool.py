@@ -0,0 +1,260 @@
+import atexit
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+try:
+    import psutil
+except ImportError:  # psutil opsional, ukuran memori dibaca dari /proc jika tidak ada
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+class PooledBrowser:
+    """A headless Chrome driver with its own download directory and usage counters"""
+
+    def __init__(self, driver, download_dir):
+        self.driver = driver
+        self.download_dir = download_dir
+        self.uses = 0
+        self.started_at = time.time()
+        self.last_used = self.started_at
+
+    def pid(self):
+        """Return the chromedriver process id, if known"""
+        try:
+            return self.driver.service.process.pid
+        except Exception:
+            return None
+
+def _process_tree_rss_mb(pid):
+    """Resident memory of a process and all of its children in MB, or None if unavailable"""
+    if not pid:
+        return None
+
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            processes = [process] + process.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+        except Exception:
+            return None
+
+    # Tanpa psutil: bangun pohon proses dari /proc (Linux)
+    if not os.path.isdir('/proc'):
+        return None
+    try:
+        children = {}
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat', 'r') as f:
+                    # Field ke-4 adalah ppid; nama proses di dalam kurung bisa berisi spasi
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+                children.setdefault(ppid, []).append(int(entry))
+            except (OSError, ValueError, IndexError):
+                continue
+
+        total_kb = 0
+        stack = [pid]
+        while stack:
+            current = stack.pop()
+            stack.extend(children.get(current, []))
+            try:
+                with open(f'/proc/{current}/status', 'r') as f:
+                    for line in f:
+                        if line.startswith('VmRSS:'):
+                            total_kb += int(line.split()[1])
+                            break
+            except (OSError, ValueError):
+                continue
+        return total_kb / 1024
+    except Exception:
+        return None
+
+class BrowserPool:
+    """Warm, reusable headless Chrome instances leased by every Selenium code path.
+
+    Browsers start lazily on first lease, are health-checked before reuse and
+    are recycled after max_uses leases or when their process tree grows past
+    max_memory_mb. The chromedriver path is resolved once and reused.
+    """
+
+    # Path chromedriver di-cache untuk semua pool dalam proses ini
+    _driver_path_cache = None
+    _driver_path_lock = threading.Lock()
+
+    def __init__(self, user_agent, size=1, max_uses=20, max_memory_mb=1024, idle_timeout=600,
+                 lease_timeout=300, driver_path=None, headless=True):
+        self.user_agent = user_agent
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.max_memory_mb = max_memory_mb
+        self.idle_timeout = idle_timeout
+        self.lease_timeout = lease_timeout
+        self.driver_path = driver_path or None
+        self.headless = headless
+
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+        atexit.register(self.close)
+
+    @classmethod
+    def from_config(cls, config, user_agent):
+        """Build a pool from the [browser] section of config.ini"""
+        return cls(
+            user_agent,
+            size=config.getint('browser', 'pool_size', fallback=1),
+            max_uses=config.getint('browser', 'max_uses', fallback=20),
+            max_memory_mb=config.getint('browser', 'max_memory_mb', fallback=1024),
+            idle_timeout=config.getint('browser', 'idle_timeout', fallback=600),
+            lease_timeout=config.getint('browser', 'lease_timeout', fallback=300),
+            driver_path=config.get('browser', 'driver_path', fallback='').strip(),
+            headless=config.getboolean('browser', 'headless', fallback=True),
+        )
+
+    def _resolve_driver_path(self):
+        """Return the chromedriver path, downloading it only once per process"""
+        if self.driver_path:
+            return self.driver_path
+
+        with BrowserPool._driver_path_lock:
+            if BrowserPool._driver_path_cache is None:
+                BrowserPool._driver_path_cache = ChromeDriverManager().install()
+                logger.info(f"Resolved chromedriver at {BrowserPool._driver_path_cache}")
+            return BrowserPool._driver_path_cache
+
+    def _start(self):
+        """Start a new headless Chrome with its own download directory"""
+        download_dir = tempfile.mkdtemp(prefix='civd_chrome_')
+
+        chrome_options = Options()
+        if self.headless:
+            chrome_options.add_argument("--headless")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument(f"user-agent={self.user_agent}")
+        chrome_options.add_experimental_option("prefs", {
+            "download.default_directory": download_dir,
+            "download.prompt_for_download": False,
+            "download.directory_upgrade": True,
+            "plugins.always_open_pdf_externally": True
+        })
+
+        started = time.time()
+        driver = webdriver.Chrome(service=Service(self._resolve_driver_path()), options=chrome_options)
+
+        # Chrome headless hanya mengizinkan download jika diaktifkan lewat DevTools
+        try:
+            driver.execute_cdp_cmd('Page.setDownloadBehavior', {'behavior': 'allow', 'downloadPath': download_dir})
+        except Exception as e:
+            logger.warning(f"Could not enable headless downloads: {str(e)}")
+
+        logger.info(f"Started headless Chrome in {time.time() - started:.1f}s")
+        return PooledBrowser(driver, download_dir)
+
+    def _is_healthy(self, browser):
+        """Check that the browser still answers WebDriver commands"""
+        try:
+            browser.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _should_recycle(self, browser):
+        if browser.uses >= self.max_uses:
+            logger.info(f"Recycling Chrome after {browser.uses} uses")
+            return True
+
+        memory_mb = _process_tree_rss_mb(browser.pid()) if self.max_memory_mb else None
+        if memory_mb is not None and memory_mb > self.max_memory_mb:
+            logger.info(f"Recycling Chrome using {memory_mb:.0f} MB (limit {self.max_memory_mb} MB)")
+            return True
+
+        return False
+
+    def _quit(self, browser):
+        try:
+            browser.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error closing Chrome: {str(e)}")
+        shutil.rmtree(browser.download_dir, ignore_errors=True)
+
+    def _reset(self, browser):
+        """Clear per-lease state so the next caller starts from a blank page"""
+        for name in os.listdir(browser.download_dir):
+            path = os.path.join(browser.download_dir, name)
+            try:
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+            except OSError:
+                pass
+        browser.driver.get('about:blank')
+
+    def _take_idle(self):
+        """Pop a healthy idle browser, quitting stale or broken ones"""
+        now = time.time()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                browser = self._idle.pop()
+
+            if self.idle_timeout and now - browser.last_used > self.idle_timeout:
+                logger.info("Closing Chrome that was idle for too long")
+                self._quit(browser)
+            elif not self._is_healthy(browser):
+                logger.warning("Pooled Chrome is not responding, starting a new one")
+                self._quit(browser)
+            else:
+                return browser
+
+    @contextmanager
+    def lease(self):
+        """Lease a browser for the duration of a with-block"""
+        if not self._slots.acquire(timeout=self.lease_timeout):
+            raise TimeoutError(f"No browser available within {self.lease_timeout}s")
+
+        browser = None
+        try:
+            browser = self._take_idle() or self._start()
+            yield browser
+        finally:
+            try:
+                if browser is not None:
+                    browser.uses += 1
+                    browser.last_used = time.time()
+                    if not self._is_healthy(browser) or self._should_recycle(browser):
+                        self._quit(browser)
+                    else:
+                        try:
+                            self._reset(browser)
+                            with self._lock:
+                                self._idle.append(browser)
+                        except Exception:
+                            self._quit(browser)
+            finally:
+                self._slots.release()
+
+    def close(self):
+        """Quit all idle browsers"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for browser in idle:
+            self._quit(browser)
+        if idle:
+            logger.info(f"Closed {len(idle)} pooled Chrome instances")
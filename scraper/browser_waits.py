@@ -0,0 +1,154 @@
+import logging
+import os
+import time
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+logger = logging.getLogger(__name__)
+
+# Akhiran file yang masih ditulis oleh Chrome
+PARTIAL_SUFFIXES = ('.crdownload', '.tmp', '.part')
+
+def _is_partial(name):
+    # Chrome juga membuat file tersembunyi sementara (.com.google.Chrome.xxxx) sebelum .crdownload
+    return name.startswith('.') or name.endswith(PARTIAL_SUFFIXES)
+
+class BrowserWaits:
+    """Condition-based waits for the Selenium paths, so latency follows the site instead of fixed sleeps"""
+
+    def __init__(self, page_timeout=15, download_start_timeout=10, download_timeout=120,
+                 download_stable_seconds=1.0, poll_interval=0.25):
+        self.page_timeout = page_timeout
+        self.download_start_timeout = download_start_timeout
+        self.download_timeout = download_timeout
+        self.download_stable_seconds = download_stable_seconds
+        self.poll_interval = poll_interval
+
+    @classmethod
+    def from_config(cls, config):
+        """Build the wait settings from the [browser] section of config.ini"""
+        return cls(
+            page_timeout=config.getfloat('browser', 'page_timeout', fallback=15),
+            download_start_timeout=config.getfloat('browser', 'download_start_timeout', fallback=10),
+            download_timeout=config.getfloat('browser', 'download_timeout', fallback=120),
+            download_stable_seconds=config.getfloat('browser', 'download_stable_seconds', fallback=1.0),
+            poll_interval=config.getfloat('browser', 'poll_interval', fallback=0.25),
+        )
+
+    def _wait(self, driver, timeout=None):
+        return WebDriverWait(driver, timeout or self.page_timeout, poll_frequency=self.poll_interval)
+
+    def page_load(self, driver, timeout=None):
+        """Wait until the current document has finished loading"""
+        try:
+            self._wait(driver, timeout).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+            return True
+        except TimeoutException:
+            logger.warning("Timed out waiting for page load")
+            return False
+
+    def element(self, driver, locator, timeout=None):
+        """Return the first element matching locator once present, or None on timeout"""
+        try:
+            return self._wait(driver, timeout).until(EC.presence_of_element_located(locator))
+        except TimeoutException:
+            return None
+
+    def staleness(self, driver, element, timeout=None):
+        """Wait until element is detached from the DOM, e.g. after a form submit navigates away"""
+        try:
+            self._wait(driver, timeout).until(EC.staleness_of(element))
+            return True
+        except TimeoutException:
+            return False
+
+    def container_html(self, driver, container_id):
+        """Return the inner HTML of a result container, or None if it is not on the page"""
+        try:
+            return driver.find_element(By.ID, container_id).get_attribute('innerHTML')
+        except (NoSuchElementException, StaleElementReferenceException):
+            return None
+
+    def results_change(self, driver, container_id, before, timeout=None):
+        """Wait until a result container differs from before and has settled.
+
+        The container counts as settled when two consecutive polls return the
+        same markup, which skips intermediate loading states.
+        """
+        state = {'last': None}
+
+        def settled(d):
+            current = self.container_html(d, container_id)
+            if current is None or current == before:
+                state['last'] = None
+                return False
+            if current == state['last']:
+                return True
+            state['last'] = current
+            return False
+
+        try:
+            self._wait(driver, timeout).until(settled)
+            return True
+        except TimeoutException:
+            logger.warning(f"Timed out waiting for #{container_id} to change")
+            return False
+
+    def download(self, directory, start_timeout=None, timeout=None):
+        """Wait for Chrome to finish a download into directory and return the finished file paths.
+
+        Returns an empty list if no download starts within start_timeout or
+        the download does not finish within timeout. A download is finished
+        when no partial files remain and file sizes stop changing for
+        download_stable_seconds.
+        """
+        start_timeout = self.download_start_timeout if start_timeout is None else start_timeout
+        timeout = self.download_timeout if timeout is None else timeout
+
+        started_at = time.time()
+        download_seen = False
+        last_sizes = None
+        stable_since = None
+
+        while True:
+            now = time.time()
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                names = []
+
+            if names:
+                download_seen = True
+            elif not download_seen and now - started_at > start_timeout:
+                return []
+
+            finished = [name for name in names if not _is_partial(name)]
+            if finished and len(finished) == len(names):
+                sizes = {}
+                for name in finished:
+                    try:
+                        sizes[name] = os.path.getsize(os.path.join(directory, name))
+                    except OSError:
+                        sizes = None
+                        break
+
+                if sizes is not None and sizes == last_sizes:
+                    if now - stable_since >= self.download_stable_seconds:
+                        logger.info(f"Download finished after {now - started_at:.1f}s")
+                        return [os.path.join(directory, name) for name in sorted(finished)]
+                else:
+                    last_sizes = sizes
+                    stable_since = now
+            else:
+                last_sizes = None
+
+            if now - started_at > timeout:
+                logger.warning(f"Timed out after {timeout:.0f}s waiting for download in {directory}")
+                return []
+
+            time.sleep(self.poll_interval)
@@ -3,27 +3,49 @@ from bs4 import BeautifulSoup
 import logging
 import configparser
 import os
-import random
 import time
+import threading
 from datetime import datetime
-from .utils import random_delay, clean_text, save_to_csv
+from .fetcher import PageFetcher
+from .rate_limiter import RateLimiter
+from .transport import build_session
+from .incremental import TenderWatermark
+from .session_store import SessionStore
+from .debug import DebugRecorder
+from .parsers import get_parser, init_parse_worker, parse_in_worker
+from .schema import CardSchema
+from .pipeline import Pipeline, CsvSink, JsonSink, ResultSink, AttachmentSink, WatermarkSink, TenderStoreSink
+from .browser_pool import BrowserPool
+from .browser_waits import BrowserWaits
+from .downloads import DownloadManager
+from .url_templates import UrlTemplateStats
+from .attachment_store import AttachmentStore, expected_digests, sniff_content
+from .attachment_jobs import AttachmentJobQueue
+from .breakers import CircuitBreakers, DownloadBudget, host_key, template_key
+from .tender_store import TenderStore
 import re
 import json
-import csv
 import urllib.parse
-import tempfile
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+import itertools
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
 import traceback
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 logger = logging.getLogger(__name__)
 
+# Parameter paginasi displaytag pada link halaman hasil tnd.jwebs
+PAGE_PARAM_PATTERN = re.compile(r'd-1789-p=(\d+)')
+
+# Per section: (tnd type, label, prefix file CSV, jumlah item per halaman, method fallback Selenium)
+SECTIONS = {
+    'prakualifikasi': ("1", "Undangan Prakualifikasi", 'prakualifikasi', 6, '_scrape_prakualifikasi_with_selenium'),
+    'pelelangan': ("2", "Pelelangan Umum", 'pelelangan_umum', 10, '_scrape_pelelangan_with_selenium'),
+}
+
 class CIVDScraper:
     def __init__(self, config_path=None):
         # Load configuration
@@ -95,8 +117,18 @@ path = data/
         self.delay_min = float(self.config['scraper']['delay_min'])
         self.delay_max = float(self.config['scraper']['delay_max'])
         
-        # Setup session
-        self.session = requests.Session()
+        # Debug capture untuk respons mentah (off, sampled atau full), disimpan di memori dan ditulis saat gagal
+        self.debug_recorder = DebugRecorder.from_config(self.config)
+        
+        # Setup rate limiter; semua request lewat self.session otomatis melewati limiter ini
+        self.rate_limiter = RateLimiter.from_config(self.config['scraper'])
+        
+        # Setup session dengan connection pool, retry dan timeout dari bagian [transport]
+        self.session = build_session(self.config, self.rate_limiter)
+        self.download_timeout = (
+            self.config.getfloat('transport', 'connect_timeout', fallback=5),
+            self.config.getfloat('transport', 'download_timeout', fallback=60)
+        )
         self.session.headers.update({
             'User-Agent': self.user_agent,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -106,289 +138,247 @@ path = data/
         # Initialize session
         self.session_valid = False
         
+        # Setup fetcher untuk mengambil beberapa halaman secara paralel
+        self.max_concurrency = self.config['scraper'].getint('max_concurrency', fallback=3)
+        self.fetcher = PageFetcher(self.session, self.max_concurrency)
+        
+        # Skema ekstraksi card dikompilasi sekali; backend parser HTML bisa auto, lxml atau html.parser
+        self.card_schema = CardSchema()
+        self.parser = get_parser(self.config['scraper'].get('parser', fallback='auto'), self.base_url, self.card_schema)
+        logger.info(f"Using {self.parser.name} parser backend")
+        
+        # Jumlah proses worker untuk parsing paralel dengan fetch (0 = parse di thread scraper)
+        self.parse_workers = max(0, self.config['scraper'].getint('parse_workers', fallback=0))
+        self._parse_pool = None
+        
+        # Jumlah halaman yang boleh menunggu di antara scraping dan sink (backpressure)
+        self.pipeline_buffer = max(1, self.config['scraper'].getint('pipeline_buffer', fallback=4))
+        
+        # Pool Chrome headless untuk semua fallback Selenium; browser baru dijalankan saat pertama dipinjam
+        self.browser_pool = BrowserPool.from_config(self.config, self.user_agent)
+        self.browser_waits = BrowserWaits.from_config(self.config)
+        
+        # Mode hybrid: Chrome hanya menyiapkan cookie session, lalu scraping dan download lanjut lewat HTTP
+        self.harvest_session = self.config.getboolean('browser', 'harvest_session', fallback=True)
+        self.harvest_interval = self.config.getint('browser', 'harvest_interval', fallback=300)
+        self._harvest_lock = threading.Lock()
+        self._harvested_at = None
+        self._harvest_ok = False
+        
+        # Jalankan section prakualifikasi dan pelelangan secara paralel jika diaktifkan
+        self.parallel_sections = self.config['scraper'].getboolean('parallel_sections', fallback=False)
+        
+        # Mode incremental: berhenti paginasi setelah N halaman berturut-turut hanya berisi tender yang sudah dikenal
+        self.incremental = self.config['scraper'].getboolean('incremental', fallback=False)
+        self.incremental_stop_pages = max(1, self.config['scraper'].getint('incremental_stop_pages', fallback=1))
+        # Jumlah maksimum sidik jari tender per section di known_tenders.json (0 = tanpa batas)
+        self.incremental_max_known = max(0, self.config['scraper'].getint('incremental_max_known', fallback=5000))
+        self.watermark = None
+        
+        # Batas pengaman jumlah halaman jika jumlah halaman tidak bisa dibaca dari paginasi
+        self.max_pages = max(1, self.config['scraper'].getint('max_pages', fallback=50))
+        
         self.data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
         os.makedirs(self.data_dir, exist_ok=True)
+        
+        # Statistik template URL download per kategori, dipakai untuk mencoba template yang berhasil lebih dulu
+        self.probe_timeout = (
+            self.config.getfloat('transport', 'connect_timeout', fallback=5),
+            self.config.getfloat('downloads', 'probe_timeout', fallback=10)
+        )
+        self.url_templates = UrlTemplateStats.from_config(self.config, os.path.join(self.data_dir, 'url_templates.json'))
+        
+        # Berapa kali download yang terputus dilanjutkan dengan request Range sebelum kandidat URL dianggap gagal
+        self.resume_attempts = max(0, self.config.getint('downloads', 'resume_attempts', fallback=2))
+        
+        # Store attachment berbasis hash isi file per direktori output, dimuat saat pertama dipakai
+        self._attachment_stores = {}
+        self._attachment_stores_lock = threading.Lock()
+        
+        # Antrian job attachment persisten (SQLite), dibuka saat pertama dipakai
+        self._attachment_jobs = None
+        
+        # Store tender SQLite sebagai sumber data utama; CSV/JSON per run hanya ditulis jika diminta
+        self._tender_store = None
+        self.export_formats = [
+            fmt.strip().lower() for fmt in self.config.get('output', 'export', fallback='').split(',') if fmt.strip()
+        ]
+        
+        # Circuit breaker per template URL, per host dan untuk Selenium
+        self.breakers = CircuitBreakers.from_config(self.config)
+        
+        # Simpan cookie session ke disk agar bisa dipakai ulang antar run dan antar proses
+        self.session_store = SessionStore(
+            os.path.join(self.data_dir, 'session_cookies.json'),
+            ttl=self.config['scraper'].getint('session_ttl', fallback=1800)
+        )
     
     def set_data_dir(self, data_dir):
         """Set the data directory for saving files"""
         self.data_dir = data_dir
         os.makedirs(self.data_dir, exist_ok=True)
+        self.session_store.path = os.path.join(self.data_dir, 'session_cookies.json')
+        self.url_templates = UrlTemplateStats.from_config(self.config, os.path.join(self.data_dir, 'url_templates.json'))
         logger.info(f"Data directory set to {self.data_dir}")
     
-    def initialize_session(self):
-        """Initialize session with the website"""
+    def _is_session_expired(self, response):
+        """Check whether a response signals that the server dropped our session"""
+        if response.status_code in (401, 403, 440):
+            return True
+        
+        # Server memberi jsessionid baru (di URL redirect atau cookie) jika session lama tidak dikenali
+        urls = [response.url, response.headers.get('Location', '')] + [r.url for r in response.history]
+        if any('jsessionid' in (url or '').lower() for url in urls):
+            return True
+        return 'jsessionid' in response.headers.get('Set-Cookie', '').lower()
+    
+    def _restore_session(self):
+        """Reuse cookies from this process or from disk after a cheap validation probe"""
+        if not self.session.cookies and not self.session_store.load(self.session.cookies):
+            return False
+        
+        try:
+            # Cukup baca header respons, tanpa mengikuti redirect dan tanpa mengunduh halaman utama
+            response = self.session.get(self.base_url, allow_redirects=False, stream=True)
+            response.close()
+        except Exception as e:
+            logger.warning(f"Session validation probe failed: {str(e)}")
+            return False
+        
+        if response.status_code >= 400 or self._is_session_expired(response):
+            logger.info("Stored session is no longer valid, re-initializing")
+            self.session.cookies.clear()
+            self.session_store.clear()
+            self.session_valid = False
+            return False
+        
+        logger.info("Reusing existing session")
+        self.session_valid = True
+        self.session_store.save(self.session.cookies)
+        return True
+    
+    def initialize_session(self, force=False):
+        """Initialize session with the website, reusing stored cookies when still valid"""
+        if not force and self._restore_session():
+            return True
+        
         try:
             logger.info("Initializing session with CIVD website...")
+            self.session.cookies.clear()
             response = self.session.get(self.base_url)
             response.raise_for_status()
             
-            # Save HTML for inspection
-            with open('main_page.html', 'w', encoding='utf-8') as f:
-                f.write(response.text)
-            logger.info("Saved HTML to main_page.html for inspection")
+            # Simpan HTML untuk inspeksi jika debug capture aktif
+            self.debug_recorder.record('main_page.html', response.text)
             
             # Check if we got a jsessionid
             if 'jsessionid' in response.url:
                 logger.info(f"Session established: {response.url}")
                 self.session_valid = True
+                self.session_store.save(self.session.cookies)
                 return True
             else:
                 logger.warning("No session ID found in response URL")
-                return False
+                self.debug_recorder.record('main_page_no_session.html', response.text, failure=True)
+                self.debug_recorder.flush("no session ID")
+                return self.harvest_browser_session()
                 
         except Exception as e:
             logger.error(f"Failed to initialize session: {str(e)}")
-            return False
+            return self.harvest_browser_session()
     
-    def _add_delay(self):
-        """Add random delay to avoid being blocked"""
-        delay = random.uniform(2, 5)
-        time.sleep(delay)
+    def _browser_login(self, driver):
+        """Log in through the site's login form if the current page shows one"""
+        try:
+            username_field = driver.find_element(By.ID, "username")
+            password_field = driver.find_element(By.ID, "password")
+            login_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
+            
+            if username_field and password_field and login_button:
+                logger.info("Selenium: Found login form, attempting to login")
+                username_field.send_keys(self.config['scraper'].get('username', ''))
+                password_field.send_keys(self.config['scraper'].get('password', ''))
+                login_button.click()
+                # Login selesai saat halaman form diganti
+                self.browser_waits.staleness(driver, login_button)
+                self.browser_waits.page_load(driver)
+                return True
+        except Exception as e:
+            logger.info(f"Selenium: No login form found or login failed: {str(e)}")
+        return False
+    
+    def harvest_browser_session(self, reuse_recent=False):
+        """Set up session state in a pooled Chrome and hand its cookies to the requests session.
 
-    def _save_to_csv(self, data, file_prefix):
-        """Save data to CSV file"""
-        if not data:
-            logger.warning(f"No data to save for {file_prefix}")
-            return None
-            
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = os.path.join(self.data_dir, f"{file_prefix}_{timestamp}.csv")
-        
-        fieldnames = data[0].keys()
+        Chrome only loads the main page (and logs in when a form is shown);
+        tnd.jwebs pages and attachments then continue over HTTP with the
+        harvested cookies. Returns False if harvesting is disabled or failed.
+        A harvest within the last harvest_interval seconds is not repeated; its
+        result is returned if reuse_recent is set, otherwise False.
+        """
+        if not self.harvest_session:
+            return False
         
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data)
+        with self._harvest_lock:
+            # Cookie dari browser baru saja diambil; membuka Chrome lagi tidak akan membantu
+            if self._harvested_at and time.time() - self._harvested_at < self.harvest_interval:
+                logger.info("Browser session was harvested recently, not starting Chrome again")
+                return reuse_recent and self._harvest_ok
+            self._harvested_at = time.time()
+            self._harvest_ok = False
             
-        logger.info(f"Data saved to {filename}")
-        return filename
+            try:
+                logger.info("Harvesting session cookies with Chrome")
+                with self.browser_pool.lease() as browser:
+                    driver = browser.driver
+                    self._add_delay()
+                    driver.get(f"{self.base_url}/index.jwebs")
+                    self.browser_waits.page_load(driver)
+                    self._browser_login(driver)
+                    
+                    browser_cookies = driver.get_cookies()
+                    current_url = driver.current_url
+                
+                self.session.cookies.clear()
+                for cookie in browser_cookies:
+                    self.session.cookies.set(
+                        cookie['name'],
+                        cookie['value'],
+                        domain=cookie.get('domain'),
+                        path=cookie.get('path') or '/',
+                        secure=cookie.get('secure', False),
+                        expires=cookie.get('expiry'),
+                    )
+                
+                # Server bisa memberi jsessionid hanya lewat URL rewriting
+                match = re.search(r';jsessionid=([^?#;/]+)', current_url or '', re.I)
+                if match and not any(cookie.name.upper() == 'JSESSIONID' for cookie in self.session.cookies):
+                    self.session.cookies.set('JSESSIONID', match.group(1), domain=urllib.parse.urlparse(self.base_url).hostname, path='/')
+                
+                if not self.session.cookies:
+                    logger.warning("Chrome did not receive any session cookies")
+                    return False
+                
+                self.session_valid = True
+                self._harvest_ok = True
+                self.session_store.save(self.session.cookies)
+                logger.info(f"Harvested {len(self.session.cookies)} cookies from Chrome in {time.time() - self._harvested_at:.1f}s, continuing over HTTP")
+                return True
+            except Exception as e:
+                logger.error(f"Failed to harvest browser session: {str(e)}")
+                return False
+    
+    def _add_delay(self):
+        """Wait for the next rate limiter slot before a request made outside self.session"""
+        self.rate_limiter.acquire(self.base_url)
 
     def _extract_tender_items(self, html_content, section_id=None):
         """Extract tender items from HTML content"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        tender_items = []
-        
-        # Jika section_id diberikan, coba cari section tersebut
-        if section_id:
-            section = soup.find(id=section_id)
-            if not section:
-                logger.warning(f"Section with id '{section_id}' not found")
-                
-                # Jika tidak menemukan section dengan ID, coba cari semua card di seluruh HTML
-                cards = soup.find_all('div', class_='card')
-                if cards:
-                    logger.info(f"Found {len(cards)} cards in the entire HTML")
-                    for card in cards:
-                        item = self._extract_card_data(card)
-                        if item:
-                            tender_items.append(item)
-                    return tender_items
-                else:
-                    return []
-            else:
-                # Simpan section HTML untuk inspeksi
-                section_filename = f"{section_id}_section.html"
-                with open(section_filename, "w", encoding="utf-8") as f:
-                    f.write(str(section))
-                logger.info(f"Saved {section_id} section HTML to {section_filename} for inspection")
-                
-                # Cari semua card di dalam section
-                cards = section.find_all('div', class_='card')
-                if cards:
-                    logger.info(f"Found {len(cards)} cards in section {section_id}")
-                    for card in cards:
-                        item = self._extract_card_data(card)
-                        if item:
-                            tender_items.append(item)
-                    return tender_items
-        else:
-            # Jika tidak ada section_id, cari semua card di seluruh HTML
-            cards = soup.find_all('div', class_='card')
-            if cards:
-                logger.info(f"Found {len(cards)} cards in the entire HTML")
-                for card in cards:
-                    item = self._extract_card_data(card)
-                    if item:
-                        tender_items.append(item)
-                return tender_items
-        
-        # Jika tidak menemukan card, coba pendekatan lain
-        if not tender_items:
-            logger.info("No cards found, trying alternative approaches")
-            
-            # Coba cari div dengan class col-6 atau col-md-6 (biasanya berisi item tender)
-            cols = soup.find_all('div', class_=lambda x: x and ('col-6' in x or 'col-md-6' in x))
-            if cols:
-                logger.info(f"Found {len(cols)} column divs")
-                for col in cols:
-                    # Cek apakah col berisi card
-                    card = col.find('div', class_='card')
-                    if card:
-                        item = self._extract_card_data(card)
-                        if item:
-                            tender_items.append(item)
-            
-            # Jika masih tidak menemukan, cari berdasarkan struktur
-            if not tender_items:
-                # Cari semua div yang memiliki border atau margin-bottom yang menunjukkan item terpisah
-                divs = soup.find_all('div', style=lambda x: x and ('border' in x or 'margin-bottom' in x))
-                if divs:
-                    logger.info(f"Found {len(divs)} divs with border or margin")
-                    for div in divs:
-                        item = self._extract_div_data(div)
-                        if item:
-                            tender_items.append(item)
-        
-        logger.info(f"Extracted {len(tender_items)} tender items")
-        return tender_items
+        return self.parser.extract_tender_items(html_content, section_id)
         
     def _extract_card_data(self, card):
-        """Extract data from a card element"""
-        try:
-            # Cari card-body jika ada
-            card_body = card.find('div', class_='card-body')
-            if card_body:
-                card = card_body
-                
-            # Cari judul tender
-            title_elem = card.find('h5', class_='card-title')
-            title = title_elem.get_text(strip=True) if title_elem else None
-            
-            # Cari subtitle yang berisi informasi tanggal dan perusahaan
-            subtitle_elem = card.find('small', class_='card-subtitle')
-            subtitle_text = subtitle_elem.get_text(strip=True) if subtitle_elem else ""
-            
-            # Ekstrak tanggal dari subtitle
-            date_match = re.search(r'Tayang hingga\s+(\d+\s+\w+\s+\d{4})', subtitle_text)
-            date = date_match.group(1) if date_match else "No Date"
-            
-            # Ekstrak perusahaan dari subtitle
-            company_match = re.search(r'Oleh\s+(.*?)$', subtitle_text)
-            company = company_match.group(1) if company_match else "SKK Migas"
-            company = re.sub(r'<[^>]+>', '', company)  # Hapus tag HTML
-            
-            # Cari deskripsi
-            desc_elem = card.find('p', class_='card-text')
-            description = desc_elem.get_text(strip=True) if desc_elem else ""
-            
-            # Cari informasi tambahan
-            info_elem = card.find('p', class_='tipe')
-            info_dict = {}
-            
-            if info_elem:
-                # Ekstrak semua span dengan label dan nilai
-                spans = info_elem.find_all('span')
-                for span in spans:
-                    span_text = span.get_text(strip=True)
-                    if span_text:
-                        # Coba ekstrak label dan nilai
-                        label_match = re.search(r'<b>(.*?)</b>:\s*(.*)', str(span))
-                        if label_match:
-                            label = label_match.group(1).strip()
-                            value = label_match.group(2).strip()
-                            info_dict[label] = value
-                        else:
-                            # Jika tidak ada format label:nilai, gunakan teks lengkap
-                            clean_text = re.sub(r'<[^>]+>', '', span_text).strip()
-                            if clean_text:
-                                info_dict[f"Info {len(info_dict) + 1}"] = clean_text
-            
-            # Cari link attachment jika ada
-            attachments = []
-            
-            # Cari tombol "Lebih lanjut" yang terlihat di screenshot
-            lebih_lanjut_buttons = card.find_all('a', class_='lebih-lanjut')
-            if not lebih_lanjut_buttons:
-                lebih_lanjut_buttons = card.find_all('a', string=lambda s: s and 'Lebih lanjut' in s)
-            if not lebih_lanjut_buttons:
-                lebih_lanjut_buttons = card.find_all('button', string=lambda s: s and 'Lebih lanjut' in s)
-            
-            # Cari link attachment langsung
-            attachment_links = card.find_all('a', class_='attachment')
-            if not attachment_links:
-                attachment_links = card.find_all('a', string=lambda s: s and 'Attachment' in s)
-            
-            # Tambahkan semua link attachment yang ditemukan
-            for link in attachment_links:
-                href = link.get('href', '')
-                if href and ('download' in href or 'attachment' in href or '.pdf' in href):
-                    file_id = None
-                    file_name = "attachment.pdf"
-                    
-                    # Coba ekstrak file ID dan nama file dari URL
-                    if 'fileId=' in href:
-                        file_id = href.split('fileId=')[1].split('&')[0] if '&' in href.split('fileId=')[1] else href.split('fileId=')[1]
-                    elif '/download/' in href:
-                        parts = href.split('/download/')[1].split('/')
-                        if len(parts) >= 2:
-                            file_id = parts[1]
-                    
-                    if 'fileName=' in href:
-                        file_name = href.split('fileName=')[1].split('&')[0] if '&' in href.split('fileName=')[1] else href.split('fileName=')[1]
-                    elif href.endswith('.pdf'):
-                        file_name = href.split('/')[-1]
-                    
-                    # Pastikan URL lengkap
-                    if not href.startswith('http'):
-                        href = f"{self.base_url}{href}" if href.startswith('/') else f"{self.base_url}/{href}"
-                    
-                    attachments.append({
-                        'url': href,
-                        'name': file_name,
-                        'file_id': file_id
-                    })
-            
-            # Jika tidak ada attachment langsung, cari link download-file-blob
-            if not attachments:
-                attachment_elems = card.find_all('a', class_='download-file-blob')
-                
-                for attachment_elem in attachment_elems:
-                    if 'data-url' in attachment_elem.attrs:
-                        attachment_url = attachment_elem['data-url']
-                        attachment_id = attachment_elem.get('data-file-id')
-                        attachment_name = attachment_elem.get('data-name', 'attachment.pdf')
-                        
-                        if attachment_url and attachment_id:
-                            if not attachment_url.startswith('http'):
-                                attachment_url = f"{self.base_url}{attachment_url}?fileId={attachment_id}&fileName={attachment_name}"
-                            else:
-                                attachment_url = f"{attachment_url}?fileId={attachment_id}&fileName={attachment_name}"
-                            
-                            attachments.append({
-                                'url': attachment_url,
-                                'name': attachment_name,
-                                'file_id': attachment_id
-                            })
-            
-            # Format deskripsi dan informasi tambahan dengan baik
-            full_description = description
-            
-            # Tambahkan informasi tambahan ke deskripsi
-            if info_dict:
-                for key, value in info_dict.items():
-                    full_description += f"\n{key}: {value}"
-            
-            # Buat item tender
-            tender_item = {
-                'title': title,
-                'date': date,
-                'company': company,
-                'description': full_description,
-                'attachments': attachments
-            }
-            
-            # Tambahkan URL attachment utama jika ada
-            if attachments:
-                tender_item['attachment_url'] = attachments[0]['url']
-                tender_item['attachment_name'] = attachments[0]['name']
-                tender_item['attachment_id'] = attachments[0]['file_id']
-            
-            return tender_item
-        except Exception as e:
-            logger.error(f"Error extracting card data: {str(e)}")
-            return None
+        """Extract data from a card element parsed by the active parser backend"""
+        return self.parser.extract_card_data(card)
 
     def _extract_api_data(self, html_content):
         """Extract API data from HTML content"""
@@ -446,83 +436,186 @@ path = data/
             logger.error(f"Error extracting API data: {str(e)}")
             return []
 
-    def scrape_undangan_prakualifikasi(self):
-        """Scrape Undangan Prakualifikasi page"""
-        if not self.session_valid and not self.initialize_session():
-            logger.error("Cannot scrape without valid session")
-            return []
+    def _tnd_payload(self, tnd_type, page):
+        """Build the tnd.jwebs search payload for one result page"""
+        # Parameter yang benar untuk pagination adalah 'd-1789-p', bukan 'page'
+        return {
+            "type": tnd_type,  # Type 1 untuk Undangan Prakualifikasi, type 2 untuk Pelelangan Umum
+            "keyword": "",
+            "startDate": "",
+            "endDate": "",
+            "page": "1",  # Selalu 1 karena parameter ini tidak digunakan untuk pagination
+            "d-1789-p": str(page)  # Parameter yang benar untuk pagination
+        }
+
+    def _extract_page_count(self, html_content, pagination_numbers=None):
+        """Read the highest page number linked from the pagination markup; a windowed paginator only shows a lower bound"""
+        # Link paginasi displaytag membawa parameter d-1789-p untuk setiap halaman
+        page_numbers = [int(n) for n in PAGE_PARAM_PATTERN.findall(html_content)]
+        
+        # Jika tidak ada, pakai angka halaman .pagination yang sudah dibaca dari pohon hasil parse
+        if not page_numbers and 'pagination' in html_content:
+            page_numbers = list(pagination_numbers or [])
             
-        # Tambahkan delay untuk menghindari deteksi sebagai bot
-        self._add_delay()
+            # Paginasi bisa berada di luar container hasil, baru parse seluruh dokumen jika perlu
+            if not page_numbers:
+                page_numbers = self.parser.parse_page(html_content).page_numbers()
+        
+        if page_numbers:
+            return max(page_numbers)
+        return None
+
+    def _fetch_batch(self, api_url, tnd_type, batch, result_id):
+        """Fetch a batch of result pages, handing each page to the parse workers as soon as it arrives"""
+        payloads = [self._tnd_payload(tnd_type, page) for page in batch]
+        
+        if self._parse_pool is None:
+            return self.fetcher.fetch_pages(api_url, payloads), [None] * len(batch)
         
+        # Halaman yang sudah tiba di-parse di proses lain selama halaman berikutnya masih diunduh
+        responses = [None] * len(batch)
+        parse_futures = [None] * len(batch)
+        for index, response in self.fetcher.iter_pages(api_url, payloads):
+            responses[index] = response
+            if response.status_code == 200 and not self._is_session_expired(response):
+                parse_futures[index] = self._parse_pool.submit(parse_in_worker, response.text, result_id, batch[index] == 1)
+        return responses, parse_futures
+    
+    def _parse_tnd_page(self, response, result_id, parse_future=None, want_page_numbers=False):
+        """Return (tender items, pagination numbers) for one page, from a parse worker if one was used"""
+        if parse_future is not None:
+            try:
+                return parse_future.result()
+            except Exception as e:
+                logger.warning(f"Parse worker failed, parsing in the scraper thread instead: {str(e)}")
+        
+        parsed_page = self.parser.parse_page(response.text, result_id)
+        tender_items = parsed_page.extract_tender_items()
+        return tender_items, parsed_page.page_numbers() if want_page_numbers else []
+    
+    def _scrape_tnd_pages(self, tnd_type, section, label, page_size):
+        """Scrape tnd.jwebs result pages concurrently and return the items in page order"""
         all_tender_items = []
+        for tender_items in self._iter_tnd_pages(tnd_type, section, label, page_size):
+            all_tender_items.extend(tender_items)
+        return all_tender_items
+    
+    def _iter_tnd_pages(self, tnd_type, section, label, page_size):
+        """Scrape tnd.jwebs result pages concurrently and yield the items of each page in page order"""
+        api_url = f"{self.base_url}/ajax/search/tnd.jwebs"
+        result_id = f"tnd{tnd_type}Result"
         
-        # Gunakan endpoint API yang ditemukan dalam analisis JavaScript
-        try:
-            logger.info("Attempting to use API endpoint for Undangan Prakualifikasi data")
-            api_url = f"{self.base_url}/ajax/search/tnd.jwebs"
+        next_page = 1
+        total_pages = None
+        known_pages = 0
+        relogged = False
+        
+        while next_page <= self.max_pages:
+            if next_page == 1:
+                # Halaman pertama diambil sendiri untuk membaca jumlah halaman dari markup paginasi
+                batch = [1]
+            else:
+                # Batch sebesar jumlah worker agar halaman mengalir ke pipeline selama halaman berikutnya diunduh
+                # dan agar mode incremental atau jumlah halaman yang tidak diketahui bisa berhenti lebih awal.
+                # Melewati jumlah dari paginasi (bisa hanya tepi jendela paginasi), batas atasnya max_pages
+                last_page = min(total_pages if total_pages and next_page <= total_pages else self.max_pages, self.max_pages)
+                batch = list(range(next_page, min(next_page + self.fetcher.max_workers - 1, last_page) + 1))
+            
+            logger.info(f"Scraping {label} pages {batch[0]}-{batch[-1]}")
             
-            # Tentukan jumlah halaman maksimum yang akan di-scrape
-            max_pages = 10
+            responses, parse_futures = self._fetch_batch(api_url, tnd_type, batch, result_id)
             
-            for page in range(1, max_pages + 1):
-                logger.info(f"Scraping Undangan Prakualifikasi page {page}")
+            # Jika server menolak session, login ulang sekali lalu ulangi batch yang sama
+            if any(self._is_session_expired(response) for response in responses):
+                if relogged:
+                    logger.error(f"Session rejected again while scraping {label}, stopping pagination")
+                    return
                 
-                # Parameter yang benar untuk pagination adalah 'd-1789-p', bukan 'page'
-                payload = {
-                    "type": "1",  # Type 1 untuk Undangan Prakualifikasi berdasarkan kode JS
-                    "keyword": "",
-                    "startDate": "",
-                    "endDate": "",
-                    "page": "1",  # Selalu 1 karena parameter ini tidak digunakan untuk pagination
-                    "d-1789-p": str(page)  # Parameter yang benar untuk pagination
-                }
+                logger.warning(f"Session expired while scraping {label}, re-initializing session")
+                relogged = True
+                self.session_valid = False
+                self.session_store.clear()
+                if not self.initialize_session(force=True):
+                    return
+                continue
+            
+            # Proses respons sesuai urutan halaman
+            for page, response, parse_future in zip(batch, responses, parse_futures):
+                response_name = f"{section}_api_response_page{page}.html"
                 
-                # Tambahkan delay antara request untuk menghindari rate limiting
-                if page > 1:
-                    time.sleep(random.uniform(2, 5))
+                if response.status_code != 200:
+                    logger.warning(f"API request failed with status code: {response.status_code} for page {page}")
+                    self.debug_recorder.record(response_name, response.text, failure=True)
+                    self.debug_recorder.flush(f"{label} page {page} returned status {response.status_code}")
+                    return
                 
-                response = self.session.post(api_url, data=payload)
+                logger.info(f"Successfully received response from API endpoint for page {page}")
                 
-                if response.status_code == 200:
-                    logger.info(f"Successfully received response from API endpoint for page {page}")
-                    
-                    # Simpan respons API untuk inspeksi (untuk semua halaman)
-                    response_file = f'prakualifikasi_api_response_page{page}.html'
-                    with open(response_file, 'w', encoding='utf-8') as f:
-                        f.write(response.text)
-                    logger.info(f"Saved API response to {response_file} for inspection")
-                    
-                    # Coba ekstrak item tender dari respons API
-                    tender_items = self._extract_tender_items(response.text, "tnd1Result")
-                    
-                    # Jika tidak menemukan dengan ID tnd1Result, coba tanpa ID
-                    if not tender_items:
-                        logger.info(f"No items found with ID 'tnd1Result', trying without specific ID")
-                        tender_items = self._extract_tender_items(response.text)
-                    
-                    if tender_items:
-                        logger.info(f"Successfully extracted {len(tender_items)} tender items from API response for page {page}")
-                        
-                        # Tambahkan informasi halaman ke setiap item
-                        for item in tender_items:
-                            item['page'] = page
-                        
-                        all_tender_items.extend(tender_items)
-                        
-                        # Jika jumlah item kurang dari yang diharapkan, mungkin ini adalah halaman terakhir
-                        if len(tender_items) < 6:  # Biasanya ada 6 item per halaman
-                            logger.info(f"Found less than 6 items on page {page}, assuming this is the last page")
-                            break
-                    else:
-                        logger.warning(f"No tender items found in API response for page {page}, stopping pagination")
-                        break
-                else:
-                    logger.warning(f"API request failed with status code: {response.status_code} for page {page}")
-                    break
+                # Parse respons sekali, dibatasi ke container tndNResult; semua fallback memakai pohon yang sama
+                tender_items, page_numbers = self._parse_tnd_page(response, result_id, parse_future, page == 1)
+                
+                # Simpan respons API di buffer debug untuk inspeksi; halaman pertama yang kosong
+                # kemungkinan berarti markup berubah, jadi selalu disimpan
+                self.debug_recorder.record(response_name, response.text, failure=page == 1 and not tender_items)
+                
+                if not tender_items:
+                    if total_pages and page > total_pages:
+                        logger.info(f"Page {page} after the last paginated page is empty, {label} ends at page {page - 1}")
+                        return
+                    logger.warning(f"No tender items found in API response for page {page}, stopping pagination")
+                    if page == 1:
+                        self.debug_recorder.flush(f"no {label} items on page 1")
+                    return
+                
+                logger.info(f"Successfully extracted {len(tender_items)} tender items from API response for page {page}")
                 
-                # Tambahkan delay antara request paginasi
-                time.sleep(random.uniform(1, 3))
+                if page == 1:
+                    total_pages = self._extract_page_count(response.text, page_numbers)
+                    if total_pages:
+                        logger.info(f"Found {total_pages} result pages for {label}")
+                
+                # Tambahkan informasi halaman ke setiap item
+                for item in tender_items:
+                    item['page'] = page
+                
+                yield tender_items
+                
+                # Halaman yang tidak penuh adalah halaman terakhir. Jumlah dari paginasi bisa hanya tepi
+                # jendela paginasi, jadi halaman terakhir menurut paginasi yang masih penuh tetap dilanjutkan
+                if len(tender_items) < page_size:
+                    logger.info(f"Found less than {page_size} items on page {page}, assuming this is the last page")
+                    return
+                if total_pages and page == total_pages:
+                    logger.info(f"Page {page} of {label} is full although the pagination ends there, checking the next pages")
+                
+                # Mode incremental: berhenti jika beberapa halaman berturut-turut hanya berisi tender yang sudah dikenal
+                if self.watermark:
+                    if self.watermark.count_known(section, tender_items) == len(tender_items):
+                        known_pages += 1
+                        if known_pages >= self.incremental_stop_pages:
+                            logger.info(f"Page {page} only contains known {label} tenders, stopping pagination")
+                            return
+                    else:
+                        known_pages = 0
+            
+            next_page = batch[-1] + 1
+        
+        # Semua return di atas berarti akhir hasil ditemukan; sampai di sini berarti crawl dipotong max_pages
+        logger.warning(f"Stopped scraping {label} at max_pages ({self.max_pages}) while page {self.max_pages} was still full, "
+                       f"later result pages were not fetched; raise max_pages in config.ini to fetch them")
+
+    def scrape_undangan_prakualifikasi(self):
+        """Scrape Undangan Prakualifikasi page"""
+        if not self.session_valid and not self.initialize_session():
+            logger.error("Cannot scrape without valid session")
+            return []
+            
+        all_tender_items = []
+        
+        # Gunakan endpoint API yang ditemukan dalam analisis JavaScript
+        try:
+            logger.info("Attempting to use API endpoint for Undangan Prakualifikasi data")
+            all_tender_items = self._scrape_tnd_pages("1", 'prakualifikasi', "Undangan Prakualifikasi", page_size=6)
             
             if all_tender_items:
                 logger.info(f"Successfully extracted a total of {len(all_tender_items)} tender items from all pages")
@@ -533,6 +626,12 @@ path = data/
             logger.error(f"Error using API endpoint: {str(e)}")
             logger.error(traceback.format_exc())
         
+        return self._scrape_prakualifikasi_with_selenium()
+
+    def _scrape_prakualifikasi_with_selenium(self):
+        """Scrape Undangan Prakualifikasi with Selenium when the API returns nothing"""
+        all_tender_items = []
+        
         # Fallback ke metode tradisional jika API gagal
         try:
             logger.info("Falling back to traditional page scraping for Undangan Prakualifikasi")
@@ -540,24 +639,16 @@ path = data/
             # Gunakan Selenium untuk menangani paginasi JavaScript
             logger.info("Using Selenium to handle JavaScript pagination")
             
-            # Setup Chrome options
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument(f"user-agent={self.user_agent}")
-            
-            # Inisialisasi driver
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-            
-            try:
+            # Pinjam Chrome yang sudah berjalan dari pool; dikembalikan ke pool setelah selesai
+            with self.browser_pool.lease() as browser:
+                driver = browser.driver
                 # Buka halaman utama
+                self._add_delay()
                 driver.get(f"{self.base_url}/index.jwebs#invitation")
                 logger.info("Opened main page with Selenium")
                 
                 # Tunggu hingga konten dimuat
-                WebDriverWait(driver, 10).until(
+                WebDriverWait(driver, self.browser_waits.page_timeout).until(
                     EC.presence_of_element_located((By.ID, "invitation"))
                 )
                 
@@ -593,10 +684,13 @@ path = data/
                             try:
                                 # Cari dan klik tombol halaman
                                 page_button = driver.find_element(By.XPATH, f"//ul[contains(@class, 'pagination')]//a[text()='{page}']")
+                                before = self.browser_waits.container_html(driver, "tnd1Result")
                                 driver.execute_script("arguments[0].click();", page_button)
                                 
-                                # Tunggu konten dimuat
-                                time.sleep(3)
+                                # Tunggu sampai isi container hasil berganti, bukan jeda tetap
+                                if not self.browser_waits.results_change(driver, "tnd1Result", before):
+                                    logger.warning(f"Results did not change after clicking page {page}")
+                                    break
                                 
                                 # Scrape halaman
                                 logger.info(f"Scraping page {page} with Selenium")
@@ -609,8 +703,8 @@ path = data/
                                     logger.warning(f"No tender items found on page {page}")
                                     break
                                 
-                                # Tambahkan delay antara halaman
-                                time.sleep(random.uniform(1, 3))
+                                # Tunggu slot rate limiter sebelum klik halaman berikutnya
+                                self._add_delay()
                             except Exception as e:
                                 logger.error(f"Error clicking pagination button for page {page}: {str(e)}")
                                 break
@@ -623,10 +717,6 @@ path = data/
                 else:
                     logger.warning("No tender data available at this time")
                     return []
-            finally:
-                # Tutup driver
-                driver.quit()
-                logger.info("Closed Selenium driver")
         except Exception as e:
             logger.error(f"Error scraping Undangan Prakualifikasi page: {str(e)}")
             logger.error(traceback.format_exc())
@@ -638,77 +728,12 @@ path = data/
             logger.error("Cannot scrape without valid session")
             return []
             
-        # Tambahkan delay untuk menghindari deteksi sebagai bot
-        self._add_delay()
-        
         all_tender_items = []
         
         # Gunakan endpoint API yang ditemukan dalam analisis JavaScript
         try:
             logger.info("Attempting to use API endpoint for Pelelangan Umum data")
-            api_url = f"{self.base_url}/ajax/search/tnd.jwebs"
-            
-            # Tentukan jumlah halaman maksimum yang akan di-scrape
-            max_pages = 10
-            
-            for page in range(1, max_pages + 1):
-                logger.info(f"Scraping Pelelangan Umum page {page}")
-                
-                # Parameter yang benar untuk pagination adalah 'd-1789-p', bukan 'page'
-                payload = {
-                    "type": "2",  # Type 2 untuk Pelelangan Umum berdasarkan kode JS
-                    "keyword": "",
-                    "startDate": "",
-                    "endDate": "",
-                    "page": "1",  # Selalu 1 karena parameter ini tidak digunakan untuk pagination
-                    "d-1789-p": str(page)  # Parameter yang benar untuk pagination
-                }
-                
-                # Tambahkan delay antara request untuk menghindari rate limiting
-                if page > 1:
-                    time.sleep(random.uniform(2, 5))
-                
-                response = self.session.post(api_url, data=payload)
-                
-                if response.status_code == 200:
-                    logger.info(f"Successfully received response from API endpoint for page {page}")
-                    
-                    # Simpan respons API untuk inspeksi (hanya untuk halaman pertama)
-                    if page == 1:
-                        with open('pelelangan_api_response.html', 'w', encoding='utf-8') as f:
-                            f.write(response.text)
-                        logger.info("Saved API response to pelelangan_api_response.html for inspection")
-                    
-                    # Coba ekstrak item tender dari respons API
-                    tender_items = self._extract_tender_items(response.text, "tnd2Result")
-                    
-                    # Jika tidak menemukan dengan ID tnd2Result, coba tanpa ID
-                    if not tender_items:
-                        logger.info(f"No items found with ID 'tnd2Result', trying without specific ID")
-                        tender_items = self._extract_tender_items(response.text)
-                    
-                    if tender_items:
-                        logger.info(f"Successfully extracted {len(tender_items)} tender items from API response for page {page}")
-                        
-                        # Tambahkan informasi halaman ke setiap item
-                        for item in tender_items:
-                            item['page'] = page
-                        
-                        all_tender_items.extend(tender_items)
-                        
-                        # Jika jumlah item kurang dari yang diharapkan, mungkin ini adalah halaman terakhir
-                        if len(tender_items) < 10:  # Biasanya ada 10 item per halaman
-                            logger.info(f"Found less than 10 items on page {page}, assuming this is the last page")
-                            break
-                    else:
-                        logger.warning(f"No tender items found in API response for page {page}, stopping pagination")
-                        break
-                else:
-                    logger.warning(f"API request failed with status code: {response.status_code} for page {page}")
-                    break
-                
-                # Tambahkan delay antara request paginasi
-                time.sleep(random.uniform(1, 3))
+            all_tender_items = self._scrape_tnd_pages("2", 'pelelangan', "Pelelangan Umum", page_size=10)
             
             if all_tender_items:
                 logger.info(f"Successfully extracted a total of {len(all_tender_items)} tender items from API")
@@ -718,30 +743,27 @@ path = data/
         except Exception as e:
             logger.error(f"Error using API endpoint: {str(e)}")
         
+        return self._scrape_pelelangan_with_selenium()
+
+    def _scrape_pelelangan_with_selenium(self):
+        """Scrape Pelelangan Umum with Selenium when the API returns nothing"""
+        all_tender_items = []
+        
         # Fallback ke metode tradisional dengan Selenium jika API gagal
         try:
             logger.info("Falling back to Selenium for Pelelangan Umum scraping")
             
-            # Setup Chrome options
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument(f"user-agent={self.user_agent}")
-            
-            driver = None
-            try:
-                # Gunakan webdriver-manager untuk mengelola driver Chrome
-                service = Service(ChromeDriverManager().install())
-                driver = webdriver.Chrome(service=service, options=chrome_options)
+            # Pinjam Chrome yang sudah berjalan dari pool; dikembalikan ke pool setelah selesai
+            with self.browser_pool.lease() as browser:
+                driver = browser.driver
                 
                 # Akses halaman utama
+                self._add_delay()
                 driver.get(f"{self.base_url}/index.jwebs#bid")
                 logger.info("Accessed main page with Selenium")
                 
                 # Tunggu hingga konten dimuat
-                WebDriverWait(driver, 10).until(
+                WebDriverWait(driver, self.browser_waits.page_timeout).until(
                     EC.presence_of_element_located((By.ID, "bid"))
                 )
                 
@@ -755,19 +777,23 @@ path = data/
                 
                 # Coba klik tombol next untuk halaman berikutnya
                 page_count = 1
-                while page_count < max_pages:
+                while page_count < self.max_pages:
                     try:
                         # Cari tombol next
                         next_button = WebDriverWait(driver, 5).until(
                             EC.element_to_be_clickable((By.XPATH, "//a[contains(@class, 'page-link') and contains(text(), 'Next')]"))
                         )
                         
-                        # Klik tombol next
+                        # Klik tombol next setelah slot rate limiter tersedia
+                        self._add_delay()
+                        before = self.browser_waits.container_html(driver, "tnd2Result")
                         next_button.click()
                         logger.info(f"Clicked next button for page {page_count + 1}")
                         
-                        # Tunggu hingga konten dimuat
-                        time.sleep(3)
+                        # Tunggu sampai isi container hasil berganti; tidak berubah berarti halaman terakhir
+                        if not self.browser_waits.results_change(driver, "tnd2Result", before):
+                            logger.info(f"Results did not change after clicking next, stopping at page {page_count}")
+                            break
                         
                         # Scrape halaman berikutnya
                         page_source = driver.page_source
@@ -791,10 +817,6 @@ path = data/
                 else:
                     logger.warning("No tender data available at this time")
                     return []
-            finally:
-                if driver:
-                    driver.quit()
-                    logger.info("Selenium driver closed")
         except Exception as e:
             logger.error(f"Error scraping Pelelangan Umum page with Selenium: {str(e)}")
             return []
@@ -856,10 +878,8 @@ path = data/
             
             # Coba akses halaman Undangan Prakualifikasi dan Pelelangan Umum
             # untuk analisis lebih lanjut
-            self._add_delay()
             invitation_response = self.session.get(f"{self.base_url}/index.jwebs#invitation")
             
-            self._add_delay()
             bid_response = self.session.get(f"{self.base_url}/index.jwebs#bid")
             
             # Cari semua XHR requests yang mungkin terjadi saat halaman dimuat
@@ -889,107 +909,211 @@ path = data/
             logger.error(f"Error analyzing JavaScript: {str(e)}")
             return False
 
-    def run_scraper(self, download_attachments=False):
-        """Run the scraper to collect data from both sections"""
+    def _open_parse_pool(self):
+        """Start the parse worker processes if parse_workers is set"""
+        if self.parse_workers and self._parse_pool is None:
+            self._parse_pool = ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                initializer=init_parse_worker,
+                initargs=(self.parser.name, self.base_url, self.card_schema)
+            )
+            logger.info(f"Started {self.parse_workers} parse worker processes")
+    
+    def _close_parse_pool(self):
+        """Stop the parse worker processes"""
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(cancel_futures=True)
+            self._parse_pool = None
+    
+    def _iter_section(self, section):
+        """Yield the tender items of one section page by page, using Selenium if the API returns nothing"""
+        tnd_type, label, _, page_size, selenium_method = SECTIONS[section]
+        scrape_with_selenium = getattr(self, selenium_method)
+        
+        if not self.session_valid and not self.initialize_session():
+            logger.error("Cannot scrape without valid session")
+            return
+        
+        logger.info(f"Scraping {label} section")
+        found = False
+        # Jika API kosong, ambil cookie session dari Chrome lalu coba API sekali lagi sebelum scraping penuh dengan Selenium
+        for with_browser_session in (False, True):
+            if with_browser_session:
+                if not self.harvest_browser_session(reuse_recent=True):
+                    break
+                logger.info(f"Retrying {label} through the API with browser session cookies")
+            try:
+                for tender_items in self._iter_tnd_pages(tnd_type, section, label, page_size):
+                    found = True
+                    yield tender_items
+            except Exception as e:
+                logger.error(f"Error using API endpoint for {label}: {str(e)}")
+                logger.error(traceback.format_exc())
+            if found:
+                break
+        
+        if not found:
+            logger.warning(f"No {label} items found through the API, trying fallback method")
+            tender_items = scrape_with_selenium()
+            if tender_items:
+                yield tender_items
+            else:
+                logger.warning(f"No {label} data found")
+    
+    def _item_attachments(self, item):
+        """Return the attachment dicts listed on one tender item"""
+        attachments = item.get('attachments')
+        if isinstance(attachments, str):
+            try:
+                attachments = json.loads(attachments)
+            except:
+                logger.warning(f"Failed to parse attachments JSON: {attachments}")
+                return []
+        
+        if not isinstance(attachments, list):
+            return []
+        return [attachment for attachment in attachments if isinstance(attachment, dict) and attachment.get('url')]
+    
+    def _download_section_attachment(self, section, url, budget=None):
+        """Download one attachment into the data directory, used by the download manager"""
+        return self.download_attachment(url, self.data_dir, section, budget=budget)
+    
+    def run_scraper(self, download_attachments=False, parallel_sections=None, incremental=None, collect_results=True, export=None):
+        """Run the scraper to collect data from both sections.
+
+        Records stream through the pipeline into the tender store and the
+        attachment sink as pages are parsed; pass collect_results=False to
+        skip keeping them in memory for the returned dict. CSV and JSON
+        snapshots of the run are written for the formats in export
+        (default: the export option of the [output] section).
+        """
         if not self.session_valid and not self.initialize_session():
             logger.error("Cannot run scraper without valid session")
             return None
-            
-        results = {
-            'prakualifikasi': [],
-            'pelelangan': []
-        }
         
-        # Scrape Undangan Prakualifikasi
-        logger.info("Scraping Undangan Prakualifikasi section")
-        prakualifikasi_items = self.scrape_undangan_prakualifikasi()
+        if parallel_sections is None:
+            parallel_sections = self.parallel_sections
+        if incremental is None:
+            incremental = self.incremental
+        if export is None:
+            export = self.export_formats
         
-        if prakualifikasi_items:
-            logger.info(f"Found {len(prakualifikasi_items)} Undangan Prakualifikasi items")
+        # Mode incremental memakai daftar tender yang sudah dikenal dari run sebelumnya
+        self.watermark = TenderWatermark(os.path.join(self.data_dir, 'known_tenders.json'), self.incremental_max_known) if incremental else None
             
-            # Simpan ke CSV
-            csv_file = self._save_to_csv(prakualifikasi_items, 'prakualifikasi')
-            logger.info(f"Saved Undangan Prakualifikasi data to {csv_file}")
-            
-            # Download attachments jika diminta
-            if download_attachments:
-                logger.info("Downloading attachments for Undangan Prakualifikasi")
-                for item in prakualifikasi_items:
-                    if 'attachments' in item and item['attachments']:
-                        try:
-                            attachments = item['attachments']
-                            if isinstance(attachments, str):
-                                try:
-                                    attachments = json.loads(attachments)
-                                except:
-                                    logger.warning(f"Failed to parse attachments JSON: {attachments}")
-                                    continue
-                                    
-                            if isinstance(attachments, list):
-                                for attachment in attachments:
-                                    if isinstance(attachment, dict) and 'url' in attachment:
-                                        self.download_attachment(attachment['url'], self.data_dir, 'prakualifikasi')
-                                        # Tambahkan delay antara download
-                                        time.sleep(random.uniform(1, 3))
-                        except Exception as e:
-                            logger.error(f"Error downloading attachment: {str(e)}")
-            
-            results['prakualifikasi'] = prakualifikasi_items
-        else:
-            logger.warning("No Undangan Prakualifikasi data found")
-        
-        # Tambahkan delay antara scraping sections
-        time.sleep(random.uniform(3, 5))
+        results = {section: [] for section in SECTIONS}
         
-        # Scrape Pelelangan Umum
-        logger.info("Scraping Pelelangan Umum section")
-        pelelangan_items = self.scrape_pelelangan_umum()
+        # Setiap record langsung diteruskan ke sink begitu halaman selesai di-parse
+        run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        sinks = [TenderStoreSink(self.tender_store(), run_id)]
+        if 'csv' in export:
+            sinks.append(CsvSink(self.data_dir, {section: config[2] for section, config in SECTIONS.items()}))
+        if 'json' in export:
+            sinks.append(JsonSink(os.path.join(self.data_dir, f"scraper_results_{run_id}.json"), SECTIONS))
+        if collect_results:
+            sinks.append(ResultSink(results))
+        if download_attachments:
+            watermark = self.watermark
+            # Attachment diunduh paralel oleh worker pool selama scraping masih berjalan
+            downloads = self._download_manager()
+            # Job yang tertunda atau gagal di run sebelumnya ikut diproses jika jadwal retry-nya sudah tiba
+            downloads.submit_due()
+            sinks.append(AttachmentSink(
+                downloads,
+                self._item_attachments,
+                skip=watermark.is_known if watermark else None
+            ))
+        if self.watermark:
+            sinks.append(WatermarkSink(self.watermark))
         
-        if pelelangan_items:
-            logger.info(f"Found {len(pelelangan_items)} Pelelangan Umum items")
-            
-            # Simpan ke CSV
-            csv_file = self._save_to_csv(pelelangan_items, 'pelelangan_umum')
-            logger.info(f"Saved Pelelangan Umum data to {csv_file}")
-            
-            # Download attachments jika diminta
-            if download_attachments:
-                logger.info("Downloading attachments for Pelelangan Umum")
-                for item in pelelangan_items:
-                    if 'attachments' in item and item['attachments']:
-                        try:
-                            attachments = item['attachments']
-                            if isinstance(attachments, str):
-                                try:
-                                    attachments = json.loads(attachments)
-                                except:
-                                    logger.warning(f"Failed to parse attachments JSON: {attachments}")
-                                    continue
-                                    
-                            if isinstance(attachments, list):
-                                for attachment in attachments:
-                                    if isinstance(attachment, dict) and 'url' in attachment:
-                                        self.download_attachment(attachment['url'], self.data_dir, 'pelelangan')
-                                        # Tambahkan delay antara download
-                                        time.sleep(random.uniform(1, 3))
-                        except Exception as e:
-                            logger.error(f"Error downloading attachment: {str(e)}")
-            
-            results['pelelangan'] = pelelangan_items
-        else:
-            logger.warning("No Pelelangan Umum data found")
+        pipeline = Pipeline(sinks, buffer_pages=self.pipeline_buffer, dedupe_key=TenderWatermark.fingerprint)
         
-        # Simpan hasil gabungan ke file JSON untuk referensi
+        self._open_parse_pool()
         try:
-            with open(os.path.join(self.data_dir, f"scraper_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"), 'w', encoding='utf-8') as f:
-                json.dump(results, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving results to JSON: {str(e)}")
+            if parallel_sections:
+                # Jalankan kedua section bersamaan; session dan jadwal request dari fetcher tetap dipakai bersama
+                logger.info("Scraping Undangan Prakualifikasi and Pelelangan Umum sections in parallel")
+            pipeline.run({section: partial(self._iter_section, section) for section in SECTIONS}, parallel=parallel_sections)
+        finally:
+            self._close_parse_pool()
+            # Chrome tetap hangat selama run; tutup agar tidak menganggur sampai jadwal berikutnya
+            self.browser_pool.close()
+        
+        if self.watermark:
+            self.watermark.save()
+        
+        # Mode debug full: tulis semua artefak yang terkumpul selama run
+        if self.debug_recorder.mode == 'full':
+            self.debug_recorder.flush("end of run")
+        
+        # Perbarui waktu kedaluwarsa cookie karena session baru saja dipakai
+        if self.session_valid:
+            self.session_store.save(self.session.cookies)
+        
+        stats = self.session.transport_stats()
+        logger.info(f"Transport stats: {stats['requests']} requests, {stats['new_connections']} new connections, "
+                    f"{stats['reused_connections']} reused connections")
         
         return results
         
-    def download_attachment(self, url, output_dir, category):
-        """Download attachment from URL"""
+    def tender_store(self):
+        """Return the tender store of the current data directory, importing old CSV snapshots into a new store"""
+        path = os.path.join(self.data_dir, self.config.get('output', 'database', fallback='tenders.db').strip())
+        if self._tender_store is None or self._tender_store.path != path:
+            self._tender_store = TenderStore(path)
+            if not self._tender_store.count():
+                self._tender_store.import_csv_snapshots(self.data_dir, {section: config[2] for section, config in SECTIONS.items()})
+        return self._tender_store
+    
+    def attachment_jobs(self):
+        """Return the persistent attachment job queue of the current data directory"""
+        path = os.path.join(self.data_dir, 'attachment_jobs.db')
+        if self._attachment_jobs is None or self._attachment_jobs.path != path:
+            self._attachment_jobs = AttachmentJobQueue.from_config(self.config, path)
+        return self._attachment_jobs
+    
+    def _download_manager(self):
+        """Build the download manager of one run, with a fresh download budget"""
+        # Anggaran hanya berlaku untuk download manager run ini, bukan untuk download on-demand (aplikasi web)
+        budget = DownloadBudget.from_config(self.config)
+        return DownloadManager.from_config(
+            self.config,
+            partial(self._download_section_attachment, budget=budget),
+            jobs=self.attachment_jobs(),
+            budget=budget,
+            breakers=self.breakers
+        )
+    
+    def drain_attachment_jobs(self):
+        """Download pending and due attachment jobs without scraping, return the download stats"""
+        if not self.session_valid and not self.initialize_session():
+            logger.error("Cannot download attachments without valid session")
+            return None
+        
+        downloads = self._download_manager()
+        try:
+            downloads.submit_due()
+        finally:
+            stats = downloads.close()
+            self.browser_pool.close()
+        return stats
+    
+    def _attachment_store(self, output_dir):
+        """Return the attachment store under output_dir/attachments, loading its manifest once"""
+        root = os.path.abspath(os.path.join(output_dir, 'attachments'))
+        with self._attachment_stores_lock:
+            store = self._attachment_stores.get(root)
+            if store is None:
+                store = AttachmentStore(root)
+                self._attachment_stores[root] = store
+            return store
+    
+    def download_attachment(self, url, output_dir, category, budget=None):
+        """Download attachment from URL, return the saved file path or False.
+
+        budget is the DownloadBudget of the download manager run; once it is
+        exhausted Chrome is not started for this attachment.
+        """
         if not url:
             logger.warning("Empty URL provided for attachment download")
             return False
@@ -1009,16 +1133,7 @@ path = data/
                 
             filename = urllib.parse.unquote(filename).replace('%20', '_')
             
-            # Create attachments directory if it doesn't exist
-            attachments_dir = os.path.join(output_dir, 'attachments', category)
-            os.makedirs(attachments_dir, exist_ok=True)
-            
-            output_path = os.path.join(attachments_dir, filename)
-            
-            # Cek apakah file sudah ada
-            if os.path.exists(output_path):
-                logger.info(f"File already exists: {output_path}")
-                return output_path
+            store = self._attachment_store(output_dir)
             
             # Extract file ID from URL
             file_id = None
@@ -1039,105 +1154,265 @@ path = data/
                     logger.warning(f"Could not extract file ID from URL: {url}")
                     # Tetap lanjutkan, mungkin URL sudah lengkap
             
-            # Try different URL formats
-            urls_to_try = [
-                url,  # Original URL
-                f"{self.base_url}/download/prakualifikasi/{file_id}/{filename}" if file_id else None,  # Format seen in browser
-                f"{self.base_url}/download/pelelangan/{file_id}/{filename}" if file_id else None,  # Format for pelelangan
-                f"{self.base_url}/download/tnd/ann.jwebs?fileId={file_id}&fileName={filename}" if file_id else None,  # URL with fileId and fileName
-                f"{self.base_url}/download/tnd/ann.jwebs?fileId={file_id}" if file_id else None,  # URL with just fileId
-                f"{self.base_url}/download/file?id={file_id}" if file_id else None,  # Alternative URL format
-                f"{self.base_url}/download/attachment?id={file_id}" if file_id else None,  # Another alternative
-                f"{self.base_url}/download/blob?id={file_id}" if file_id else None,  # Another format
-                f"{self.base_url}/download/file/blob?id={file_id}" if file_id else None  # Yet another format
-            ]
+            # Cek apakah file sudah ada di manifest
+            entry = store.get(category, filename, file_id, url)
+            if entry:
+                logger.info(f"Attachment already stored: {category}/{filename}")
+                return store.path(entry)
             
-            # Filter out None values
-            urls_to_try = [u for u in urls_to_try if u]
+            # File yang sama sudah diunduh untuk section lain; cukup tambahkan entri manifest tanpa download ulang
+            existing = store.find(file_id=file_id) if file_id else None
+            if existing:
+                logger.info(f"Attachment {filename} already stored under {existing['category']}, linking it to {category}")
+                return store.path(store.link(existing, category, filename, file_id, url))
             
-            # Tambahkan URL dari format yang terlihat di screenshot
-            if file_id:
-                # Format URL yang terlihat di screenshot untuk berbagai jenis dokumen
-                for doc_type in ['prakualifikasi', 'pelelangan', 'tender', 'pengumuman', 'hasil']:
-                    urls_to_try.append(f"{self.base_url}/download/{doc_type}/{file_id}/{filename}")
+            # File dari versi sebelumnya yang disimpan langsung di attachments/<kategori>/ dipindah ke store
+            legacy_path = os.path.join(output_dir, 'attachments', category, filename)
+            if os.path.isfile(legacy_path):
+                logger.info(f"Moving existing file {legacy_path} into the attachment store")
+                return store.path(store.put_file(legacy_path, category, filename, file_id, url, move=True))
             
-            success = False
-            for try_url in urls_to_try:
-                if not try_url:
-                    continue
-                    
-                try:
-                    logger.info(f"Trying to download from: {try_url}")
-                    
-                    # Add comprehensive headers to mimic browser behavior
-                    headers = {
-                        'Referer': f"{self.base_url}/index.jwebs",
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-                        'Accept-Encoding': 'gzip, deflate, br',
-                        'Accept-Language': 'en-US,en;q=0.9,id;q=0.8',
-                        'Connection': 'keep-alive',
-                        'Sec-Fetch-Dest': 'document',
-                        'Sec-Fetch-Mode': 'navigate',
-                        'Sec-Fetch-Site': 'same-origin',
-                        'Sec-Fetch-User': '?1',
-                        'Upgrade-Insecure-Requests': '1',
-                        'User-Agent': self.user_agent
-                    }
-                    
-                    # Ensure cookies are sent with the request
-                    cookies = self.session.cookies.get_dict()
-                    logger.info(f"Using cookies: {cookies}")
-                    
-                    # Download file with a longer timeout
-                    response = self.session.get(try_url, headers=headers, stream=True, timeout=60, allow_redirects=True)
-                    
-                    # Log response details for debugging
-                    logger.info(f"Response status: {response.status_code}, Content-Type: {response.headers.get('Content-Type', 'unknown')}, Content-Length: {response.headers.get('Content-Length', 'unknown')}")
-                    
-                    # Check if response is valid
-                    if response.status_code == 200:
-                        content_length = int(response.headers.get('Content-Length', 0))
-                        content_type = response.headers.get('Content-Type', '')
-                        
-                        # Check if it's likely a PDF or valid file
-                        is_valid_content = (
-                            ('application/pdf' in content_type) or 
-                            ('application/octet-stream' in content_type) or 
-                            (content_length > 10000 and content_length != 1384)  # Avoid error pages
-                        )
-                        
-                        if is_valid_content:
-                            # Save file
-                            filepath = os.path.join(attachments_dir, filename)
-                            with open(filepath, 'wb') as f:
-                                for chunk in response.iter_content(chunk_size=8192):
-                                    if chunk:
-                                        f.write(chunk)
-                                        
-                            logger.info(f"Attachment saved to {filepath}")
-                            success = True
-                            break
-                        else:
-                            logger.warning(f"Invalid content from {try_url}: Type={content_type}, Length={content_length}")
-                            # Save the response content for inspection
-                            error_path = os.path.join(self.data_dir, f"error_response_{file_id if file_id else 'unknown'}.html")
-                            with open(error_path, 'wb') as f:
-                                f.write(response.content)
-                            logger.info(f"Saved error response to {error_path}")
-                    else:
-                        logger.warning(f"Invalid response from {try_url}: Status {response.status_code}")
-                except Exception as e:
-                    logger.warning(f"Failed to download from {try_url}: {str(e)}")
-                    
+            # Kandidat URL diurutkan berdasarkan template yang paling sering berhasil untuk kategori ini
+            candidates = self.url_templates.candidates(category, url, self.base_url, file_id, filename)
+            
+            success = self._download_candidates(candidates, category, store, filename, file_id, url)
+            
+            # Chrome tidak dijalankan jika host sedang down atau anggaran download run ini sudah habis
+            use_browser = self.breakers.available(host_key(url)) and not (budget and budget.exhausted())
+            
+            # Cookie mungkin tidak dikenali server; ambil session baru dari Chrome lalu coba lagi lewat HTTP
+            if not success and use_browser and self.harvest_browser_session():
+                logger.info(f"Retrying {filename} over HTTP with browser session cookies")
+                success = self._download_candidates(candidates, category, store, filename, file_id, url)
+                
             if not success:
+                # Hanya respons error attachment ini yang ditulis; artefak lain tetap di buffer sampai akhir run
+                self.debug_recorder.flush(f"download failed for {filename}", failures_only=True)
+                if not use_browser or not self.breakers.allow('selenium'):
+                    logger.warning(f"Failed to download attachment {filename}, skipping Selenium while its host or Selenium keeps failing")
+                    return False
                 logger.warning(f"Failed to download attachment with regular methods, trying Selenium")
-                return self.download_attachment_with_selenium(url, output_dir, category, filename)
+                success = self.download_attachment_with_selenium(url, output_dir, category, filename)
+                if success:
+                    self.breakers.success('selenium')
+                else:
+                    self.breakers.failure('selenium')
                 
-            return True
+            return success
         except Exception as e:
             logger.error(f"Error downloading attachment: {str(e)}")
             return False
 
+    def _is_file_response(self, response):
+        """Check from the headers whether a response is likely the attachment and not an error page"""
+        content_type = response.headers.get('Content-Type', '')
+        content_length = int(response.headers.get('Content-Length', 0) or 0)
+        
+        # Respons ranged (206) membawa ukuran file lengkap di Content-Range: bytes 0-0/12345
+        total = response.headers.get('Content-Range', '').rpartition('/')[2]
+        if total.isdigit():
+            content_length = int(total)
+        
+        return (
+            ('application/pdf' in content_type) or 
+            ('application/octet-stream' in content_type) or 
+            (content_length > 10000 and content_length != 1384)  # Avoid error pages
+        )
+    
+    def _probe_attachment(self, url, headers):
+        """Cheaply check a candidate URL with HEAD, or a small ranged GET if HEAD is not allowed.
+
+        Returns True if the URL looks like it serves the file, False if the
+        server rejected it, or None if the host did not answer properly.
+        """
+        kind = None
+        host = host_key(url)
+        try:
+            response = self.session.head(url, headers=headers, timeout=self.probe_timeout, allow_redirects=True)
+            if response.status_code in (405, 501):
+                response = self.session.get(url, headers={**headers, 'Range': 'bytes=0-1023'}, stream=True, timeout=self.probe_timeout, allow_redirects=True)
+                # Server yang mengabaikan Range tetap hanya dibaca 1 KB pertama sebelum koneksi ditutup
+                if response.status_code in (200, 206):
+                    kind = sniff_content(next(response.iter_content(chunk_size=1024), b''))
+                response.close()
+        except Exception as e:
+            logger.info(f"Probe failed for {url}: {str(e)}")
+            self.breakers.failure(host)
+            return None
+        
+        # Host dianggap sehat selama menjawab tanpa error server
+        if response.status_code >= 500:
+            logger.info(f"Probe failed for {url}: Status {response.status_code}")
+            self.breakers.failure(host)
+            return None
+        self.breakers.success(host)
+        
+        if response.status_code not in (200, 206):
+            logger.info(f"Probe rejected {url}: Status {response.status_code}")
+            return False
+        if kind == 'html' or (kind is None and not self._is_file_response(response)):
+            logger.info(f"Probe rejected {url}: Type={response.headers.get('Content-Type', 'unknown')}")
+            return False
+        return True
+    
+    def _download_candidates(self, candidates, category, store, filename, file_id, url):
+        """Try each (template, URL) candidate over HTTP, store the first valid file and return its blob path, or None"""
+        # Add comprehensive headers to mimic browser behavior
+        headers = {
+            'Referer': f"{self.base_url}/index.jwebs",
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Language': 'en-US,en;q=0.9,id;q=0.8',
+            'Connection': 'keep-alive',
+            'Sec-Fetch-Dest': 'document',
+            'Sec-Fetch-Mode': 'navigate',
+            'Sec-Fetch-Site': 'same-origin',
+            'Sec-Fetch-User': '?1',
+            'Upgrade-Insecure-Requests': '1',
+            'User-Agent': self.user_agent
+        }
+        
+        # URL dengan download yang terputus di percobaan sebelumnya dicoba lebih dulu agar bisa dilanjutkan
+        partial = store.partial(store.entry_key(category, filename, file_id, url))
+        candidates = sorted(candidates, key=lambda candidate: not partial.can_resume(candidate[1]))
+        
+        try:
+            for template, try_url in candidates:
+                # Template atau host yang terus gagal dilewati tanpa request sampai breaker-nya half-open
+                if not self.breakers.allow(host_key(try_url), template_key(template)):
+                    logger.debug(f"Circuit open, skipping {try_url} ({template})")
+                    continue
+                try:
+                    # Template yang terbukti berhasil langsung diunduh; yang lain dicek dulu dengan probe murah
+                    probed = self.url_templates.is_trusted(category, template) or self._probe_attachment(try_url, headers)
+                    if not probed:
+                        self.url_templates.record(category, template, False)
+                        # Gangguan host hanya dihitung di breaker host, bukan di breaker template
+                        if probed is False:
+                            self.breakers.failure(template_key(template))
+                        continue
+                    
+                    logger.info(f"Trying to download from: {try_url} ({template})")
+                    filepath = self._fetch_attachment(try_url, headers, partial, category, store, filename, file_id, url)
+                    if filepath:
+                        self.url_templates.record(category, template, True)
+                        self.breakers.success(template_key(template))
+                        return filepath
+                    if partial.can_resume(try_url):
+                        # Template mengirim file yang benar tetapi transfernya terputus; bukan kegagalan template
+                        continue
+                except Exception as e:
+                    logger.warning(f"Failed to download from {try_url}: {str(e)}")
+                    self.breakers.failure(host_key(try_url))
+                    self.url_templates.record(category, template, False)
+                    continue
+                self.url_templates.record(category, template, False)
+                self.breakers.failure(template_key(template))
+        finally:
+            self.url_templates.save()
+        
+        return None
+    
+    def _fetch_attachment(self, try_url, headers, partial, category, store, filename, file_id, url):
+        """Download one candidate URL into a resumable .part file and store it once complete.
+
+        An interrupted transfer is resumed with a Range request (guarded by
+        If-Range) up to resume_attempts times, and later runs pick up the same
+        .part file. The file only reaches the store after its size (and
+        checksum, if the server sends one) has been verified. Returns the blob
+        path, or None if the URL did not serve a complete valid file.
+        """
+        for _ in range(self.resume_attempts + 1):
+            request_headers = dict(headers)
+            offset = partial.size if partial.can_resume(try_url) else 0
+            if offset:
+                request_headers['Range'] = f"bytes={offset}-"
+                if partial.meta.get('validator'):
+                    # Jika file di server sudah berubah, server mengirim file lengkap (200) alih-alih potongan
+                    request_headers['If-Range'] = partial.meta['validator']
+            
+            # Download file with the longer download read timeout
+            response = self.session.get(try_url, headers=request_headers, stream=True, timeout=self.download_timeout, allow_redirects=True)
+            
+            # Log response details for debugging
+            logger.info(f"Response status: {response.status_code}, Content-Type: {response.headers.get('Content-Type', 'unknown')}, Content-Length: {response.headers.get('Content-Length', 'unknown')}")
+            if response.status_code >= 500:
+                self.breakers.failure(host_key(try_url))
+            else:
+                self.breakers.success(host_key(try_url))
+            
+            body = None
+            if response.status_code == 416 and offset:
+                # Semua byte sudah ada (misalnya proses berhenti sebelum file disimpan ke store)
+                response.close()
+                if not partial.is_complete():
+                    partial.discard()
+                    continue
+            elif response.status_code == 206 and offset:
+                start = response.headers.get('Content-Range', '').partition(' ')[2].partition('-')[0]
+                if start != str(offset) or not self._is_file_response(response):
+                    response.close()
+                    partial.discard()
+                    continue
+                logger.info(f"Resuming download of {filename} at byte {offset}")
+                body = response.iter_content(chunk_size=8192)
+            elif response.status_code == 200:
+                # Cek magic bytes di chunk pertama; halaman error HTML ditolak tanpa mengunduh sisa body
+                chunks = response.iter_content(chunk_size=8192)
+                try:
+                    first = next(chunks, b'')
+                except requests.exceptions.RequestException as e:
+                    logger.warning(f"Download of {filename} failed before the first chunk: {str(e)}")
+                    response.close()
+                    continue
+                kind = sniff_content(first)
+                if kind == 'html' or (kind is None and not self._is_file_response(response)):
+                    logger.warning(f"Invalid content from {try_url}: Type={response.headers.get('Content-Type', '')}, Length={response.headers.get('Content-Length', 0)}, starts with {first[:16]!r}")
+                    # Simpan hanya chunk pertama respons error di buffer debug untuk inspeksi
+                    self.debug_recorder.record(f"error_response_{file_id if file_id else 'unknown'}.html", first, failure=True)
+                    response.close()
+                    return None
+                
+                # Offset hanya berarti jika isi tidak di-encode ulang (gzip) oleh server
+                encoded = response.headers.get('Content-Encoding', 'identity').lower() not in ('', 'identity')
+                length = response.headers.get('Content-Length', '')
+                total = int(length) if length.isdigit() and not encoded else None
+                etag = response.headers.get('ETag', '')
+                validator = etag if etag and not etag.startswith('W/') else response.headers.get('Last-Modified')
+                resumable = bool(total) and response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+                partial.start(try_url, validator=validator, total=total, resumable=resumable, expected=expected_digests(response.headers))
+                body = itertools.chain([first], chunks)
+            else:
+                logger.warning(f"Invalid response from {try_url}: Status {response.status_code}")
+                response.close()
+                return None
+            
+            if body is not None:
+                try:
+                    partial.append(body)
+                except requests.exceptions.RequestException as e:
+                    logger.warning(f"Download of {filename} interrupted at {partial.size} bytes: {str(e)}")
+                    self.breakers.failure(host_key(try_url))
+                    continue
+                finally:
+                    response.close()
+            
+            if partial.meta.get('total') and not partial.is_complete():
+                logger.warning(f"Download of {filename} ended at {partial.size} of {partial.meta['total']} bytes")
+                continue
+            
+            # Simpan ke store setelah ukuran dan checksum cocok; file dipindahkan ke blob dengan rename
+            entry = store.commit_partial(partial, category, filename, file_id, url)
+            if not entry:
+                return None
+            filepath = store.path(entry)
+            logger.info(f"Attachment {filename} saved to {filepath}")
+            return filepath
+        
+        if partial.can_resume(try_url):
+            logger.warning(f"Giving up on {filename} for now, {partial.size} bytes kept for the next attempt")
+        return None
+    
     def download_attachment_with_selenium(self, url, output_dir, category, filename=None):
         """Download attachment using Selenium as a fallback method"""
         if not filename and 'fileName=' in url:
@@ -1150,232 +1425,191 @@ path = data/
         
         filename = urllib.parse.unquote(filename).replace('%20', '_')
         
-        # Create attachments directory if it doesn't exist
-        attachments_dir = os.path.join(output_dir, 'attachments', category)
-        os.makedirs(attachments_dir, exist_ok=True)
-        
-        # Setup Chrome options
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument(f"user-agent={self.user_agent}")
-        
-        # Set download preferences
-        temp_dir = tempfile.mkdtemp()
-        prefs = {
-            "download.default_directory": temp_dir,
-            "download.prompt_for_download": False,
-            "download.directory_upgrade": True,
-            "plugins.always_open_pdf_externally": True
-        }
-        chrome_options.add_experimental_option("prefs", prefs)
+        store = self._attachment_store(output_dir)
         
-        driver = None
         try:
-            logger.info(f"Selenium: Starting Chrome to download {url}")
-            # Gunakan webdriver-manager untuk mengelola driver Chrome
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-            
-            # First, visit the main page to get cookies
-            driver.get(self.base_url)
-            logger.info(f"Selenium: Visited main page: {self.base_url}")
-            time.sleep(3)  # Wait for page to load
-            
-            # Coba login jika ada form login
-            try:
-                username_field = driver.find_element(By.ID, "username")
-                password_field = driver.find_element(By.ID, "password")
-                login_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
+            logger.info(f"Selenium: Leasing Chrome to download {url}")
+            # Chrome dari pool punya direktori download sendiri yang dikosongkan saat dikembalikan
+            with self.browser_pool.lease() as browser:
+                driver = browser.driver
+                temp_dir = browser.download_dir
                 
-                if username_field and password_field and login_button:
-                    logger.info("Selenium: Found login form, attempting to login")
-                    username_field.send_keys(self.config['scraper'].get('username', ''))
-                    password_field.send_keys(self.config['scraper'].get('password', ''))
-                    login_button.click()
-                    time.sleep(3)  # Wait for login to complete
-            except Exception as e:
-                logger.info(f"Selenium: No login form found or login failed: {str(e)}")
-            
-            # Ekstrak file_id dari URL jika ada
-            file_id = None
-            if 'fileId=' in url:
-                file_id = url.split('fileId=')[1].split('&')[0] if '&' in url.split('fileId=')[1] else url.split('fileId=')[1]
-            elif '/download/' in url and '/' in url.split('/download/')[1]:
-                parts = url.split('/download/')[1].split('/')
-                if len(parts) >= 2:
-                    file_id = parts[1]
-                    if '?' in file_id:
-                        file_id = file_id.split('?')[0]
-            
-            # Jika kita memiliki file_id, coba akses halaman detail tender terlebih dahulu
-            if file_id:
-                try:
-                    # Coba akses halaman detail tender
-                    detail_url = f"{self.base_url}/detail/{file_id}"
-                    logger.info(f"Selenium: Trying to access detail page: {detail_url}")
-                    driver.get(detail_url)
-                    time.sleep(5)  # Wait for page to load
-                    
-                    # Cari tombol "Lebih lanjut" dan klik
-                    lebih_lanjut_buttons = driver.find_elements(By.XPATH, "//a[contains(text(), 'Lebih lanjut')]")
-                    if not lebih_lanjut_buttons:
-                        lebih_lanjut_buttons = driver.find_elements(By.XPATH, "//button[contains(text(), 'Lebih lanjut')]")
-                    
-                    if lebih_lanjut_buttons:
-                        logger.info(f"Selenium: Found {len(lebih_lanjut_buttons)} 'Lebih lanjut' buttons")
-                        for button in lebih_lanjut_buttons:
-                            try:
-                                logger.info("Selenium: Clicking 'Lebih lanjut' button")
-                                button.click()
-                                time.sleep(3)
-                                break
-                            except Exception as e:
-                                logger.warning(f"Selenium: Error clicking 'Lebih lanjut' button: {str(e)}")
-                    
-                    # Cari link attachment dan klik
-                    attachment_links = driver.find_elements(By.XPATH, "//a[contains(text(), 'Attachment')]")
-                    if attachment_links:
-                        logger.info(f"Selenium: Found {len(attachment_links)} attachment links")
-                        for link in attachment_links:
-                            try:
-                                href = link.get_attribute("href")
-                                logger.info(f"Selenium: Clicking attachment link with href: {href}")
-                                link.click()
-                                time.sleep(5)
-                                break
-                            except Exception as e:
-                                logger.warning(f"Selenium: Error clicking attachment link: {str(e)}")
-                except Exception as e:
-                    logger.warning(f"Selenium: Error accessing detail page: {str(e)}")
-            
-            # Now try to download the file directly
-            logger.info(f"Selenium: Attempting to download: {url}")
-            driver.get(url)
-            time.sleep(5)  # Wait for download to start
-            
-            # Check if we're on a download page or a 404 page
-            if "404" in driver.title or "Not Found" in driver.page_source:
-                logger.warning(f"Selenium: 404 page encountered for {url}")
+                # First, visit the main page to get cookies
+                self._add_delay()
+                driver.get(self.base_url)
+                logger.info(f"Selenium: Visited main page: {self.base_url}")
+                self.browser_waits.page_load(driver)
                 
-                # Try to find and click any download links on the page
-                logger.info("Selenium: Trying download strategy 1")
-                download_links = driver.find_elements(By.CSS_SELECTOR, "a[href*='download']")
-                logger.info(f"Selenium: Found {len(download_links)} potential download links")
+                # Coba login jika ada form login
+                self._browser_login(driver)
                 
-                for link in download_links:
-                    try:
-                        href = link.get_attribute("href")
-                        text = link.text
-                        logger.info(f"Selenium: Clicking download link - Text: {text}, Href: {href}")
-                        link.click()
-                        time.sleep(3)
-                        break
-                    except Exception as e:
-                        logger.warning(f"Selenium: Error clicking download link: {str(e)}")
-            
-            # Jika tidak ada link download, coba cari tombol "Lebih lanjut"
-            if len(download_links) == 0:
-                logger.info("Selenium: Trying to find 'Lebih lanjut' buttons")
-                lebih_lanjut_buttons = driver.find_elements(By.XPATH, "//button[contains(text(), 'Lebih lanjut')]")
-                if not lebih_lanjut_buttons:
-                    lebih_lanjut_buttons = driver.find_elements(By.XPATH, "//a[contains(text(), 'Lebih lanjut')]")
+                # File yang sudah selesai diunduh Chrome; setiap langkah berikut dilewati setelah ada file
+                downloaded_files = []
                 
-                logger.info(f"Selenium: Found {len(lebih_lanjut_buttons)} 'Lebih lanjut' buttons")
+                # Ekstrak file_id dari URL jika ada
+                file_id = None
+                if 'fileId=' in url:
+                    file_id = url.split('fileId=')[1].split('&')[0] if '&' in url.split('fileId=')[1] else url.split('fileId=')[1]
+                elif '/download/' in url and '/' in url.split('/download/')[1]:
+                    parts = url.split('/download/')[1].split('/')
+                    if len(parts) >= 2:
+                        file_id = parts[1]
+                        if '?' in file_id:
+                            file_id = file_id.split('?')[0]
                 
-                for button in lebih_lanjut_buttons:
+                # Jika kita memiliki file_id, coba akses halaman detail tender terlebih dahulu
+                if file_id:
                     try:
-                        logger.info(f"Selenium: Clicking 'Lebih lanjut' button")
-                        button.click()
-                        time.sleep(3)
+                        # Coba akses halaman detail tender
+                        detail_url = f"{self.base_url}/detail/{file_id}"
+                        logger.info(f"Selenium: Trying to access detail page: {detail_url}")
+                        self._add_delay()
+                        driver.get(detail_url)
+                        self.browser_waits.page_load(driver)
                         
-                        # Setelah klik, cari link download lagi
-                        download_links = driver.find_elements(By.CSS_SELECTOR, "a[href*='download']")
-                        attachment_links = driver.find_elements(By.XPATH, "//a[contains(text(), 'Attachment')]")
-                        all_links = download_links + attachment_links
-                        
-                        logger.info(f"Selenium: Found {len(all_links)} download/attachment links after clicking 'Lebih lanjut'")
+                        # Cari tombol "Lebih lanjut" dan klik
+                        lebih_lanjut_buttons = driver.find_elements(By.XPATH, "//a[contains(text(), 'Lebih lanjut')]")
+                        if not lebih_lanjut_buttons:
+                            lebih_lanjut_buttons = driver.find_elements(By.XPATH, "//button[contains(text(), 'Lebih lanjut')]")
                         
-                        for link in all_links:
-                            try:
-                                href = link.get_attribute("href")
-                                text = link.text
-                                logger.info(f"Selenium: Clicking link - Text: {text}, Href: {href}")
-                                link.click()
-                                time.sleep(3)
-                                break
-                            except Exception as e:
-                                logger.warning(f"Selenium: Error clicking link: {str(e)}")
+                        if lebih_lanjut_buttons:
+                            logger.info(f"Selenium: Found {len(lebih_lanjut_buttons)} 'Lebih lanjut' buttons")
+                            for button in lebih_lanjut_buttons:
+                                try:
+                                    logger.info("Selenium: Clicking 'Lebih lanjut' button")
+                                    button.click()
+                                    self.browser_waits.element(driver, (By.XPATH, "//a[contains(text(), 'Attachment')]"))
+                                    break
+                                except Exception as e:
+                                    logger.warning(f"Selenium: Error clicking 'Lebih lanjut' button: {str(e)}")
                         
-                        break
+                        # Cari link attachment dan klik
+                        attachment_links = driver.find_elements(By.XPATH, "//a[contains(text(), 'Attachment')]")
+                        if attachment_links:
+                            logger.info(f"Selenium: Found {len(attachment_links)} attachment links")
+                            for link in attachment_links:
+                                try:
+                                    href = link.get_attribute("href")
+                                    logger.info(f"Selenium: Clicking attachment link with href: {href}")
+                                    link.click()
+                                    downloaded_files = self.browser_waits.download(temp_dir)
+                                    break
+                                except Exception as e:
+                                    logger.warning(f"Selenium: Error clicking attachment link: {str(e)}")
                     except Exception as e:
-                        logger.warning(f"Selenium: Error clicking 'Lebih lanjut' button: {str(e)}")
-            
-            # Wait for download to complete
-            time.sleep(10)
-            
-            # Check if file was downloaded
-            downloaded_files = os.listdir(temp_dir)
-            logger.info(f"Selenium: Files in download directory: {downloaded_files}")
-            
-            if downloaded_files:
-                # Move the first downloaded file to the attachments directory
-                downloaded_file = os.path.join(temp_dir, downloaded_files[0])
-                target_file = os.path.join(attachments_dir, filename)
+                        logger.warning(f"Selenium: Error accessing detail page: {str(e)}")
+                
+                # Now try to download the file directly
+                if not downloaded_files:
+                    logger.info(f"Selenium: Attempting to download: {url}")
+                    self._add_delay()
+                    driver.get(url)
+                    downloaded_files = self.browser_waits.download(temp_dir)
                 
-                with open(downloaded_file, 'rb') as src, open(target_file, 'wb') as dst:
-                    dst.write(src.read())
+                # Check if we're on a download page or a 404 page
+                download_links = []
+                if not downloaded_files and ("404" in driver.title or "Not Found" in driver.page_source):
+                    logger.warning(f"Selenium: 404 page encountered for {url}")
                     
-                logger.info(f"Selenium: Successfully downloaded file to {target_file}")
-                return True
-            else:
-                logger.warning("Selenium: No files were downloaded")
+                    # Try to find and click any download links on the page
+                    logger.info("Selenium: Trying download strategy 1")
+                    download_links = driver.find_elements(By.CSS_SELECTOR, "a[href*='download']")
+                    logger.info(f"Selenium: Found {len(download_links)} potential download links")
+                    
+                    for link in download_links:
+                        try:
+                            href = link.get_attribute("href")
+                            text = link.text
+                            logger.info(f"Selenium: Clicking download link - Text: {text}, Href: {href}")
+                            link.click()
+                            downloaded_files = self.browser_waits.download(temp_dir)
+                            break
+                        except Exception as e:
+                            logger.warning(f"Selenium: Error clicking download link: {str(e)}")
                 
-                # Coba ambil konten halaman jika mungkin berisi PDF inline
-                try:
-                    page_source = driver.page_source
-                    if 'application/pdf' in page_source or '<embed' in page_source or '<iframe' in page_source:
-                        logger.info("Selenium: Page might contain inline PDF, trying to extract")
-                        
-                        # Coba cari iframe atau embed yang berisi PDF
-                        pdf_elements = driver.find_elements(By.XPATH, "//iframe[contains(@src, '.pdf')] | //embed[contains(@src, '.pdf')]")
-                        
-                        if pdf_elements:
-                            for elem in pdf_elements:
-                                pdf_url = elem.get_attribute("src")
-                                if pdf_url:
-                                    logger.info(f"Selenium: Found PDF URL in iframe/embed: {pdf_url}")
-                                    
-                                    # Download PDF dari URL yang ditemukan
-                                    try:
-                                        pdf_response = self.session.get(pdf_url, headers=headers, stream=True, timeout=30)
-                                        if pdf_response.status_code == 200 and ('application/pdf' in pdf_response.headers.get('Content-Type', '')):
-                                            target_file = os.path.join(attachments_dir, filename)
-                                            with open(target_file, 'wb') as f:
-                                                for chunk in pdf_response.iter_content(chunk_size=8192):
-                                                    if chunk:
-                                                        f.write(chunk)
-                                            logger.info(f"Selenium: Successfully downloaded inline PDF to {target_file}")
-                                            return True
-                                    except Exception as e:
-                                        logger.warning(f"Selenium: Error downloading inline PDF: {str(e)}")
-                except Exception as e:
-                    logger.warning(f"Selenium: Error checking for inline PDF: {str(e)}")
+                # Jika tidak ada link download, coba cari tombol "Lebih lanjut"
+                if not downloaded_files and len(download_links) == 0:
+                    logger.info("Selenium: Trying to find 'Lebih lanjut' buttons")
+                    lebih_lanjut_buttons = driver.find_elements(By.XPATH, "//button[contains(text(), 'Lebih lanjut')]")
+                    if not lebih_lanjut_buttons:
+                        lebih_lanjut_buttons = driver.find_elements(By.XPATH, "//a[contains(text(), 'Lebih lanjut')]")
+                    
+                    logger.info(f"Selenium: Found {len(lebih_lanjut_buttons)} 'Lebih lanjut' buttons")
+                    
+                    for button in lebih_lanjut_buttons:
+                        try:
+                            logger.info(f"Selenium: Clicking 'Lebih lanjut' button")
+                            button.click()
+                            self.browser_waits.element(driver, (By.XPATH, "//a[contains(@href, 'download')] | //a[contains(text(), 'Attachment')]"))
+                            
+                            # Setelah klik, cari link download lagi
+                            download_links = driver.find_elements(By.CSS_SELECTOR, "a[href*='download']")
+                            attachment_links = driver.find_elements(By.XPATH, "//a[contains(text(), 'Attachment')]")
+                            all_links = download_links + attachment_links
+                            
+                            logger.info(f"Selenium: Found {len(all_links)} download/attachment links after clicking 'Lebih lanjut'")
+                            
+                            for link in all_links:
+                                try:
+                                    href = link.get_attribute("href")
+                                    text = link.text
+                                    logger.info(f"Selenium: Clicking link - Text: {text}, Href: {href}")
+                                    link.click()
+                                    downloaded_files = self.browser_waits.download(temp_dir)
+                                    break
+                                except Exception as e:
+                                    logger.warning(f"Selenium: Error clicking link: {str(e)}")
+                            
+                            break
+                        except Exception as e:
+                            logger.warning(f"Selenium: Error clicking 'Lebih lanjut' button: {str(e)}")
                 
-                return False
+                # Tunggu download yang dipicu langkah terakhir, jika belum selesai
+                if not downloaded_files:
+                    downloaded_files = self.browser_waits.download(temp_dir)
+                logger.info(f"Selenium: Files in download directory: {[os.path.basename(path) for path in downloaded_files]}")
                 
+                if downloaded_files:
+                    # Pindahkan file pertama ke store tanpa membaca seluruh isinya ke memori
+                    entry = store.put_file(downloaded_files[0], category, filename, file_id, url, move=True)
+                    target_file = store.path(entry)
+                    
+                    logger.info(f"Selenium: Successfully downloaded file to {target_file}")
+                    return target_file
+                else:
+                    logger.warning("Selenium: No files were downloaded")
+                    
+                    # Coba ambil konten halaman jika mungkin berisi PDF inline
+                    try:
+                        page_source = driver.page_source
+                        if 'application/pdf' in page_source or '<embed' in page_source or '<iframe' in page_source:
+                            logger.info("Selenium: Page might contain inline PDF, trying to extract")
+                            
+                            # Coba cari iframe atau embed yang berisi PDF
+                            pdf_elements = driver.find_elements(By.XPATH, "//iframe[contains(@src, '.pdf')] | //embed[contains(@src, '.pdf')]")
+                            
+                            if pdf_elements:
+                                for elem in pdf_elements:
+                                    pdf_url = elem.get_attribute("src")
+                                    if pdf_url:
+                                        logger.info(f"Selenium: Found PDF URL in iframe/embed: {pdf_url}")
+                                        
+                                        # Download PDF dari URL yang ditemukan
+                                        try:
+                                            pdf_response = self.session.get(pdf_url, stream=True, timeout=self.download_timeout)
+                                            if pdf_response.status_code == 200 and ('application/pdf' in pdf_response.headers.get('Content-Type', '')):
+                                                entry = store.put_stream(pdf_response.iter_content(chunk_size=8192), category, filename, file_id, url)
+                                                target_file = store.path(entry)
+                                                logger.info(f"Selenium: Successfully downloaded inline PDF to {target_file}")
+                                                return target_file
+                                        except Exception as e:
+                                            logger.warning(f"Selenium: Error downloading inline PDF: {str(e)}")
+                    except Exception as e:
+                        logger.warning(f"Selenium: Error checking for inline PDF: {str(e)}")
+                    
+                    return False
+
+        
         except Exception as e:
             logger.error(f"Selenium: Error downloading file: {str(e)}")
-            return False
-        finally:
-            if driver:
-                driver.quit()
-            
-            # Clean up temp directory
-            try:
-                import shutil
-                shutil.rmtree(temp_dir)
-            except Exception as e:
-                logger.warning(f"Selenium: Error cleaning up temp directory: {str(e)}") 
\ No newline at end of file
+            return False 
\ No newline at end of file
@@ -0,0 +1,100 @@
+import gzip
+import logging
+import os
+import random
+import re
+import threading
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEBUG_MODES = ('off', 'sampled', 'full')
+
+class DebugRecorder:
+    """Opt-in, size-bounded in-memory capture of raw responses for inspecting failures"""
+
+    def __init__(self, mode='off', directory='logs/debug', max_bytes=5 * 1024 * 1024, sample_rate=0.1):
+        if mode not in DEBUG_MODES:
+            logger.warning(f"Unknown debug mode '{mode}', using 'off'")
+            mode = 'off'
+
+        self.mode = mode
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.sample_rate = sample_rate
+
+        # Ring buffer berisi (waktu, nama, isi terkompresi, gagal?) dengan batas total byte
+        self._buffer = deque()
+        self._buffer_bytes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a recorder from the [debug] section of config.ini"""
+        return cls(
+            mode=config.get('debug', 'mode', fallback='off').strip().lower(),
+            directory=config.get('debug', 'directory', fallback='logs/debug'),
+            max_bytes=config.getint('debug', 'max_bytes', fallback=5 * 1024 * 1024),
+            sample_rate=config.getfloat('debug', 'sample_rate', fallback=0.1),
+        )
+
+    def record(self, name, content, failure=False):
+        """Compress and keep an artifact; failures are always kept unless the recorder is off"""
+        if self.mode == 'off':
+            return False
+        if self.mode == 'sampled' and not failure and random.random() >= self.sample_rate:
+            return False
+
+        if isinstance(content, str):
+            content = content.encode('utf-8', errors='replace')
+        data = gzip.compress(content or b'')
+
+        if len(data) > self.max_bytes:
+            logger.warning(f"Debug artifact {name} is larger than the debug byte budget, skipping")
+            return False
+
+        with self._lock:
+            self._buffer.append((datetime.now(), name, data, failure))
+            self._buffer_bytes += len(data)
+
+            # Buang artefak paling lama jika melebihi anggaran byte
+            while self._buffer_bytes > self.max_bytes:
+                _, _, old_data, _ = self._buffer.popleft()
+                self._buffer_bytes -= len(old_data)
+
+        return True
+
+    def flush(self, reason=None, failures_only=False):
+        """Write the buffered artifacts to the debug directory and remove them from the buffer.
+
+        With failures_only only the artifacts recorded as failures are
+        written, and the other artifacts stay buffered for a later flush.
+        """
+        with self._lock:
+            if failures_only:
+                entries = [entry for entry in self._buffer if entry[3]]
+                self._buffer = deque(entry for entry in self._buffer if not entry[3])
+                self._buffer_bytes = sum(len(entry[2]) for entry in self._buffer)
+            else:
+                entries = list(self._buffer)
+                self._buffer.clear()
+                self._buffer_bytes = 0
+
+        if not entries:
+            return []
+
+        paths = []
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for recorded_at, name, data, _ in entries:
+                safe_name = re.sub(r'[^\w.-]+', '_', name)
+                path = os.path.join(self.directory, f"{recorded_at.strftime('%Y%m%d_%H%M%S_%f')}_{safe_name}.gz")
+                with open(path, 'wb') as f:
+                    f.write(data)
+                paths.append(path)
+            logger.info(f"Wrote {len(paths)} debug artifacts to {self.directory}" + (f" ({reason})" if reason else ""))
+        except Exception as e:
+            logger.error(f"Error writing debug artifacts: {str(e)}")
+
+        return paths
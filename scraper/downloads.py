@@ -0,0 +1,181 @@
+import logging
+import os
+import queue
+import threading
+import time
+import urllib.parse
+
+from .breakers import host_key
+
+logger = logging.getLogger(__name__)
+
+# Penanda berhenti untuk worker
+_STOP = object()
+
+class DownloadManager:
+    """Download attachments on a worker pool with per-host concurrency caps.
+
+    Jobs are deduplicated by key (AttachmentSink uses section and file_id)
+    and can be submitted while scraping is still running; submit blocks
+    once max_pending jobs are waiting. download(section, url) must return the saved file path (or
+    another truthy value) on success. Requests made by download share the
+    scraper's session, so they also pass through its rate limiter.
+
+    With a persistent job queue, keys finished by earlier runs or still
+    waiting for their retry time are skipped, and every outcome is recorded
+    in the queue. Once the run's budget is exhausted, or while the circuit
+    breaker of a job's host is open, jobs are deferred: they go back to
+    pending without counting an attempt.
+    """
+
+    def __init__(self, download, workers=4, per_host=2, max_pending=100, jobs=None, budget=None, breakers=None):
+        self.download = download
+        self.jobs = jobs
+        self.budget = budget
+        self.breakers = breakers
+        self.workers = max(1, workers)
+        self.per_host = max(1, per_host)
+
+        self._jobs = queue.Queue(maxsize=max(1, max_pending))
+        self._seen = set()
+        self._host_slots = {}
+        self._lock = threading.Lock()
+        self._threads = []
+
+        self.stats = {'queued': 0, 'duplicates': 0, 'skipped': 0, 'done': 0, 'failed': 0, 'deferred': 0, 'bytes': 0}
+        self._started_at = None
+
+    @classmethod
+    def from_config(cls, config, download, jobs=None, budget=None, breakers=None):
+        """Build a manager from the [downloads] section of config.ini"""
+        return cls(
+            download,
+            workers=config.getint('downloads', 'workers', fallback=4),
+            per_host=config.getint('downloads', 'per_host', fallback=2),
+            max_pending=config.getint('downloads', 'max_pending', fallback=100),
+            jobs=jobs,
+            budget=budget,
+            breakers=breakers,
+        )
+
+    def _start(self):
+        # Worker baru dijalankan saat job pertama masuk
+        self._started_at = time.time()
+        if self.budget is not None:
+            self.budget.start()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f'download-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _host_slot(self, url):
+        host = urllib.parse.urlparse(url).netloc.lower()
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host)
+                self._host_slots[host] = slot
+            return slot
+
+    def submit(self, section, url, key=None):
+        """Queue one attachment download, return False if the same key was already queued"""
+        if not url:
+            return False
+
+        key = key or url
+        with self._lock:
+            if key in self._seen:
+                self.stats['duplicates'] += 1
+                return False
+            self._seen.add(key)
+
+        # Job yang sudah selesai di run sebelumnya atau masih menunggu jadwal retry tidak diminta ulang
+        if self.jobs is not None and not self.jobs.claim(section, url, key):
+            with self._lock:
+                self.stats['skipped'] += 1
+            return False
+
+        with self._lock:
+            self.stats['queued'] += 1
+            if not self._threads:
+                self._start()
+
+        self._jobs.put((section, url, key))
+        return True
+
+    def submit_due(self):
+        """Queue the jobs of earlier runs that are pending or due for a retry, return how many were queued"""
+        if self.jobs is None:
+            return 0
+        due = self.jobs.due()
+        if due:
+            logger.info(f"Retrying {len(due)} attachment downloads left over from earlier runs")
+        return sum(1 for section, url, key in due if self.submit(section, url, key=key))
+
+    def _should_defer(self, url):
+        if self.budget is not None and self.budget.exhausted():
+            return True
+        # Host yang sedang down tidak dicoba; job ditunda ke run berikutnya
+        return self.breakers is not None and not self.breakers.available(host_key(url))
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is _STOP:
+                return
+
+            section, url, key = job
+            if self._should_defer(url):
+                if self.jobs is not None:
+                    self.jobs.release(key)
+                with self._lock:
+                    self.stats['deferred'] += 1
+                continue
+
+            started = time.time()
+            result = None
+            error = None
+            with self._host_slot(url):
+                try:
+                    result = self.download(section, url)
+                except Exception as e:
+                    error = str(e)
+                    logger.error(f"Error downloading attachment {url}: {error}")
+
+            if self.jobs is not None:
+                if result:
+                    self.jobs.complete(key, result)
+                else:
+                    self.jobs.fail(key, error or 'download failed')
+            if not result and self.budget is not None:
+                self.budget.record_failure()
+
+            with self._lock:
+                if result:
+                    self.stats['done'] += 1
+                    # Hanya hitung file yang benar-benar ditulis oleh job ini, bukan file yang sudah ada
+                    if isinstance(result, str) and os.path.isfile(result) and os.path.getmtime(result) >= started - 1:
+                        self.stats['bytes'] += os.path.getsize(result)
+                else:
+                    self.stats['failed'] += 1
+
+    def close(self):
+        """Wait for all queued downloads to finish and log throughput"""
+        for _ in self._threads:
+            self._jobs.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+        if self._threads:
+            elapsed = max(time.time() - self._started_at, 1e-6)
+            stats = self.stats
+            logger.info(
+                f"Downloaded {stats['done']} attachments ({stats['failed']} failed, {stats['deferred']} deferred, "
+                f"{stats['duplicates']} duplicates and {stats['skipped']} finished or backed-off jobs skipped), "
+                f"{stats['bytes'] / 1024:.0f} KB in {elapsed:.1f}s "
+                f"({stats['bytes'] / elapsed / 1024:.1f} KB/s, {stats['done'] / elapsed:.2f} files/s)"
+            )
+        self._threads = []
+        if self.jobs is not None:
+            logger.info(f"Attachment job queue: {self.jobs.counts()}")
+        return self.stats
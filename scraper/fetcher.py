@@ -0,0 +1,38 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+class PageFetcher:
+    """Fetch tnd.jwebs result pages concurrently over a shared requests session"""
+
+    def __init__(self, session, max_workers=3):
+        # Jarak antar request diatur oleh rate limiter pada session yang dipakai bersama
+        self.session = session
+        self.max_workers = max(1, int(max_workers))
+
+    def _post(self, url, payload):
+        """Send a single POST through the shared session"""
+        logger.info(f"Fetching {url} page {payload.get('d-1789-p', '?')}")
+        return self.session.post(url, data=payload)
+
+    def fetch_pages(self, url, payloads):
+        """POST every payload concurrently and return the responses in payload order"""
+        if not payloads:
+            return []
+
+        workers = min(self.max_workers, len(payloads))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # executor.map mempertahankan urutan input, sehingga hasil tetap urut per halaman
+            return list(executor.map(lambda payload: self._post(url, payload), payloads))
+
+    def iter_pages(self, url, payloads):
+        """POST every payload concurrently and yield (index, response) as each one completes"""
+        if not payloads:
+            return
+
+        workers = min(self.max_workers, len(payloads))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self._post, url, payload): index for index, payload in enumerate(payloads)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
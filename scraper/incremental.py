@@ -0,0 +1,106 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+class TenderWatermark:
+    """Persisted tender fingerprints seen by earlier runs, per section.
+
+    Each fingerprint keeps the time it was last seen. On save only the
+    max_known most recently seen fingerprints per section are kept (0 keeps
+    all), so the file stops growing once old tenders leave the listing.
+    """
+
+    def __init__(self, path, max_known=5000):
+        self.path = path
+        self.max_known = max_known
+        self._known = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def fingerprint(item):
+        """Return a stable fingerprint for a tender dict"""
+        parts = [
+            item.get('title') or '',
+            item.get('company') or '',
+            item.get('date') or '',
+            item.get('attachment_id') or '',
+        ]
+        return hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+    def load(self):
+        """Load fingerprints saved by the previous run"""
+        if not os.path.exists(self.path):
+            logger.info(f"No tender watermark found at {self.path}, starting a full crawl")
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            # Format lama menyimpan list tanpa waktu; anggap terakhir terlihat saat file ditulis
+            updated_at = data.get('updated_at') or datetime.now().isoformat(timespec='seconds')
+            self._known = {
+                section: dict(fingerprints) if isinstance(fingerprints, dict) else dict.fromkeys(fingerprints, updated_at)
+                for section, fingerprints in data.get('sections', {}).items()
+            }
+            logger.info(f"Loaded tender watermark from {self.path}: "
+                        f"{', '.join(f'{k}={len(v)}' for k, v in self._known.items())}")
+        except Exception as e:
+            logger.error(f"Error loading tender watermark {self.path}: {str(e)}")
+            self._known = {}
+
+    def is_known(self, section, item):
+        """Check whether a tender was already seen by an earlier run"""
+        with self._lock:
+            return self.fingerprint(item) in self._known.get(section, {})
+
+    def count_known(self, section, items):
+        """Count how many tenders in a list were already seen"""
+        return sum(1 for item in items if self.is_known(section, item))
+
+    def add(self, section, items):
+        """Remember tenders so later runs treat them as known"""
+        self.add_fingerprints(section, [self.fingerprint(item) for item in items])
+
+    def add_fingerprints(self, section, fingerprints):
+        """Remember already computed tender fingerprints, marking them as seen now"""
+        seen_at = datetime.now().isoformat(timespec='seconds')
+        with self._lock:
+            self._known.setdefault(section, {}).update(dict.fromkeys(fingerprints, seen_at))
+
+    def prune(self):
+        """Keep only the max_known most recently seen fingerprints per section, return how many were dropped"""
+        dropped = 0
+        with self._lock:
+            for section, known in self._known.items():
+                if self.max_known and len(known) > self.max_known:
+                    newest = sorted(known.items(), key=lambda entry: entry[1], reverse=True)[:self.max_known]
+                    dropped += len(known) - len(newest)
+                    self._known[section] = dict(newest)
+        if dropped:
+            logger.info(f"Pruned {dropped} tender fingerprints not seen recently from the watermark")
+        return dropped
+
+    def save(self):
+        """Prune and write the watermark to disk atomically"""
+        self.prune()
+        with self._lock:
+            data = {
+                'updated_at': datetime.now().isoformat(timespec='seconds'),
+                'sections': {section: dict(sorted(known.items())) for section, known in self._known.items()}
+            }
+
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+            logger.info(f"Saved tender watermark to {self.path}")
+        except Exception as e:
+            logger.error(f"Error saving tender watermark {self.path}: {str(e)}")
@@ -0,0 +1,534 @@
+import html
+import logging
+
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer, Tag
+
+from .schema import CardSchema, INFO_COLUMNS, LIST_COLUMNS, split_list
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # lxml opsional, backend html.parser tetap tersedia
+    lxml = None
+    etree = None
+
+logger = logging.getLogger(__name__)
+
+# Elemen blok yang mengakhiri teks pembuka sebuah paragraf (lead_text)
+BLOCK_TAGS = {'p', 'div', 'ul', 'ol', 'dl', 'table', 'section', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+class ParsedPage:
+    """A response parsed once; every extraction step runs against the same scoped tree"""
+
+    def __init__(self, parser, scope, section_id=None, scoped=False):
+        self.parser = parser
+        self.scope = scope
+        self.section_id = section_id
+        self.scoped = scoped
+
+    def _extract_cards(self, cards):
+        tender_items = []
+        for card in cards:
+            item = self.parser.extract_card_data(card)
+            if item:
+                tender_items.append(item)
+        return tender_items
+
+    def extract_tender_items(self):
+        """Extract tender items from the cards, column or styled-div markup in this page"""
+        if self.scope is None:
+            return []
+
+        parser = self.parser
+        where = f"section {self.section_id}" if self.scoped else "the entire HTML"
+
+        # Cari semua card di dalam container hasil (atau di seluruh HTML jika container tidak ada)
+        cards = parser.find_all(self.scope, 'div', 'card')
+        if cards:
+            logger.info(f"Found {len(cards)} cards in {where}")
+            return self._extract_cards(cards)
+
+        # Jika tidak menemukan card, coba pendekatan lain pada pohon yang sama
+        logger.info("No cards found, trying alternative approaches")
+        tender_items = []
+
+        # Coba cari div dengan class col-6 atau col-md-6 (biasanya berisi item tender)
+        cols = parser.find_all_class_contains(self.scope, 'div', ('col-6', 'col-md-6'))
+        if cols:
+            logger.info(f"Found {len(cols)} column divs")
+            for col in cols:
+                # Cek apakah col berisi card
+                card = parser.find(col, 'div', 'card')
+                if card is not None:
+                    item = parser.extract_card_data(card)
+                    if item:
+                        tender_items.append(item)
+
+        # Jika masih tidak menemukan, cari berdasarkan struktur
+        if not tender_items:
+            # Cari semua div yang memiliki border atau margin-bottom yang menunjukkan item terpisah
+            divs = parser.find_all_style_contains(self.scope, 'div', ('border', 'margin-bottom'))
+            if divs:
+                logger.info(f"Found {len(divs)} divs with border or margin")
+                tender_items.extend(self._extract_cards(divs))
+
+        logger.info(f"Extracted {len(tender_items)} tender items")
+        return tender_items
+
+    def page_numbers(self):
+        """Return the page numbers shown in .pagination elements of this page"""
+        if self.scope is None:
+            return []
+
+        parser = self.parser
+        page_numbers = []
+        for pagination in parser.find_all(self.scope, '*', 'pagination'):
+            for tag in ('a', 'li', 'span'):
+                for elem in parser.find_all(pagination, tag):
+                    page_text = parser.text(elem)
+                    if page_text.isdigit():
+                        page_numbers.append(int(page_text))
+        return page_numbers
+
+class BaseParser:
+    """Tender card extraction shared by all parser backends.
+
+    Subclasses provide the tree primitives (parse, find, text, ...); the
+    extraction logic itself lives here so every backend yields the same dicts.
+    """
+
+    name = None
+
+    def __init__(self, base_url, schema=None):
+        self.base_url = base_url
+        self.schema = schema or CardSchema()
+
+    # Primitif pohon HTML yang diimplementasikan oleh setiap backend
+
+    def parse(self, html_content):
+        raise NotImplementedError
+
+    def find_by_id(self, root, element_id):
+        raise NotImplementedError
+
+    def find_all(self, node, tag, class_name=None):
+        raise NotImplementedError
+
+    def find(self, node, tag, class_name=None):
+        found = self.find_all(node, tag, class_name)
+        return found[0] if found else None
+
+    def find_all_class_contains(self, node, tag, fragments):
+        raise NotImplementedError
+
+    def find_all_style_contains(self, node, tag, fragments):
+        raise NotImplementedError
+
+    def text(self, node):
+        raise NotImplementedError
+
+    def string(self, node):
+        raise NotImplementedError
+
+    def markup(self, node):
+        raise NotImplementedError
+
+    def attr(self, node, name, default=None):
+        raise NotImplementedError
+
+    def has_attr(self, node, name):
+        raise NotImplementedError
+
+    def walk(self, node, tags):
+        """Yield (element, tag, classes) for descendants with one of tags, in document order"""
+        raise NotImplementedError
+
+    def is_within(self, node, ancestor):
+        raise NotImplementedError
+
+    def spaced_text(self, node):
+        """All text under node joined with spaces, for whitespace-normalized fields"""
+        raise NotImplementedError
+
+    def lead_text(self, node):
+        """Text of node up to its first block-level child element"""
+        raise NotImplementedError
+
+    # Ekstraksi tender
+
+    def parse_page(self, html_content, section_id=None):
+        """Parse a response once, scoped to the section_id container when it exists"""
+        root = self.parse(html_content)
+        if root is None:
+            return ParsedPage(self, None, section_id)
+
+        if section_id:
+            section = self.find_by_id(root, section_id)
+            if section is not None:
+                return ParsedPage(self, section, section_id, scoped=True)
+            logger.warning(f"Section with id '{section_id}' not found, searching the entire HTML")
+
+        return ParsedPage(self, root, section_id)
+
+    def extract_tender_items(self, html_content, section_id=None):
+        """Extract tender items from HTML content"""
+        return self.parse_page(html_content, section_id).extract_tender_items()
+
+    def _parse_attachment_href(self, href):
+        """Build an attachment dict from a direct download href"""
+        file_id = None
+        file_name = "attachment.pdf"
+
+        # Coba ekstrak file ID dan nama file dari URL
+        if 'fileId=' in href:
+            file_id = href.split('fileId=')[1].split('&')[0]
+        elif '/download/' in href:
+            parts = href.split('/download/')[1].split('/')
+            if len(parts) >= 2:
+                file_id = parts[1]
+
+        if 'fileName=' in href:
+            file_name = href.split('fileName=')[1].split('&')[0]
+        elif href.endswith('.pdf'):
+            file_name = href.split('/')[-1]
+
+        # Pastikan URL lengkap
+        if not href.startswith('http'):
+            href = f"{self.base_url}{href}" if href.startswith('/') else f"{self.base_url}/{href}"
+
+        return {
+            'url': href,
+            'name': file_name,
+            'file_id': file_id
+        }
+
+    def extract_card_data(self, card):
+        """Extract data from a card element using the compiled card schema"""
+        try:
+            values = self.schema.extract(self, card)
+
+            # Informasi tambahan; span tanpa label diberi nama "Info N"
+            info_dict = {}
+            for label, value in values['info']:
+                if label is None:
+                    label = f"Info {len(info_dict) + 1}"
+                info_dict[label] = value
+
+            # Cari link attachment langsung, atau link berteks "Attachment"
+            attachments = []
+            attachment_links = values['attachment_links'] or values['text_attachment_links']
+
+            # Tambahkan semua link attachment yang ditemukan
+            for link in attachment_links:
+                href = self.attr(link, 'href', '')
+                if href and ('download' in href or 'attachment' in href or '.pdf' in href):
+                    attachments.append(self._parse_attachment_href(href))
+
+            # Jika tidak ada attachment langsung, cari link download-file-blob
+            if not attachments:
+                for attachment_elem in values['blob_links']:
+                    if self.has_attr(attachment_elem, 'data-url'):
+                        attachment_url = self.attr(attachment_elem, 'data-url')
+                        attachment_id = self.attr(attachment_elem, 'data-file-id')
+                        attachment_name = self.attr(attachment_elem, 'data-name', 'attachment.pdf')
+
+                        if attachment_url and attachment_id:
+                            if not attachment_url.startswith('http'):
+                                attachment_url = f"{self.base_url}{attachment_url}?fileId={attachment_id}&fileName={attachment_name}"
+                            else:
+                                attachment_url = f"{attachment_url}?fileId={attachment_id}&fileName={attachment_name}"
+
+                            attachments.append({
+                                'url': attachment_url,
+                                'name': attachment_name,
+                                'file_id': attachment_id
+                            })
+
+            # Format deskripsi dan informasi tambahan dengan baik
+            full_description = values['description']
+
+            # Tambahkan informasi tambahan ke deskripsi
+            for key, value in info_dict.items():
+                full_description += f"\n{key}: {value}"
+
+            # Buat item tender; informasi tambahan yang dikenal juga disimpan sebagai kolom terstruktur
+            tender_item = {
+                'title': values['title'],
+                'date': values['date'],
+                'deadline': values['deadline'],
+                'company': values['company'],
+            }
+            for label, column in INFO_COLUMNS.items():
+                value = info_dict.get(label, '')
+                tender_item[column] = split_list(value) if column in LIST_COLUMNS else value
+            tender_item['description'] = full_description
+            tender_item['attachments'] = attachments
+
+            # Tambahkan URL attachment utama jika ada
+            if attachments:
+                tender_item['attachment_url'] = attachments[0]['url']
+                tender_item['attachment_name'] = attachments[0]['name']
+                tender_item['attachment_id'] = attachments[0]['file_id']
+
+            return tender_item
+        except Exception as e:
+            logger.error(f"Error extracting card data: {str(e)}")
+            return None
+
+class SoupParser(BaseParser):
+    """Reference backend: BeautifulSoup with the pure-Python html.parser"""
+
+    name = 'html.parser'
+
+    def parse(self, html_content):
+        return BeautifulSoup(html_content or '', 'html.parser')
+
+    def parse_page(self, html_content, section_id=None):
+        if section_id:
+            # Hanya bangun subtree container hasil; seluruh dokumen di-parse hanya jika container tidak ada
+            strained = BeautifulSoup(html_content or '', 'html.parser', parse_only=SoupStrainer(id=section_id))
+            section = strained.find(id=section_id)
+            if section is not None:
+                return ParsedPage(self, section, section_id, scoped=True)
+            logger.warning(f"Section with id '{section_id}' not found, searching the entire HTML")
+
+        return ParsedPage(self, self.parse(html_content), section_id)
+
+    def find_by_id(self, root, element_id):
+        return root.find(id=element_id)
+
+    def find_all(self, node, tag, class_name=None):
+        tag = True if tag == '*' else tag
+        if class_name:
+            return node.find_all(tag, class_=class_name)
+        return node.find_all(tag)
+
+    def find(self, node, tag, class_name=None):
+        tag = True if tag == '*' else tag
+        if class_name:
+            return node.find(tag, class_=class_name)
+        return node.find(tag)
+
+    def find_all_class_contains(self, node, tag, fragments):
+        return node.find_all(tag, class_=lambda x: x and any(fragment in x for fragment in fragments))
+
+    def find_all_style_contains(self, node, tag, fragments):
+        return node.find_all(tag, style=lambda x: x and any(fragment in x for fragment in fragments))
+
+    def text(self, node):
+        return node.get_text(strip=True)
+
+    def spaced_text(self, node):
+        return node.get_text(' ')
+
+    def lead_text(self, node):
+        parts = []
+        for child in node.children:
+            if isinstance(child, Tag):
+                if child.name in BLOCK_TAGS:
+                    break
+                parts.append(child.get_text(' '))
+            elif type(child) is NavigableString:
+                parts.append(str(child))
+        return ' '.join(parts)
+
+    def string(self, node):
+        return node.string
+
+    def markup(self, node):
+        return str(node)
+
+    def attr(self, node, name, default=None):
+        return node.get(name, default)
+
+    def has_attr(self, node, name):
+        return name in node.attrs
+
+    def walk(self, node, tags):
+        for elem in node.find_all(list(tags)):
+            yield elem, elem.name, elem.get('class') or ()
+
+    def is_within(self, node, ancestor):
+        return any(parent is ancestor for parent in node.parents)
+
+# Pengganti sementara untuk \r: libxml2 menormalkan \r\n menjadi \n, html.parser tidak
+CR_PLACEHOLDER = '\ue000'
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'}
+SKIPPED_TEXT_TAGS = {'script', 'style', 'template'}
+
+class LxmlParser(BaseParser):
+    """Fast backend on lxml (libxml2) that mirrors html.parser's output.
+
+    libxml2 normalizes \\r\\n, which html.parser keeps; carriage returns
+    are protected during parsing so the tender dicts stay identical.
+    """
+
+    name = 'lxml'
+
+    def __init__(self, base_url, schema=None):
+        super().__init__(base_url, schema)
+        if lxml is None:
+            raise ImportError("lxml is not installed")
+        self._xpath_cache = {}
+
+    def _xpath(self, tag, class_name=None):
+        """Return a compiled XPath for descendants with a tag and optional class"""
+        key = (tag, class_name)
+        xpath = self._xpath_cache.get(key)
+        if xpath is None:
+            if class_name:
+                expr = f".//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+            else:
+                expr = f".//{tag}"
+            xpath = etree.XPath(expr)
+            self._xpath_cache[key] = xpath
+        return xpath
+
+    def parse(self, html_content):
+        if not html_content or not html_content.strip():
+            return None
+        html_content = html_content.replace('\r', CR_PLACEHOLDER)
+        try:
+            return lxml.html.document_fromstring(html_content)
+        except ValueError:
+            # String unicode dengan deklarasi encoding XML harus di-parse sebagai bytes
+            return lxml.html.document_fromstring(html_content.encode('utf-8'))
+        except etree.ParserError:
+            return None
+
+    def find_by_id(self, root, element_id):
+        found = root.xpath('//*[@id=$element_id]', element_id=element_id)
+        return found[0] if found else None
+
+    def find_all(self, node, tag, class_name=None):
+        return self._xpath(tag, class_name)(node)
+
+    def find_all_class_contains(self, node, tag, fragments):
+        matches = []
+        for elem in self._xpath(tag)(node):
+            classes = elem.get('class')
+            if not classes:
+                continue
+            # Sama seperti bs4: cocokkan ke setiap class dan ke atribut class lengkap
+            if any(fragment in value for value in classes.split() + [classes] for fragment in fragments):
+                matches.append(elem)
+        return matches
+
+    def find_all_style_contains(self, node, tag, fragments):
+        return [elem for elem in self._xpath(tag)(node)
+                if elem.get('style') and any(fragment in elem.get('style') for fragment in fragments)]
+
+    def _strings(self, node):
+        """Yield the text nodes under node in document order, like bs4 strings"""
+        if node.tag in SKIPPED_TEXT_TAGS:
+            return
+        if node.text and isinstance(node.tag, str):
+            yield node.text
+        for child in node:
+            if isinstance(child.tag, str):
+                yield from self._strings(child)
+            if child.tail:
+                yield child.tail
+
+    def _restore(self, value):
+        return value.replace(CR_PLACEHOLDER, '\r') if value else value
+
+    def _joined_text(self, strings):
+        return ''.join(self._restore(s).strip() for s in strings)
+
+    def text(self, node):
+        return self._joined_text(self._strings(node))
+
+    def spaced_text(self, node):
+        return ' '.join(self._restore(s) for s in self._strings(node))
+
+    def lead_text(self, node):
+        parts = [node.text] if node.text else []
+        for child in node:
+            if isinstance(child.tag, str):
+                if child.tag in BLOCK_TAGS:
+                    break
+                parts.extend(self._strings(child))
+            if child.tail:
+                parts.append(child.tail)
+        return self._restore(' '.join(parts))
+
+    def string(self, node):
+        # Sama seperti bs4 .string: hanya ada jika node punya tepat satu child
+        while True:
+            children = list(node)
+            if not children:
+                return self._restore(node.text) if node.text else None
+            if node.text or len(children) != 1 or children[0].tail:
+                return None
+            node = children[0]
+            if not isinstance(node.tag, str):
+                return None
+
+    def _markup(self, node):
+        """Serialize like bs4's str(tag) so label regexes see the same markup"""
+        attrs = ''.join(f' {name}="{html.escape(value, quote=True)}"' for name, value in node.attrib.items())
+        if node.tag in VOID_TAGS:
+            return f"<{node.tag}{attrs}/>"
+        inner = html.escape(node.text, quote=False) if node.text else ''
+        for child in node:
+            if isinstance(child.tag, str):
+                inner += self._markup(child)
+            if child.tail:
+                inner += html.escape(child.tail, quote=False)
+        return f"<{node.tag}{attrs}>{inner}</{node.tag}>"
+
+    def markup(self, node):
+        return self._restore(self._markup(node))
+
+    def attr(self, node, name, default=None):
+        value = node.get(name)
+        return self._restore(value) if value is not None else default
+
+    def has_attr(self, node, name):
+        return name in node.attrib
+
+    def walk(self, node, tags):
+        # iterdescendants menyaring tag di C, hanya elemen yang relevan yang sampai ke Python
+        for elem in node.iterdescendants(*tags):
+            classes = elem.get('class')
+            yield elem, elem.tag, classes.split() if classes else ()
+
+    def is_within(self, node, ancestor):
+        return any(parent is ancestor for parent in node.iterancestors())
+
+PARSER_BACKENDS = {
+    SoupParser.name: SoupParser,
+    LxmlParser.name: LxmlParser,
+}
+
+def get_parser(backend, base_url, schema=None):
+    """Create a parser backend by name; 'auto' prefers lxml when it is installed"""
+    backend = (backend or 'auto').strip().lower()
+
+    if backend == 'auto':
+        backend = LxmlParser.name if lxml is not None else SoupParser.name
+
+    if backend == LxmlParser.name and lxml is None:
+        logger.warning("lxml is not installed, falling back to html.parser backend")
+        backend = SoupParser.name
+
+    if backend not in PARSER_BACKENDS:
+        logger.warning(f"Unknown parser backend '{backend}', using html.parser")
+        backend = SoupParser.name
+
+    return PARSER_BACKENDS[backend](base_url, schema)
+
+# Parser milik proses worker parse, dibuat sekali oleh init_parse_worker
+_worker_parser = None
+
+def init_parse_worker(backend, base_url, schema=None):
+    """ProcessPoolExecutor initializer: build the parser once per worker process"""
+    global _worker_parser
+    _worker_parser = get_parser(backend, base_url, schema)
+
+def parse_in_worker(html_content, section_id=None, want_page_numbers=False):
+    """Parse one response in a worker process and return (tender items, pagination numbers)"""
+    parsed_page = _worker_parser.parse_page(html_content, section_id)
+    tender_items = parsed_page.extract_tender_items()
+    return tender_items, parsed_page.page_numbers() if want_page_numbers else []
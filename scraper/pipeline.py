@@ -0,0 +1,292 @@
+import csv
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Urutan kolom CSV; kolom yang tidak ada pada sebuah item dibiarkan kosong
+CSV_FIELDNAMES = [
+    'title', 'date', 'deadline', 'company', 'golongan_usaha', 'jenis_pengadaan', 'bidang_usaha',
+    'description', 'attachments', 'attachment_url', 'attachment_name', 'attachment_id', 'page',
+]
+
+# Penanda akhir aliran pada antrian
+_DONE = object()
+
+class Sink:
+    """A pipeline stage that receives tender records as soon as they are parsed"""
+
+    def write(self, section, item):
+        raise NotImplementedError
+
+    def flush(self):
+        """Called after every page so buffered records reach disk early"""
+
+    def close(self):
+        """Called once after the last record"""
+
+class CsvSink(Sink):
+    """Write each section to its own timestamped CSV file, row by row"""
+
+    def __init__(self, data_dir, file_prefixes):
+        self.data_dir = data_dir
+        self.file_prefixes = file_prefixes
+        self.files = {}
+        self._handles = {}
+        self._writers = {}
+
+    def _writer(self, section):
+        writer = self._writers.get(section)
+        if writer is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = os.path.join(self.data_dir, f"{self.file_prefixes[section]}_{timestamp}.csv")
+            handle = open(filename, 'w', newline='', encoding='utf-8')
+            writer = csv.DictWriter(handle, fieldnames=CSV_FIELDNAMES, extrasaction='ignore')
+            writer.writeheader()
+            self.files[section] = filename
+            self._handles[section] = handle
+            self._writers[section] = writer
+        return writer
+
+    def write(self, section, item):
+        # Kolom list/dict (bidang_usaha, attachments) ditulis sebagai JSON, bukan repr Python
+        row = {key: json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict)) else value
+               for key, value in item.items()}
+        self._writer(section).writerow(row)
+
+    def flush(self):
+        for handle in self._handles.values():
+            handle.flush()
+
+    def close(self):
+        for section, handle in self._handles.items():
+            handle.close()
+            logger.info(f"Data saved to {self.files[section]}")
+
+class JsonSink(Sink):
+    """Spool records per section to temporary files and assemble the JSON dump at close"""
+
+    def __init__(self, path, sections):
+        self.path = path
+        self.sections = list(sections)
+        self._spools = {}
+
+    def write(self, section, item):
+        spool = self._spools.get(section)
+        if spool is None:
+            spool = tempfile.TemporaryFile('w+', encoding='utf-8', dir=os.path.dirname(self.path) or None)
+            self._spools[section] = spool
+        spool.write(json.dumps(item, ensure_ascii=False) + '\n')
+
+    def close(self):
+        tmp_path = f"{self.path}.tmp"
+        try:
+            # Bentuk file sama seperti sebelumnya: {section: [item, ...]}, ditulis per item dari spool
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write('{')
+                for index, section in enumerate(self.sections):
+                    f.write(',' if index else '')
+                    f.write(f"\n  {json.dumps(section)}: [")
+                    spool = self._spools.get(section)
+                    count = 0
+                    if spool is not None:
+                        spool.seek(0)
+                        for line in spool:
+                            item = json.loads(line)
+                            f.write(',' if count else '')
+                            f.write('\n    ' + json.dumps(item, ensure_ascii=False, indent=2).replace('\n', '\n    '))
+                            count += 1
+                    f.write('\n  ]' if count else ']')
+                f.write('\n}')
+            os.replace(tmp_path, self.path)
+            logger.info(f"Saved scraper results to {self.path}")
+        except Exception as e:
+            logger.error(f"Error saving results to JSON: {str(e)}")
+        finally:
+            for spool in self._spools.values():
+                spool.close()
+
+class ResultSink(Sink):
+    """Keep the records in memory for callers that need the full result lists"""
+
+    def __init__(self, results):
+        self.results = results
+
+    def write(self, section, item):
+        self.results.setdefault(section, []).append(item)
+
+class TenderStoreSink(Sink):
+    """Upsert records into the TenderStore, one transaction per parsed page"""
+
+    def __init__(self, store, run_id):
+        self.store = store
+        self.run_id = run_id
+        self.inserted = 0
+        self.updated = 0
+        self._pending = {}
+        self.store.start_run(run_id)
+
+    def write(self, section, item):
+        self._pending.setdefault(section, []).append(item)
+
+    def flush(self):
+        pending, self._pending = self._pending, {}
+        for section, items in pending.items():
+            inserted, updated = self.store.upsert(section, items, self.run_id)
+            self.inserted += inserted
+            self.updated += updated
+
+    def close(self):
+        self.flush()
+        self.store.finish_run(self.run_id, self.inserted, self.updated)
+        logger.info(f"Tender store {self.store.path}: {self.inserted} new and {self.updated} updated tenders in run {self.run_id}")
+
+class AttachmentSink(Sink):
+    """Hand the attachments of each tender record to a DownloadManager while scraping continues"""
+
+    def __init__(self, manager, attachments, skip=None):
+        self.manager = manager
+        self.attachments = attachments
+        self.skip = skip
+
+    def write(self, section, item):
+        # Lewati attachment tender yang sudah diproses pada run sebelumnya
+        if self.skip and self.skip(section, item):
+            return
+        for attachment in self.attachments(item):
+            # Antrian manager terbatas: scraping menunggu jika download tertinggal terlalu jauh.
+            # Key per section: file yang sama di section lain tetap mendapat link manifest-nya
+            # (worker memakai blob yang sudah ada lewat store.find, tanpa mengunduh ulang)
+            self.manager.submit(section, attachment['url'], key=f"{section}:{attachment.get('file_id') or attachment['url']}")
+
+    def close(self):
+        self.manager.close()
+
+class WatermarkSink(Sink):
+    """Remember every record in the incremental-mode watermark at the end of the run"""
+
+    def __init__(self, watermark):
+        self.watermark = watermark
+        self._pending = {}
+
+    def write(self, section, item):
+        # Ditambahkan saat close agar tender run ini tidak dianggap "sudah dikenal" selama crawl berjalan
+        self._pending.setdefault(section, []).append(self.watermark.fingerprint(item))
+
+    def close(self):
+        for section, fingerprints in self._pending.items():
+            self.watermark.add_fingerprints(section, fingerprints)
+
+class Pipeline:
+    """Stream tender pages from producers through dedupe into sinks over a bounded queue.
+
+    Each source is a callable returning an iterable of item lists (one list
+    per result page). Producers block when the queue is full, so fetching
+    never runs more than buffer_pages ahead of the sinks.
+    """
+
+    def __init__(self, sinks, buffer_pages=4, dedupe_key=None):
+        self.sinks = sinks
+        self.buffer_pages = max(1, buffer_pages)
+        self.dedupe_key = dedupe_key
+
+    def _put(self, records, entry, stop):
+        # put dengan timeout agar producer tidak tertahan selamanya jika consumer sudah berhenti
+        while not stop.is_set():
+            try:
+                records.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, records, sections, sources, stop):
+        for section in sections:
+            if stop.is_set():
+                return
+            pages = None
+            try:
+                pages = sources[section]()
+                for items in pages:
+                    if not self._put(records, (section, items), stop):
+                        break
+            except Exception as e:
+                logger.error(f"Error scraping {section} section: {str(e)}")
+            finally:
+                # Tutup generator agar fetcher dan parse worker-nya dibereskan saat pipeline dihentikan
+                if hasattr(pages, 'close'):
+                    pages.close()
+                self._put(records, (section, _DONE), stop)
+
+    def run(self, sources, parallel=False):
+        """Drain all sources into the sinks and return the record count per section"""
+        records = queue.Queue(maxsize=self.buffer_pages)
+        sections = list(sources)
+        stop = threading.Event()
+
+        if parallel:
+            groups = [[section] for section in sections]
+        else:
+            groups = [sections]
+        producers = [
+            threading.Thread(target=self._produce, args=(records, group, sources, stop), name=f"producer-{'-'.join(group)}", daemon=True)
+            for group in groups
+        ]
+        for producer in producers:
+            producer.start()
+
+        counts = {section: 0 for section in sections}
+        duplicates = {section: 0 for section in sections}
+        seen = {section: set() for section in sections}
+        remaining = len(sections)
+
+        try:
+            while remaining:
+                section, items = records.get()
+                if items is _DONE:
+                    remaining -= 1
+                    continue
+
+                for item in items:
+                    # Tender yang sama bisa muncul di dua halaman jika daftar bergeser selama crawl
+                    if self.dedupe_key:
+                        key = self.dedupe_key(item)
+                        if key in seen[section]:
+                            duplicates[section] += 1
+                            continue
+                        seen[section].add(key)
+
+                    for sink in self.sinks:
+                        sink.write(section, item)
+                    counts[section] += 1
+
+                for sink in self.sinks:
+                    sink.flush()
+        except BaseException:
+            # Sink gagal: hentikan producer dan kosongkan antrian agar tidak ada thread yang tertahan di put()
+            stop.set()
+            while True:
+                try:
+                    records.get_nowait()
+                except queue.Empty:
+                    break
+            raise
+        finally:
+            for sink in self.sinks:
+                try:
+                    sink.close()
+                except Exception as e:
+                    logger.error(f"Error closing {type(sink).__name__}: {str(e)}")
+
+            for producer in producers:
+                producer.join()
+
+        for section in sections:
+            logger.info(f"Pipeline wrote {counts[section]} {section} records"
+                        + (f" ({duplicates[section]} duplicates dropped)" if duplicates[section] else ""))
+        return counts
@@ -0,0 +1,141 @@
+import logging
+import threading
+import time
+import urllib.parse
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Status yang menandakan server kewalahan atau membatasi request
+BACKOFF_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """Token bucket for a single host whose refill rate adapts with AIMD"""
+
+    def __init__(self, rate, capacity=1, min_rate=0.1, max_rate=1.0, increase_step=0.05, backoff_factor=0.5):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.backoff_factor = backoff_factor
+
+        self.tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        """Add the tokens earned since the last update"""
+        elapsed = now - self._updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    def acquire(self):
+        """Block until a token is available and consume it"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            # Token boleh negatif: itu berarti slot sudah dipesan oleh thread sebelumnya
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            wait = max(wait, self._paused_until - now)
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def increase(self):
+        """Additive increase after a healthy response"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def decrease(self, pause=0):
+        """Multiplicative decrease after a throttled or failed response"""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.backoff_factor)
+            if pause > 0:
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            return self.rate
+
+class RateLimiter:
+    """Central per-host rate limiter used by every HTTP call of the scraper"""
+
+    def __init__(self, rate, capacity=1, min_rate=0.1, max_rate=1.0, increase_step=0.05, backoff_factor=0.5):
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.backoff_factor = backoff_factor
+
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a limiter from the [scraper] section of config.ini"""
+        delay_min = float(config.get('delay_min', 2))
+        delay_max = float(config.get('delay_max', 5))
+
+        # Default: mulai dari rata-rata delay_min/delay_max, naik paling cepat sampai 1 request per delay_min
+        return cls(
+            rate=config.getfloat('rate_limit', fallback=2 / (delay_min + delay_max)),
+            capacity=config.getint('rate_limit_burst', fallback=1),
+            min_rate=config.getfloat('rate_limit_min', fallback=1 / (delay_max * 6)),
+            max_rate=config.getfloat('rate_limit_max', fallback=1 / delay_min if delay_min > 0 else 10.0),
+            increase_step=config.getfloat('rate_limit_increase', fallback=0.05),
+            backoff_factor=config.getfloat('rate_limit_backoff', fallback=0.5),
+        )
+
+    def _bucket(self, url):
+        """Return the token bucket for the host of the given URL"""
+        host = urllib.parse.urlsplit(url).netloc or url
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.capacity, self.min_rate, self.max_rate,
+                                     self.increase_step, self.backoff_factor)
+                self._buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url):
+        """Wait for the host's next request slot"""
+        return self._bucket(url).acquire()
+
+    def record(self, url, status_code=None, error=None, retry_after=None):
+        """Feed a response outcome back into the host's bucket"""
+        bucket = self._bucket(url)
+
+        if error is not None or status_code in BACKOFF_STATUS_CODES:
+            pause = 0
+            if retry_after:
+                try:
+                    pause = float(retry_after)
+                except (TypeError, ValueError):
+                    pause = 0
+            rate = bucket.decrease(pause)
+            reason = f"status {status_code}" if error is None else type(error).__name__
+            logger.warning(f"Backing off {urllib.parse.urlsplit(url).netloc} after {reason}, rate now {rate:.2f} req/s")
+        elif status_code is not None and status_code < 400:
+            bucket.increase()
+
+class RateLimitedSession(requests.Session):
+    """requests.Session that routes every request through a RateLimiter"""
+
+    def __init__(self, rate_limiter):
+        super().__init__()
+        self.rate_limiter = rate_limiter
+
+    def request(self, method, url, *args, **kwargs):
+        self.rate_limiter.acquire(url)
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            self.rate_limiter.record(url, error=e)
+            raise
+
+        self.rate_limiter.record(url, response.status_code, retry_after=response.headers.get('Retry-After'))
+        return response
@@ -0,0 +1,189 @@
+import html
+import logging
+import re
+
+from .utils import clean_text, parse_date
+
+logger = logging.getLogger(__name__)
+
+# Pola label:nilai pada span informasi tambahan; nilai bisa terdiri dari beberapa baris
+LABEL_PATTERN = re.compile(r'<b>(.*?)</b>:\s*(.*)', re.S)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+# Label informasi tambahan yang juga disimpan sebagai kolom tersendiri
+INFO_COLUMNS = {
+    'Golongan Usaha': 'golongan_usaha',
+    'Jenis Pengadaan': 'jenis_pengadaan',
+    'Bidang Usaha': 'bidang_usaha',
+}
+# Kolom yang berisi daftar, dipisah dengan ';' di situs
+LIST_COLUMNS = {'bidang_usaha'}
+
+class FieldSpec:
+    """One field of the tender card schema.
+
+    selector is 'tag' or 'tag.class'. source says what to read from the
+    matched element: 'text', 'clean_text' (whitespace collapsed), 'lead_text'
+    (text before the first block child, collapsed), 'markup', 'string',
+    'node' or a callable (parser, node). pattern (a regex) picks group 1 out of the value,
+    post transforms the final value. within restricts matches to elements
+    inside the element matched by another field, contains keeps only
+    elements whose string contains that text.
+    """
+
+    def __init__(self, name, selector, source='text', pattern=None, default=None, post=None,
+                 many=False, within=None, contains=None):
+        self.name = name
+        self.selector = selector
+        self.source = source
+        self.pattern = pattern
+        self.default = default
+        self.post = post
+        self.many = many
+        self.within = within
+        self.contains = contains
+
+def strip_tags(value):
+    """Remove HTML tags left in a text value"""
+    return TAG_PATTERN.sub('', value)
+
+def markup_text(value):
+    """Turn a markup fragment into plain text with collapsed whitespace"""
+    return clean_text(html.unescape(strip_tags(value)))
+
+def info_entry(parser, span):
+    """Read a (label, value) pair from an info span; label is None for unlabeled text"""
+    if not parser.text(span):
+        return None
+
+    # Coba ekstrak label dan nilai
+    label_match = LABEL_PATTERN.search(parser.markup(span))
+    if label_match:
+        return markup_text(label_match.group(1)), markup_text(label_match.group(2))
+
+    # Jika tidak ada format label:nilai, gunakan teks lengkap
+    span_text = clean_text(parser.spaced_text(span))
+    if span_text:
+        return None, span_text
+    return None
+
+def split_list(value):
+    """Split a ';'-separated facet such as Bidang Usaha into a list"""
+    return [part.strip() for part in value.split(';') if part.strip()]
+
+# Skema card tender CIVD; ubah di sini jika markup situs berubah
+CARD_ROOT = 'div.card-body'
+CARD_FIELDS = (
+    FieldSpec('title', 'h5.card-title'),
+    FieldSpec('date', 'small.card-subtitle', source='clean_text', pattern=r'Tayang hingga\s+(\d+\s+\w+\s+\d{4})', default='No Date'),
+    FieldSpec('deadline', 'small.card-subtitle', source='clean_text', pattern=r'Tayang hingga\s+(\d+\s+\w+\.?\s+\d{4})', post=parse_date),
+    FieldSpec('company', 'small.card-subtitle', source='clean_text', pattern=r'Oleh\s+(.*?)$', default='SKK Migas', post=strip_tags),
+    FieldSpec('description', 'p.card-text', source='lead_text', default=''),
+    FieldSpec('info_block', 'p.tipe', source='node'),
+    FieldSpec('info', 'span', source=info_entry, many=True, within='info_block'),
+    FieldSpec('attachment_links', 'a.attachment', source='node', many=True),
+    FieldSpec('text_attachment_links', 'a', source='node', many=True, contains='Attachment'),
+    FieldSpec('blob_links', 'a.download-file-blob', source='node', many=True),
+)
+
+class _CompiledField:
+    """A FieldSpec with its selector split and its pattern compiled"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.name = spec.name
+        self.tag, _, class_name = spec.selector.partition('.')
+        self.class_name = class_name or None
+        self.pattern = re.compile(spec.pattern) if spec.pattern else None
+
+class CardSchema:
+    """Compiled card schema that reads every field in a single walk over a card"""
+
+    def __init__(self, fields=CARD_FIELDS, root=CARD_ROOT):
+        self.fields = [_CompiledField(spec) for spec in fields]
+        names = {field.name for field in self.fields}
+        for field in self.fields:
+            if field.spec.within and field.spec.within not in names:
+                raise ValueError(f"Field '{field.name}' is within unknown field '{field.spec.within}'")
+
+        self.root_tag, _, root_class = root.partition('.') if root else (None, None, None)
+        self.root_class = root_class or None
+
+        # Indeks tag -> field agar setiap elemen hanya butuh satu lookup dict
+        self.by_tag = {}
+        for field in self.fields:
+            self.by_tag.setdefault(field.tag, []).append(field)
+        self.tags = tuple(self.by_tag)
+
+    def _read(self, parser, field, node, text_cache):
+        source = field.spec.source
+        if callable(source):
+            return source(parser, node)
+        if source == 'node':
+            return node
+
+        # Teks node yang sama dipakai beberapa field (tanggal dan perusahaan), hitung sekali
+        key = (id(node), source)
+        if key not in text_cache:
+            if source == 'text':
+                text_cache[key] = parser.text(node)
+            elif source == 'clean_text':
+                text_cache[key] = clean_text(parser.spaced_text(node))
+            elif source == 'lead_text':
+                text_cache[key] = clean_text(parser.lead_text(node))
+            elif source == 'markup':
+                text_cache[key] = parser.markup(node)
+            elif source == 'string':
+                text_cache[key] = parser.string(node)
+            else:
+                raise ValueError(f"Unknown field source '{source}'")
+        return text_cache[key]
+
+    def _finish(self, field, value):
+        spec = field.spec
+        if field.pattern is not None and value is not None:
+            match = field.pattern.search(value)
+            value = match.group(1) if match else None
+        if value is None:
+            value = spec.default
+        if spec.post is not None and value is not None:
+            value = spec.post(value)
+        return value
+
+    def extract(self, parser, card):
+        """Return {field name: value} for one card element"""
+        if self.root_tag:
+            card_body = parser.find(card, self.root_tag, self.root_class)
+            if card_body is not None:
+                card = card_body
+
+        matched = {}
+        values = {field.name: [] if field.spec.many else None for field in self.fields}
+        text_cache = {}
+
+        for node, tag, classes in parser.walk(card, self.tags):
+            for field in self.by_tag.get(tag, ()):
+                spec = field.spec
+                if not spec.many and field.name in matched:
+                    continue
+                if field.class_name and field.class_name not in classes:
+                    continue
+                if spec.within:
+                    container = matched.get(spec.within)
+                    if container is None or not parser.is_within(node, container):
+                        continue
+                if spec.contains and spec.contains not in (parser.string(node) or ''):
+                    continue
+
+                value = self._read(parser, field, node, text_cache)
+                if spec.many:
+                    if value is not None:
+                        values[field.name].append(value)
+                else:
+                    matched[field.name] = node
+                    values[field.name] = value
+
+        for field in self.fields:
+            if not field.spec.many:
+                values[field.name] = self._finish(field, values[field.name])
+        return values
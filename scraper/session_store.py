@@ -0,0 +1,85 @@
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+class SessionStore:
+    """Persist the session cookie jar to disk with an expiry timestamp"""
+
+    def __init__(self, path, ttl=1800):
+        self.path = path
+        self.ttl = ttl
+
+    def save(self, cookie_jar):
+        """Write all cookies to disk and push the expiry ttl seconds ahead"""
+        now = time.time()
+        data = {
+            'saved_at': now,
+            'expires_at': now + self.ttl,
+            'cookies': [
+                {
+                    'name': cookie.name,
+                    'value': cookie.value,
+                    'domain': cookie.domain,
+                    'path': cookie.path,
+                    'secure': cookie.secure,
+                    'expires': cookie.expires,
+                }
+                for cookie in cookie_jar
+            ]
+        }
+
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+            logger.info(f"Saved {len(data['cookies'])} session cookies to {self.path}")
+        except Exception as e:
+            logger.error(f"Error saving session cookies to {self.path}: {str(e)}")
+
+    def load(self, cookie_jar):
+        """Load stored cookies into the jar, return False if none are usable"""
+        if not os.path.exists(self.path):
+            return False
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"Error reading session cookies from {self.path}: {str(e)}")
+            return False
+
+        now = time.time()
+        if data.get('expires_at', 0) <= now:
+            logger.info("Stored session cookies have expired")
+            return False
+
+        cookies = [c for c in data.get('cookies', []) if not c.get('expires') or c['expires'] > now]
+        if not cookies:
+            return False
+
+        for cookie in cookies:
+            cookie_jar.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie.get('domain'),
+                path=cookie.get('path') or '/',
+                secure=cookie.get('secure', False),
+                expires=cookie.get('expires'),
+            )
+
+        logger.info(f"Loaded {len(cookies)} session cookies from {self.path}")
+        return True
+
+    def clear(self):
+        """Remove the stored cookies"""
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+                logger.info(f"Removed stored session cookies {self.path}")
+        except Exception as e:
+            logger.warning(f"Error removing session cookies {self.path}: {str(e)}")
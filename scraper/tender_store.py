@@ -0,0 +1,223 @@
+import csv
+import glob
+import hashlib
+import itertools
+import json
+import logging
+import os
+import re
+import sqlite3
+import urllib.parse
+from contextlib import contextmanager
+from datetime import datetime
+
+from .utils import parse_date
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tenders (
+    section TEXT NOT NULL,
+    key TEXT NOT NULL,
+    title TEXT,
+    company TEXT,
+    deadline TEXT,
+    attachment_id TEXT,
+    data TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    first_run_id TEXT NOT NULL,
+    last_run_id TEXT NOT NULL,
+    PRIMARY KEY (section, key)
+);
+CREATE INDEX IF NOT EXISTS tenders_last_seen ON tenders (section, last_seen);
+CREATE INDEX IF NOT EXISTS tenders_deadline ON tenders (deadline);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    inserted INTEGER NOT NULL DEFAULT 0,
+    updated INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+def _normalize(value):
+    return re.sub(r'\s+', ' ', str(value or '')).strip().lower()
+
+class TenderStore:
+    """SQLite store of every tender seen, keyed by a stable natural key.
+
+    A tender is identified per section by its attachment_id (or the fileId
+    of its attachment_url), or by a hash of the normalized title and ISO
+    deadline when it has none. These fields are present in both the CSV
+    snapshots of earlier versions and new records, so an imported tender
+    is matched again by later scrapes. Each run
+    upserts its records, so a tender is stored once with the runs and times
+    it was first and last seen instead of once per CSV snapshot.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # Koneksi per operasi agar scraper dan web app (thread berbeda) bisa memakai store yang sama
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            # WAL: pembaca (web app) tidak terblokir selama scraper menulis
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def tender_key(item):
+        """Stable key of a tender record"""
+        attachment_id = item.get('attachment_id')
+        if not attachment_id or str(attachment_id).lower() == 'nan':
+            # CSV versi lama tidak punya kolom attachment_id, tapi fileId ada di attachment_url
+            query = urllib.parse.urlparse(str(item.get('attachment_url') or '')).query
+            attachment_id = urllib.parse.parse_qs(query).get('fileId', [None])[0]
+        if attachment_id:
+            return f"att:{attachment_id}"
+        # Company tidak dipakai: CSV lama berisi placeholder 'SKK Migas', dan tanggal tampilan dinormalisasi ke ISO
+        date = item.get('deadline') or parse_date(item.get('date')) or item.get('date')
+        parts = [item.get('title'), date]
+        return 'hash:' + hashlib.sha1('|'.join(_normalize(part) for part in parts).encode('utf-8')).hexdigest()
+
+    def start_run(self, run_id, started_at=None):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, started_at) VALUES (?, ?)",
+                (run_id, started_at or datetime.now().isoformat(timespec='seconds'))
+            )
+
+    def finish_run(self, run_id, inserted, updated, finished_at=None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE runs SET finished_at = ?, inserted = ?, updated = ? WHERE run_id = ?",
+                (finished_at or datetime.now().isoformat(timespec='seconds'), inserted, updated, run_id)
+            )
+
+    def run(self, run_id):
+        """Return the runs row of run_id as a dict, or None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def upsert(self, section, items, run_id, seen_at=None):
+        """Insert or update a batch of records in one transaction, return (inserted, updated)"""
+        now = seen_at or datetime.now().isoformat(timespec='seconds')
+        rows = {}
+        for item in items:
+            # Key yang sama dua kali dalam satu batch: record terakhir yang dipakai
+            rows[self.tender_key(item)] = item
+        if not rows:
+            return 0, 0
+
+        with self._connect() as conn:
+            keys = list(rows)
+            existing = set()
+            # Batas jumlah parameter SQLite: cek key per 500
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                existing.update(row['key'] for row in conn.execute(
+                    f"SELECT key FROM tenders WHERE section = ? AND key IN ({placeholders})", [section] + chunk
+                ))
+
+            conn.executemany(
+                """
+                INSERT INTO tenders (section, key, title, company, deadline, attachment_id, data,
+                                     first_seen, last_seen, first_run_id, last_run_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (section, key) DO UPDATE SET
+                    title = excluded.title,
+                    company = excluded.company,
+                    deadline = excluded.deadline,
+                    attachment_id = excluded.attachment_id,
+                    data = excluded.data,
+                    last_seen = excluded.last_seen,
+                    last_run_id = excluded.last_run_id
+                """,
+                [
+                    (section, key, item.get('title'), item.get('company'), item.get('deadline') or parse_date(item.get('date')), item.get('attachment_id'),
+                     json.dumps(item, ensure_ascii=False, default=str), now, now, run_id, run_id)
+                    for key, item in rows.items()
+                ]
+            )
+
+        updated = len(existing)
+        return len(rows) - updated, updated
+
+    def import_csv_snapshots(self, data_dir, file_prefixes):
+        """Load the timestamped CSV files of earlier versions into the store, oldest first.
+
+        file_prefixes maps each section to its CSV prefix, e.g.
+        {'pelelangan': 'pelelangan_umum'}. The timestamp in the file name is
+        used as run id and as first/last seen time, and each run is recorded
+        in the runs table with its insert/update counts. Returns the number
+        of files imported.
+        """
+        snapshots = []
+        for section, prefix in file_prefixes.items():
+            for path in glob.glob(os.path.join(data_dir, f"{prefix}_*.csv")):
+                match = re.search(r'_(\d{8}_\d{6})\.csv$', path)
+                if match:
+                    snapshots.append((match.group(1), section, path))
+
+        imported = 0
+        # File dengan timestamp sama (satu run, beberapa section) dicatat sebagai satu run
+        for run_id, files in itertools.groupby(sorted(snapshots), key=lambda snapshot: snapshot[0]):
+            seen_at = datetime.strptime(run_id, '%Y%m%d_%H%M%S').isoformat()
+            self.start_run(run_id, started_at=seen_at)
+            inserted = updated = 0
+            for _, section, path in files:
+                try:
+                    with open(path, 'r', newline='', encoding='utf-8') as f:
+                        items = [item for item in csv.DictReader(f) if item.get('title')]
+                    counts = self.upsert(section, items, run_id, seen_at=seen_at)
+                    inserted += counts[0]
+                    updated += counts[1]
+                    imported += 1
+                except Exception as e:
+                    logger.error(f"Error importing {path} into the tender store: {str(e)}")
+            self.finish_run(run_id, inserted, updated, finished_at=seen_at)
+        if imported:
+            logger.info(f"Imported {imported} CSV snapshots into {self.path}: {self.count()} tenders")
+        return imported
+
+    def tenders(self, section=None):
+        """Return the stored tender records, most recently seen first, with first_seen/last_seen added"""
+        query = "SELECT * FROM tenders"
+        params = []
+        if section:
+            query += " WHERE section = ?"
+            params.append(section)
+        query += " ORDER BY last_seen DESC, first_seen DESC"
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        records = []
+        for row in rows:
+            record = json.loads(row['data'])
+            record.update(
+                first_seen=row['first_seen'],
+                last_seen=row['last_seen'],
+                first_run_id=row['first_run_id'],
+                last_run_id=row['last_run_id'],
+            )
+            records.append(record)
+        return records
+
+    def count(self, section=None):
+        with self._connect() as conn:
+            if section:
+                return conn.execute("SELECT COUNT(*) FROM tenders WHERE section = ?", (section,)).fetchone()[0]
+            return conn.execute("SELECT COUNT(*) FROM tenders").fetchone()[0]
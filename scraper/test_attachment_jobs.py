@@ -0,0 +1,95 @@
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+from scraper.attachment_jobs import AttachmentJobQueue, PENDING, DONE, FAILED
+from scraper.test_helpers import FakeClock, expect
+
+# Konfigurasi logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+
+logger = logging.getLogger(__name__)
+
+URL = 'https://civd.skkmigas.go.id/download/tnd/ann.jwebs?fileId={key}&fileName=Dokumen.pdf'
+
+def job(queue, key):
+    """Return the state and attempts of a job, read straight from the database"""
+    with sqlite3.connect(queue.path) as conn:
+        return conn.execute("SELECT state, attempts FROM attachment_jobs WHERE key = ?", (key,)).fetchone()
+
+def check_retry_backoff(tmp_dir):
+    """A failed job is retried after an exponential, capped delay and given up after max_attempts"""
+    clock = FakeClock()
+    queue = AttachmentJobQueue(os.path.join(tmp_dir, 'backoff.db'), max_attempts=4, retry_base_delay=100,
+                               retry_max_delay=300, clock=clock)
+    key = 'file-1'
+    url = URL.format(key=key)
+
+    ok = expect(queue.claim('pelelangan', url, key), "new job is claimed")
+    ok &= expect(not queue.claim('pelelangan', url, key), "claimed job is not claimed twice")
+
+    # Delay per percobaan: 100, 200, lalu dibatasi retry_max_delay (300)
+    for attempt, delay in enumerate([100, 200, 300], start=1):
+        queue.fail(key, 'HTTP 503')
+        ok &= expect(job(queue, key) == (FAILED, attempt), f"failure {attempt} is counted")
+        clock.advance(delay - 1)
+        ok &= expect(not queue.due() and not queue.claim('pelelangan', url, key), f"job waits {delay}s after failure {attempt}")
+        clock.advance(1)
+        ok &= expect(queue.due() == [('pelelangan', url, key)], f"job is due {delay}s after failure {attempt}")
+        ok &= expect(queue.claim('pelelangan', url, key), f"job is claimed again after failure {attempt}")
+
+    queue.fail(key, 'HTTP 503')
+    clock.advance(86400 * 30)
+    ok &= expect(job(queue, key) == (FAILED, 4) and not queue.due() and not queue.claim('pelelangan', url, key),
+                 "job is given up after max_attempts")
+    queue.close()
+    return ok
+
+def check_done_and_stale(tmp_dir):
+    """Done jobs stay done while their file exists; in_progress rows of a crashed run become claimable"""
+    clock = FakeClock()
+    queue = AttachmentJobQueue(os.path.join(tmp_dir, 'states.db'), stale_after=600, clock=clock)
+    result = os.path.join(tmp_dir, 'Dokumen.pdf')
+    with open(result, 'wb') as f:
+        f.write(b'%PDF-1.4\n')
+
+    queue.claim('pelelangan', URL.format(key='done'), 'done')
+    queue.complete('done', result)
+    ok = expect(job(queue, 'done') == (DONE, 1), "completed job is done")
+    ok &= expect(not queue.claim('pelelangan', URL.format(key='done'), 'done'), "done job with its file is not claimed")
+    os.remove(result)
+    ok &= expect(queue.claim('pelelangan', URL.format(key='done'), 'done'), "done job whose file is gone is claimed again")
+
+    queue.claim('prakualifikasi', URL.format(key='crashed'), 'crashed')
+    clock.advance(600)
+    ok &= expect(not queue.claim('prakualifikasi', URL.format(key='crashed'), 'crashed'), "recent in_progress job is not claimed")
+    clock.advance(1)
+    ok &= expect(queue.claim('prakualifikasi', URL.format(key='crashed'), 'crashed'), "stale in_progress job is claimed")
+
+    queue.release('crashed')
+    ok &= expect(job(queue, 'crashed') == (PENDING, 0), "released job is pending without an attempt")
+    ok &= expect(queue.counts() == {PENDING: 1, 'in_progress': 1}, "counts per state")
+    queue.close()
+    return ok
+
+def main():
+    """Fungsi utama untuk menguji antrian job attachment"""
+    logger.info("Starting attachment job queue test")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        passed = check_retry_backoff(tmp_dir)
+        passed &= check_done_and_stale(tmp_dir)
+
+    if passed:
+        logger.info("Attachment job queue test completed: all checks passed")
+    else:
+        logger.error("Attachment job queue test completed with failures")
+    return 0 if passed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+from scraper.attachment_jobs import AttachmentJobQueue, PENDING, FAILED
+from scraper.breakers import CircuitBreakers, DownloadBudget, CLOSED, OPEN, HALF_OPEN, host_key
+from scraper.downloads import DownloadManager
+from scraper.test_helpers import FakeClock, expect
+
+# Konfigurasi logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+
+logger = logging.getLogger(__name__)
+
+URL = 'https://civd.skkmigas.go.id/download/tnd/ann.jwebs?fileId={key}&fileName=Dokumen.pdf'
+
+def check_breaker_cycle():
+    """A breaker opens after failure_threshold failures, goes half-open after reset_timeout and closes on success"""
+    clock = FakeClock()
+    breakers = CircuitBreakers(failure_threshold=3, reset_timeout=60, clock=clock)
+    name = 'template:ann'
+
+    breakers.failure(name)
+    breakers.failure(name)
+    ok = expect(breakers.state(name) == CLOSED and breakers.allow(name), "breaker stays closed below the threshold")
+    breakers.failure(name)
+    ok &= expect(breakers.state(name) == OPEN and not breakers.available(name) and not breakers.allow(name),
+                 "breaker opens at the threshold and rejects calls")
+
+    clock.advance(60)
+    ok &= expect(breakers.available(name) and breakers.state(name) == OPEN, "available() does not start a trial")
+    ok &= expect(breakers.allow(name) and breakers.state(name) == HALF_OPEN, "breaker is half-open after reset_timeout")
+    ok &= expect(not breakers.allow(name), "half-open breaker lets only one trial through")
+
+    breakers.failure(name)
+    ok &= expect(breakers.state(name) == OPEN, "failed trial opens the breaker again")
+    clock.advance(59)
+    ok &= expect(not breakers.allow(name), "reopened breaker waits a full reset_timeout")
+    clock.advance(1)
+    ok &= expect(breakers.allow(name) and breakers.state(name) == HALF_OPEN, "breaker is half-open again")
+    clock.advance(60)
+    ok &= expect(breakers.allow(name), "trial that never reported back is given up after reset_timeout")
+
+    breakers.success(name)
+    ok &= expect(breakers.state(name) == CLOSED and breakers.allow(name) and breakers.allow(name),
+                 "successful trial closes the breaker")
+
+    # Satu breaker terbuka menolak seluruh panggilan tanpa memulai trial di breaker lain
+    for _ in range(3):
+        breakers.failure('host:a')
+        breakers.failure('host:b')
+    clock.advance(60)
+    breakers.allow('host:a')
+    ok &= expect(not breakers.allow('host:a', 'host:b') and breakers.state('host:b') == OPEN,
+                 "call through several breakers is rejected if one is not available")
+    return ok
+
+def check_budget():
+    """The budget is exhausted after max_seconds or max_failures, 0 disables a limit"""
+    clock = FakeClock()
+    budget = DownloadBudget(max_seconds=100, max_failures=0, clock=clock)
+    ok = expect(not budget.exhausted(), "budget is not exhausted before the run starts")
+    budget.start()
+    clock.advance(100)
+    ok &= expect(not budget.exhausted(), "budget is not exhausted at max_seconds")
+    clock.advance(1)
+    ok &= expect(budget.exhausted(), "budget is exhausted after max_seconds")
+
+    budget = DownloadBudget(max_seconds=0, max_failures=2, clock=clock)
+    budget.start()
+    budget.record_failure()
+    clock.advance(86400)
+    ok &= expect(not budget.exhausted(), "time limit 0 is disabled")
+    budget.record_failure()
+    ok &= expect(budget.exhausted(), "budget is exhausted after max_failures")
+    return ok
+
+def check_deferral(tmp_dir):
+    """Jobs deferred by the budget or an open host breaker go back to pending without counting an attempt"""
+    clock = FakeClock()
+    jobs = AttachmentJobQueue(os.path.join(tmp_dir, 'attachment_jobs.db'), retry_base_delay=100, clock=clock)
+    calls = []
+
+    def download(section, url):
+        calls.append(url)
+        return None
+
+    # Satu worker: job diproses berurutan, kegagalan pertama menghabiskan anggaran
+    manager = DownloadManager(download, workers=1, jobs=jobs, budget=DownloadBudget(max_seconds=0, max_failures=1, clock=clock))
+    for key in ('a', 'b', 'c'):
+        manager.submit('pelelangan', URL.format(key=key), key=key)
+    stats = manager.close()
+
+    with sqlite3.connect(jobs.path) as conn:
+        rows = dict((key, (state, attempts)) for key, state, attempts in conn.execute("SELECT key, state, attempts FROM attachment_jobs"))
+    ok = expect(calls == [URL.format(key='a')], "only the first job is downloaded before the budget is exhausted")
+    ok &= expect(stats['failed'] == 1 and stats['deferred'] == 2, "one failed and two deferred jobs")
+    ok &= expect(rows == {'a': (FAILED, 1), 'b': (PENDING, 0), 'c': (PENDING, 0)}, "deferred jobs are pending without an attempt")
+    ok &= expect(sorted(key for _, _, key in jobs.due()) == ['b', 'c'], "deferred jobs are due in the next run")
+
+    # Host dengan breaker terbuka: job ditunda tanpa memanggil download
+    breakers = CircuitBreakers(failure_threshold=1, reset_timeout=60, clock=clock)
+    breakers.failure(host_key(URL.format(key='b')))
+    calls.clear()
+    manager = DownloadManager(download, workers=1, jobs=jobs, breakers=breakers)
+    queued = manager.submit_due()
+    stats = manager.close()
+    ok &= expect(queued == 2 and not calls and stats['deferred'] == 2, "jobs for a host with an open breaker are deferred")
+    ok &= expect(jobs.counts() == {FAILED: 1, PENDING: 2}, "deferred jobs stay pending")
+    jobs.close()
+    return ok
+
+def main():
+    """Fungsi utama untuk menguji circuit breaker dan anggaran download"""
+    logger.info("Starting circuit breaker and download budget test")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        passed = check_breaker_cycle()
+        passed &= check_budget()
+        passed &= check_deferral(tmp_dir)
+
+    if passed:
+        logger.info("Circuit breaker and download budget test completed: all checks passed")
+    else:
+        logger.error("Circuit breaker and download budget test completed with failures")
+    return 0 if passed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
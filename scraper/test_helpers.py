@@ -0,0 +1,23 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+class FakeClock:
+    """Clock that only moves when advance() is called, for components that take a clock argument"""
+
+    def __init__(self, now=1000000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+def expect(condition, message):
+    """Log one check as [OK] or [FAIL] and return whether it passed"""
+    if condition:
+        logger.info(f"[OK] {message}")
+    else:
+        logger.error(f"[FAIL] {message}")
+    return condition
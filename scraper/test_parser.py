@@ -0,0 +1,179 @@
+import logging
+import os
+import sys
+import time
+from scraper.parsers import SoupParser, LxmlParser, lxml
+
+# Konfigurasi logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = 'https://civd.skkmigas.go.id'
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Fixture HTML, ID container hasilnya dan jumlah card yang diharapkan. *_section.html adalah halaman CIVD
+# yang disimpan tanpa card (dipakai untuk menyisipkan card sintetis); *_results.html adalah respons
+# tnd.jwebs yang disusun ulang dari tender yang pernah di-scrape (data/scraper_results_*.json dan CSV lama)
+FIXTURES = {
+    'invitation_section.html': ('tnd1Result', 0),
+    'bid_section.html': ('tnd2Result', 0),
+    'invitation_results.html': ('tnd1Result', 6),
+    'bid_results.html': ('tnd2Result', 2),
+}
+
+# Markup card seperti yang dikirim tnd.jwebs, termasuk <p class="card-text"> yang tidak ditutup
+CARD_TEMPLATE = '''<div class="col-md-6 col-sm-12">
+<div class="card">
+<div class="card-body">
+<h5 class="card-title">{title}</h5>
+<small class="card-subtitle">Tayang hingga 21 Mar 2025 &middot; Oleh <b>{company}</b></small>
+<p class="card-text">Lingkup pekerjaan {index} &amp; pemeliharaan
+<p class="tipe">
+<span><b>Golongan Usaha</b>:  \r\n\t\t\t\tMenengah\r\n\t\t\t</span>
+<span><b>Jenis Pengadaan</b>:  \r\n\t\t\t\tJasa\r\n\t\t\t</span>
+<span><b>Bidang Usaha</b>: \r\n\t\t\tJasa Pelaksana Konstruksi;\r\n\t\t\tPekerjaan Penyiapan Tanah;\r\n\t\t</span>
+<span>Catatan tanpa label</span>
+</p>
+<a class="btn btn-primary lebih-lanjut" href="#">Lebih lanjut</a>
+{attachment}
+</p>
+</div>
+</div>
+</div>
+'''
+
+BLOB_ATTACHMENT = '<a class="download-file-blob" href="#" data-url="/download/tnd/ann.jwebs" data-file-id="{index}abc" data-name="Dokumen {index}.pdf">Attachment</a>'
+DIRECT_ATTACHMENT = '<a href="/download/pelelangan/{index}/Dokumen_{index}.pdf">Attachment</a>'
+
+def build_cards(count):
+    """Build CIVD-shaped tender cards with both attachment styles"""
+    cards = []
+    for index in range(count):
+        attachment = (BLOB_ATTACHMENT if index % 2 == 0 else DIRECT_ATTACHMENT).format(index=index)
+        cards.append(CARD_TEMPLATE.format(title=f'Tender {index}', company=f'K3S {index}', index=index, attachment=attachment))
+    return ''.join(cards)
+
+def build_pagination(total_pages):
+    """Build a bootstrap pagination block like the one under the search results"""
+    links = ''.join(f'<li class="page-item"><a class="page-link" href="#">{page}</a></li>' for page in range(1, total_pages + 1))
+    return f'<ul class="pagination">{links}</ul>'
+
+def inject_cards(html_content, section_id, cards):
+    """Put cards inside the result container of a fixture page"""
+    marker = f'id="{section_id}"'
+    start = html_content.index(marker)
+    close = html_content.index('>', start) + 1
+    return html_content[:close] + cards + html_content[close:]
+
+def load_fixture(name):
+    with open(os.path.join(ROOT_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+def build_cases():
+    """Return (name, html, section_id) cases covering the fixtures and synthetic pages"""
+    cases = []
+    for name, (section_id, _) in FIXTURES.items():
+        html_content = load_fixture(name)
+        cases.append((name, html_content, section_id))
+        cases.append((f"{name} + 10 cards", inject_cards(html_content, section_id, build_cards(10)), section_id))
+        cases.append((f"{name} + 6 cards and pagination", inject_cards(html_content, section_id, build_cards(6) + build_pagination(4)), section_id))
+        cases.append((f"{name} without section id", inject_cards(html_content, section_id, build_cards(3)), None))
+    cases.append(('cards without result container', build_cards(4), 'tnd1Result'))
+    cases.append(('empty response', '', 'tnd1Result'))
+    return cases
+
+def check_equivalence(backends):
+    """Compare every backend against the html.parser reference, return True if all match"""
+    reference = backends[0]
+    all_match = True
+
+    for name, html_content, section_id in build_cases():
+        expected = reference.extract_tender_items(html_content, section_id)
+        expected_pages = reference.parse_page(html_content, section_id).page_numbers()
+        for backend in backends[1:]:
+            actual = backend.extract_tender_items(html_content, section_id)
+            actual_pages = backend.parse_page(html_content, section_id).page_numbers()
+            if actual_pages != expected_pages:
+                all_match = False
+                logger.error(f"[MISMATCH] {name}: {backend.name} pagination {actual_pages} != {expected_pages}")
+            elif actual == expected:
+                logger.info(f"[OK] {name}: {backend.name} matches {reference.name} ({len(expected)} items)")
+            else:
+                all_match = False
+                logger.error(f"[MISMATCH] {name}: {backend.name} differs from {reference.name}")
+                for index, (left, right) in enumerate(zip(expected, actual)):
+                    if left != right:
+                        logger.error(f"First differing item {index}: {left!r} != {right!r}")
+                        break
+                else:
+                    logger.error(f"Item counts differ: {len(expected)} != {len(actual)}")
+
+    return all_match
+
+def check_fixture_cards(backends):
+    """Check that every backend finds the expected cards, with title and attachment, in the fixtures that have cards"""
+    all_found = True
+    for name, (section_id, expected_cards) in FIXTURES.items():
+        if not expected_cards:
+            continue
+        html_content = load_fixture(name)
+        for backend in backends:
+            items = backend.extract_tender_items(html_content, section_id)
+            complete = [item for item in items if item.get('title') and item.get('attachment_id')]
+            if len(items) == expected_cards and len(complete) == expected_cards:
+                logger.info(f"[OK] {name}: {backend.name} found {len(items)} cards")
+            else:
+                all_found = False
+                logger.error(f"[MISMATCH] {name}: {backend.name} found {len(items)} cards "
+                             f"({len(complete)} with title and attachment), expected {expected_cards}")
+    return all_found
+
+def benchmark(backends, card_count=500, rounds=3):
+    """Log cards/sec for each backend on a fixture page with many cards"""
+    section_id = FIXTURES['invitation_section.html'][0]
+    html_content = inject_cards(load_fixture('invitation_section.html'), section_id, build_cards(card_count))
+
+    # Matikan log per halaman agar tidak ikut diukur
+    parser_logger = logging.getLogger('scraper.parsers')
+    previous_level = parser_logger.level
+    parser_logger.setLevel(logging.WARNING)
+
+    try:
+        for backend in backends:
+            best = None
+            for _ in range(rounds):
+                start = time.perf_counter()
+                items = backend.extract_tender_items(html_content, section_id)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            logger.info(f"{backend.name}: {len(items)} cards in {best:.3f}s ({len(items) / best:.0f} cards/sec)")
+    finally:
+        parser_logger.setLevel(previous_level)
+
+def main():
+    """Fungsi utama untuk menguji kesetaraan dan kecepatan backend parser"""
+    logger.info("Starting parser backend test")
+
+    backends = [SoupParser(BASE_URL)]
+    if lxml is not None:
+        backends.append(LxmlParser(BASE_URL))
+    else:
+        logger.warning("lxml is not installed, only the html.parser backend will be tested")
+
+    matched = check_equivalence(backends)
+    matched &= check_fixture_cards(backends)
+    benchmark(backends)
+
+    if matched:
+        logger.info("Parser backend test completed: all backends produce identical tender items")
+    else:
+        logger.error("Parser backend test completed with mismatches")
+    return 0 if matched else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
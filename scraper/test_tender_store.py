@@ -0,0 +1,97 @@
+import csv
+import logging
+import os
+import sys
+import tempfile
+from scraper.tender_store import TenderStore
+from scraper.test_helpers import expect
+
+# Konfigurasi logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+
+logger = logging.getLogger(__name__)
+
+FILE_URL = 'https://civd.skkmigas.go.id/download/tnd/ann.jwebs?fileId={file_id}&fileName=Dokumen.pdf'
+
+# Baris CSV versi lama: tanpa deadline/attachment_id dan company berisi placeholder
+LEGACY_ROWS = [
+    {'title': 'Pekerjaan Survei Seismik 3D', 'company': 'SKK Migas', 'date': '18 Mar 2025',
+     'description': 'Survei seismik', 'attachment_url': FILE_URL.format(file_id='558c18a9'), 'scraped_at': '2025-03-14 10:56:04'},
+    {'title': 'Pengadaan AC HVAC', 'company': 'SKK Migas', 'date': '14 Mar 2025',
+     'description': 'Pengadaan AC', 'attachment_url': '', 'scraped_at': '2025-03-14 10:56:04'},
+]
+
+# Tender yang sama seperti hasil scrape versi baru
+NEW_ITEMS = [
+    {'title': 'Pekerjaan Survei Seismik 3D', 'company': 'PT Pertamina Hulu Energi', 'date': '18 Mar 2025', 'deadline': '2025-03-18',
+     'attachment_id': '558c18a9', 'attachment_url': FILE_URL.format(file_id='558c18a9')},
+    {'title': 'Pengadaan  AC HVAC ', 'company': 'PT Badak NGL', 'date': '14 Mar 2025', 'deadline': '2025-03-14',
+     'attachment_id': None, 'attachment_url': None},
+]
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+
+def check_upsert_counts(tmp_dir):
+    """Upsert returns (inserted, updated) and keeps first_seen of known tenders"""
+    store = TenderStore(os.path.join(tmp_dir, 'counts.db'))
+    items = [{'title': f'Tender {index}', 'deadline': '2025-03-21', 'attachment_id': f'file-{index}'} for index in range(3)]
+
+    ok = expect(store.upsert('pelelangan', items, 'run-1', seen_at='2025-03-01T08:00:00') == (3, 0),
+                "first upsert inserts 3 tenders")
+    # Key yang sama dua kali dalam satu batch dihitung sekali
+    second = items[:2] + [items[1], {'title': 'Tender 3', 'deadline': '2025-03-22', 'attachment_id': 'file-3'}]
+    ok &= expect(store.upsert('pelelangan', second, 'run-2', seen_at='2025-03-02T08:00:00') == (1, 2),
+                 "second upsert inserts 1 and updates 2 tenders")
+    ok &= expect(store.count('pelelangan') == 4 and store.count('prakualifikasi') == 0, "4 tenders stored in one section")
+
+    records = {record['attachment_id']: record for record in store.tenders('pelelangan')}
+    ok &= expect(records['file-0']['first_seen'] == '2025-03-01T08:00:00' and records['file-0']['last_seen'] == '2025-03-02T08:00:00',
+                 "updated tender keeps first_seen and moves last_seen")
+    ok &= expect(records['file-2']['last_run_id'] == 'run-1', "tender missing from run-2 keeps its last run")
+    return ok
+
+def check_legacy_import(tmp_dir):
+    """Tenders imported from old CSV snapshots are matched again by a new scrape"""
+    data_dir = os.path.join(tmp_dir, 'data')
+    os.makedirs(data_dir)
+    write_csv(os.path.join(data_dir, 'pelelangan_umum_20250314_105604.csv'), LEGACY_ROWS)
+    write_csv(os.path.join(data_dir, 'prakualifikasi_20250314_105604.csv'), LEGACY_ROWS[:1])
+    store = TenderStore(os.path.join(data_dir, 'tenders.db'))
+
+    ok = expect(store.import_csv_snapshots(data_dir, {'prakualifikasi': 'prakualifikasi', 'pelelangan': 'pelelangan_umum'}) == 2,
+                "2 CSV snapshots imported")
+    run = store.run('20250314_105604')
+    ok &= expect(run is not None and run['started_at'] == '2025-03-14T10:56:04' and run['finished_at'] == '2025-03-14T10:56:04',
+                 "snapshot recorded as one run with the file timestamp")
+    ok &= expect(run is not None and (run['inserted'], run['updated']) == (3, 0), "run records the inserted count of both files")
+
+    ok &= expect(store.upsert('pelelangan', NEW_ITEMS, 'run-new') == (0, 2), "new scrape updates both imported tenders")
+    records = store.tenders('pelelangan')
+    ok &= expect(len(records) == 2, "no duplicate tenders after the new scrape")
+    ok &= expect(all(record['first_run_id'] == '20250314_105604' for record in records), "tenders keep the legacy run as first run")
+    return ok
+
+def main():
+    """Fungsi utama untuk menguji tender store"""
+    logger.info("Starting tender store test")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        passed = check_upsert_counts(tmp_dir)
+        passed &= check_legacy_import(tmp_dir)
+
+    if passed:
+        logger.info("Tender store test completed: all checks passed")
+    else:
+        logger.error("Tender store test completed with failures")
+    return 0 if passed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
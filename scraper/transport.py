@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from .rate_limiter import RateLimitedSession
+
+logger = logging.getLogger(__name__)
+
+# Status yang boleh di-retry otomatis untuk method idempotent
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+RETRY_METHODS = Retry.DEFAULT_ALLOWED_METHODS
+
+class TransportStats:
+    """Thread-safe counters for requests and new vs. reused connections"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def count_new_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    def snapshot(self):
+        """Return the counters as a dict"""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'new_connections': self.new_connections,
+                'reused_connections': max(0, self.requests - self.new_connections),
+            }
+
+def _counting_pool_class(base, stats):
+    """Create a urllib3 pool class that reports to the given TransportStats"""
+    class CountingConnectionPool(base):
+        def _new_conn(self):
+            stats.count_new_connection()
+            return super()._new_conn()
+
+        def _make_request(self, *args, **kwargs):
+            stats.count_request()
+            return super()._make_request(*args, **kwargs)
+
+    return CountingConnectionPool
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools count new and reused connections"""
+
+    def __init__(self, stats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool_class(HTTPConnectionPool, self.stats),
+            'https': _counting_pool_class(HTTPSConnectionPool, self.stats),
+        }
+
+class TransportSession(RateLimitedSession):
+    """Rate-limited session with pooled adapters, retries and default timeouts.
+
+    Retries happen here, above the rate limiter, instead of inside the
+    urllib3 adapter: every attempt waits for its own token and reports its
+    status, so retried 429/5xx responses also slow the host's bucket down
+    and a Retry-After pause holds back the next attempt.
+    """
+
+    def __init__(self, rate_limiter, timeout=(5, 30), pool_connections=4, pool_maxsize=10,
+                 retries=3, backoff_factor=0.5):
+        super().__init__(rate_limiter)
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backoff_factor = backoff_factor
+        self.stats = TransportStats()
+
+        # Adapter tidak me-retry sendiri, agar setiap percobaan melewati rate limiter
+        adapter = CountingHTTPAdapter(
+            self.stats,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(total=0, read=False, redirect=False, raise_on_status=False),
+        )
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+        # Minta respons terkompresi; requests/urllib3 mendekompresi gzip dan deflate secara otomatis
+        self.headers['Accept-Encoding'] = 'gzip, deflate'
+
+    def request(self, method, url, *args, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+
+        # Retry hanya untuk method idempotent (GET/HEAD/...), POST pencarian hanya diulang jika koneksi gagal dibuka
+        idempotent = method.upper() in RETRY_METHODS
+        attempt = 0
+        while True:
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                retryable = idempotent or isinstance(e, requests.exceptions.ConnectTimeout)
+                if not retryable or attempt >= self.retries:
+                    raise
+                reason = type(e).__name__
+            else:
+                if not idempotent or response.status_code not in RETRY_STATUS_CODES or attempt >= self.retries:
+                    return response
+                reason = f"status {response.status_code}"
+                response.close()
+
+            # Jeda Retry-After sudah ditahan oleh bucket host, di sini hanya backoff eksponensial
+            delay = self.backoff_factor * (2 ** attempt)
+            attempt += 1
+            logger.warning(f"Retrying {method.upper()} {url} after {reason} in {delay:.1f}s (retry {attempt}/{self.retries})")
+            time.sleep(delay)
+
+    def transport_stats(self):
+        """Return request and connection reuse counters"""
+        return self.stats.snapshot()
+
+def build_session(config, rate_limiter):
+    """Build the shared scraper session from the [transport] section of config.ini"""
+    connect_timeout = config.getfloat('transport', 'connect_timeout', fallback=5)
+    read_timeout = config.getfloat('transport', 'read_timeout', fallback=30)
+    pool_maxsize = config.getint('transport', 'pool_maxsize', fallback=10)
+
+    session = TransportSession(
+        rate_limiter,
+        timeout=(connect_timeout, read_timeout),
+        pool_connections=config.getint('transport', 'pool_connections', fallback=4),
+        pool_maxsize=pool_maxsize,
+        retries=config.getint('transport', 'retries', fallback=3),
+        backoff_factor=config.getfloat('transport', 'retry_backoff', fallback=0.5),
+    )
+    logger.info(f"Transport ready: timeout=({connect_timeout}, {read_timeout}), pool_maxsize={pool_maxsize}")
+    return session
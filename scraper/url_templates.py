@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Pola URL download attachment yang pernah dipakai situs CIVD, dalam urutan awal
+# 'original' adalah URL dari card tender apa adanya
+URL_TEMPLATES = (
+    ('original', None),
+    ('prakualifikasi_path', '{base_url}/download/prakualifikasi/{file_id}/{filename}'),
+    ('pelelangan_path', '{base_url}/download/pelelangan/{file_id}/{filename}'),
+    ('ann_named', '{base_url}/download/tnd/ann.jwebs?fileId={file_id}&fileName={filename}'),
+    ('ann', '{base_url}/download/tnd/ann.jwebs?fileId={file_id}'),
+    ('file_id', '{base_url}/download/file?id={file_id}'),
+    ('attachment_id', '{base_url}/download/attachment?id={file_id}'),
+    ('blob_id', '{base_url}/download/blob?id={file_id}'),
+    ('file_blob_id', '{base_url}/download/file/blob?id={file_id}'),
+    ('tender_path', '{base_url}/download/tender/{file_id}/{filename}'),
+    ('pengumuman_path', '{base_url}/download/pengumuman/{file_id}/{filename}'),
+    ('hasil_path', '{base_url}/download/hasil/{file_id}/{filename}'),
+)
+
+class UrlTemplateStats:
+    """Persisted success/failure counts per attachment URL template and category.
+
+    candidates() orders templates by their smoothed success rate, so the
+    template that worked for a category is tried first. Templates that
+    failed skip_after times in a row are left out until retry_after seconds
+    have passed since their last failure.
+    """
+
+    def __init__(self, path, skip_after=5, retry_after=86400):
+        self.path = path
+        self.skip_after = skip_after
+        self.retry_after = retry_after
+        self._stats = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    @classmethod
+    def from_config(cls, config, path):
+        """Build the stats store from the [downloads] section of config.ini"""
+        return cls(
+            path,
+            skip_after=config.getint('downloads', 'template_skip_after', fallback=5),
+            retry_after=config.getint('downloads', 'template_retry_after', fallback=86400),
+        )
+
+    def load(self):
+        """Load template stats saved by earlier runs"""
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._stats = json.load(f).get('categories', {})
+            logger.info(f"Loaded URL template stats from {self.path}")
+        except Exception as e:
+            logger.error(f"Error loading URL template stats {self.path}: {str(e)}")
+            self._stats = {}
+
+    def save(self):
+        """Write the stats atomically"""
+        with self._lock:
+            data = {'updated_at': time.time(), 'categories': self._stats}
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logger.error(f"Error saving URL template stats to {self.path}: {str(e)}")
+
+    def _entry(self, category, name):
+        return self._stats.setdefault(category, {}).setdefault(name, {
+            'success': 0, 'failure': 0, 'consecutive_failures': 0, 'last_success': None, 'last_failure': None,
+        })
+
+    def record(self, category, name, success):
+        """Remember the outcome of one download attempt"""
+        with self._lock:
+            entry = self._entry(category, name)
+            if success:
+                entry['success'] += 1
+                entry['consecutive_failures'] = 0
+                entry['last_success'] = time.time()
+            else:
+                entry['failure'] += 1
+                entry['consecutive_failures'] += 1
+                entry['last_failure'] = time.time()
+
+    def score(self, category, name):
+        """Smoothed success rate of a template, 0.5 when it was never tried"""
+        with self._lock:
+            entry = self._stats.get(category, {}).get(name)
+            if not entry:
+                return 0.5
+            return (entry['success'] + 1) / (entry['success'] + entry['failure'] + 2)
+
+    def is_trusted(self, category, name):
+        """A template that has worked and did not fail since can be fetched without probing"""
+        with self._lock:
+            entry = self._stats.get(category, {}).get(name)
+            return bool(entry and entry['success'] and not entry['consecutive_failures'])
+
+    def _is_skipped(self, category, name, now):
+        entry = self._stats.get(category, {}).get(name)
+        if not entry or entry['consecutive_failures'] < self.skip_after:
+            return False
+        # Setelah retry_after detik template dicoba lagi satu kali
+        return now - (entry['last_failure'] or 0) < self.retry_after
+
+    def candidates(self, category, url, base_url, file_id, filename):
+        """Return (template name, URL) pairs to try, best template first"""
+        now = time.time()
+        candidates = []
+        seen_urls = set()
+        skipped = []
+
+        for index, (name, template) in enumerate(URL_TEMPLATES):
+            if template is None:
+                candidate = url
+            elif file_id:
+                candidate = template.format(base_url=base_url, file_id=file_id, filename=filename)
+            else:
+                continue
+            if not candidate or candidate in seen_urls:
+                continue
+            seen_urls.add(candidate)
+
+            with self._lock:
+                if self._is_skipped(category, name, now):
+                    skipped.append(name)
+                    continue
+            candidates.append((-self.score(category, name), index, name, candidate))
+
+        if skipped:
+            logger.info(f"Skipping URL templates that keep failing for {category}: {', '.join(skipped)}")
+
+        # Urutkan berdasarkan skor, urutan awal sebagai pemecah seri
+        return [(name, candidate) for _, _, name, candidate in sorted(candidates)]
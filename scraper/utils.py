@@ -1,6 +1,5 @@
 import logging
 import os
-import random
 import re
 import csv
 from datetime import datetime
@@ -27,10 +26,6 @@ def setup_logging():
     
     return logger
 
-def random_delay(min_seconds=2, max_seconds=5):
-    """Generate a random delay between min and max seconds"""
-    return random.uniform(min_seconds, max_seconds)
-
 def clean_text(text):
     """Clean text by removing extra whitespace and normalizing"""
     if not text:
@@ -44,6 +39,37 @@ def clean_text(text):
     
     return text
 
+# Nama bulan Indonesia dan Inggris (lengkap dan singkatan) yang dipakai di CIVD
+MONTHS = {
+    'jan': 1, 'januari': 1, 'january': 1,
+    'feb': 2, 'februari': 2, 'february': 2,
+    'mar': 3, 'maret': 3, 'march': 3,
+    'apr': 4, 'april': 4,
+    'mei': 5, 'may': 5,
+    'jun': 6, 'juni': 6, 'june': 6,
+    'jul': 7, 'juli': 7, 'july': 7,
+    'agu': 8, 'agt': 8, 'ags': 8, 'agustus': 8, 'aug': 8, 'august': 8,
+    'sep': 9, 'sept': 9, 'september': 9,
+    'okt': 10, 'oktober': 10, 'oct': 10, 'october': 10,
+    'nov': 11, 'nopember': 11, 'november': 11,
+    'des': 12, 'desember': 12, 'dec': 12, 'december': 12,
+}
+
+def parse_date(text):
+    """Convert a date like '21 Mar 2025' or '5 Agustus 2024' to ISO format (YYYY-MM-DD)"""
+    match = re.search(r'(\d{1,2})\s+([A-Za-z]+)\.?\s+(\d{4})', text or '')
+    if not match:
+        return None
+    
+    month = MONTHS.get(match.group(2).lower())
+    if not month:
+        return None
+    
+    try:
+        return datetime(int(match.group(3)), month, int(match.group(1))).strftime('%Y-%m-%d')
+    except ValueError:
+        return None
+
 def save_to_csv(data, filename, output_dir='data'):
     """Save data to CSV file"""
     if not data:
@@ -2,6 +2,7 @@ from flask import Flask, render_template, request, redirect, url_for, flash, sen
 import pandas as pd
 import os
 import glob
+import configparser
 from datetime import datetime, timedelta
 import json
 import sys
@@ -42,6 +43,10 @@ cache_timestamp = None
 # Import scraper hanya ketika diperlukan, bukan saat startup
 scraper = None
 
+# Data tender dibaca dari store SQLite di data/
+data_dir = os.path.join(project_root, 'data')
+tender_store = None
+
 def get_scraper():
     """Lazy loading untuk scraper - hanya inisialisasi ketika diperlukan"""
     global scraper
@@ -63,8 +68,21 @@ def get_scraper():
             logger.info("Scraper initialized with default config")
     return scraper
 
+def get_tender_store():
+    """Lazy loading untuk store tender SQLite di data/"""
+    global tender_store
+    if tender_store is None:
+        from scraper.tender_store import TenderStore
+        config = configparser.ConfigParser()
+        config.read(os.path.join(project_root, 'config', 'config.ini'))
+        tender_store = TenderStore(os.path.join(data_dir, config.get('output', 'database', fallback='tenders.db').strip()))
+        # Store baru: masukkan dulu file CSV hasil run versi sebelumnya
+        if not tender_store.count():
+            tender_store.import_csv_snapshots(data_dir, {'prakualifikasi': 'prakualifikasi', 'pelelangan': 'pelelangan_umum'})
+    return tender_store
+
 def get_cached_data(force_reload=False):
-    """Get cached data or load from CSV files"""
+    """Get cached data or load it from the tender store"""
     global cached_prakualifikasi_data, cached_pelelangan_data, cache_timestamp
     
     # Jika data sudah di-cache dan tidak dipaksa reload, gunakan cache
@@ -74,63 +92,17 @@ def get_cached_data(force_reload=False):
             logger.info("Using cached data (less than 5 minutes old)")
             return cached_prakualifikasi_data, cached_pelelangan_data
     
-    logger.info("Loading data from CSV files")
-    prakualifikasi_data = []
-    pelelangan_data = []
-    
-    # Cari semua file CSV dan gabungkan datanya
-    for file_type in ['prakualifikasi', 'pelelangan_umum']:
-        pattern = os.path.join(project_root, 'data', f"{file_type}_*.csv")
-        files = sorted(glob.glob(pattern), reverse=True)
-        
-        # Log semua file yang ditemukan
-        logger.info(f"Found {len(files)} {file_type} CSV files: {[os.path.basename(f) for f in files]}")
-        
-        # Ambil maksimal 10 file terbaru untuk menghindari duplikasi data lama
-        files = files[:10] if len(files) > 10 else files
-        
-        combined_data = []
-        unique_identifiers = set()  # Untuk mencegah duplikasi berdasarkan judul saja
-        
-        if files:
-            for file in files:
-                try:
-                    logger.info(f"Processing file: {os.path.basename(file)}")
-                    df = pd.read_csv(file)
-                    # Pastikan kolom yang diperlukan ada
-                    if 'title' not in df.columns:
-                        logger.warning(f"File {file} tidak memiliki kolom 'title', melewati file ini")
-                        continue
-                        
-                    # Tambahkan kolom date jika tidak ada
-                    if 'date' not in df.columns and 'scraped_at' in df.columns:
-                        df['date'] = df['scraped_at']
-                    
-                    records = df.to_dict('records')
-                    logger.info(f"File {os.path.basename(file)} contains {len(records)} records")
-                    
-                    # Tambahkan hanya data yang belum ada (berdasarkan judul saja)
-                    added_from_file = 0
-                    for record in records:
-                        title = record.get('title', '')
-                        
-                        # Gunakan judul sebagai identifier unik
-                        if title and title not in unique_identifiers:
-                            unique_identifiers.add(title)
-                            combined_data.append(record)
-                            added_from_file += 1
-                    
-                    logger.info(f"Added {added_from_file} unique records from {os.path.basename(file)}")
-                            
-                except Exception as e:
-                    logger.error(f"Error loading data from CSV {file}: {str(e)}")
-            
-            logger.info(f"Loaded {len(combined_data)} unique {file_type} items from {len(files)} files")
-            
-            if file_type == 'prakualifikasi':
-                prakualifikasi_data = combined_data
-            else:
-                pelelangan_data = combined_data
+    logger.info("Loading data from the tender store")
+    try:
+        # Setiap tender hanya tersimpan sekali di store, tidak perlu menggabungkan file CSV
+        store = get_tender_store()
+        prakualifikasi_data = store.tenders('prakualifikasi')
+        pelelangan_data = store.tenders('pelelangan')
+        logger.info(f"Loaded {len(prakualifikasi_data)} prakualifikasi and {len(pelelangan_data)} pelelangan tenders from {store.path}")
+    except Exception as e:
+        logger.error(f"Error loading data from tender store: {str(e)}")
+        logger.error(traceback.format_exc())
+        prakualifikasi_data, pelelangan_data = [], []
     
     # Update cache
     cached_prakualifikasi_data = prakualifikasi_data
@@ -323,12 +295,56 @@ def view_file(file_path):
         error_message = f"Error membaca file: {str(e)}"
         return render_template('error.html', error=error_message)
 
+# Kolom terstruktur hasil scraper yang bisa dipakai sebagai filter di /api/data
+FILTER_COLUMNS = ('golongan_usaha', 'jenis_pengadaan', 'company')
+
+def as_list(value):
+    """Read a list column (e.g. bidang_usaha), stored as a list or as the JSON array CsvSink writes"""
+    if isinstance(value, list):
+        return value
+    if not isinstance(value, str) or not value.strip():
+        return []
+    try:
+        parsed = json.loads(value)
+    except ValueError:
+        # Bukan JSON: anggap daftar dipisah ';' seperti yang tampil di card CIVD
+        return [part.strip() for part in value.split(';') if part.strip()]
+    return parsed if isinstance(parsed, list) else []
+
+def filter_tenders(records, args):
+    """Filter tender records on structured columns given as query parameters"""
+    for column in FILTER_COLUMNS:
+        wanted = args.get(column)
+        if wanted:
+            records = [r for r in records if str(r.get(column) or '').lower() == wanted.lower()]
+    
+    bidang_usaha = args.get('bidang_usaha')
+    if bidang_usaha:
+        records = [r for r in records
+                   if any(bidang_usaha.lower() in str(b).lower() for b in as_list(r.get('bidang_usaha')))]
+    
+    # Deadline disimpan dalam format ISO (YYYY-MM-DD) sehingga bisa dibandingkan sebagai string
+    deadline_from = args.get('deadline_from')
+    deadline_to = args.get('deadline_to')
+    if deadline_from or deadline_to:
+        records = [r for r in records if isinstance(r.get('deadline'), str)
+                   and (not deadline_from or r['deadline'] >= deadline_from)
+                   and (not deadline_to or r['deadline'] <= deadline_to)]
+    
+    return records
+
 @app.route('/api/data')
 def api_data():
-    """API endpoint untuk mendapatkan data tender terbaru"""
+    """API endpoint untuk mendapatkan data tender terbaru.
+
+    Optional filters: golongan_usaha, jenis_pengadaan, company (exact match),
+    bidang_usaha (substring of any entry), deadline_from / deadline_to (YYYY-MM-DD).
+    """
     file_type = request.args.get('type', 'all')
     
     prakualifikasi_data, pelelangan_data = get_cached_data()
+    prakualifikasi_data = filter_tenders(prakualifikasi_data, request.args)
+    pelelangan_data = filter_tenders(pelelangan_data, request.args)
     
     if file_type == 'all':
         return jsonify({
@@ -347,6 +363,29 @@ def dashboard():
     """Dashboard untuk visualisasi data tender"""
     return render_template('dashboard.html', is_refreshing=is_refreshing, last_refresh_time=last_refresh_time)
 
+# Attachment disimpan berbasis hash isi file; nama asli dicatat di manifest
+attachment_store = None
+
+def get_attachment_store():
+    """Lazy loading untuk store attachment di data/attachments"""
+    global attachment_store
+    if attachment_store is None:
+        from scraper.attachment_store import AttachmentStore
+        attachment_store = AttachmentStore(os.path.join(data_dir, 'attachments'))
+    else:
+        # Manifest bisa diperbarui oleh proses scraper terjadwal
+        attachment_store.load()
+    return attachment_store
+
+def send_stored_attachment(file_path, download_name):
+    """Kirim file attachment dari store dengan nama aslinya"""
+    return send_file(
+        file_path,
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=download_name
+    )
+
 @app.route('/download/<path:filename>')
 def download_pdf(filename):
     """Download PDF file"""
@@ -362,26 +401,13 @@ def download_pdf(filename):
         # Log informasi untuk debugging
         logger.info(f"Attempting to download PDF: {decoded_file_name}, category: {category}, file_id: {file_id}, file_name: {file_name}")
         
-        # Coba cari file di kedua direktori attachments
-        for possible_category in ['prakualifikasi', 'pelelangan']:
-            if category and possible_category != category:
-                continue  # Skip jika kategori tidak cocok
-                
-            attachments_dir = os.path.join(project_root, 'data', 'attachments', possible_category)
-            if os.path.exists(attachments_dir):
-                # Cari file dengan nama yang mirip
-                for file in os.listdir(attachments_dir):
-                    if decoded_file_name.replace(' ', '_') in file:
-                        file_path = os.path.join(attachments_dir, file)
-                        logger.info(f"Found existing PDF file: {file_path}")
-                        
-                        # Kirim file ke client
-                        return send_file(
-                            file_path,
-                            mimetype='application/pdf',
-                            as_attachment=True,
-                            download_name=decoded_file_name
-                        )
+        # Cari file di manifest attachment (berdasarkan file_id atau nama file)
+        store = get_attachment_store()
+        entry = store.find(name=file_name or decoded_file_name, file_id=file_id, category=category)
+        if entry:
+            file_path = store.path(entry)
+            logger.info(f"Found stored attachment: {file_path}")
+            return send_stored_attachment(file_path, entry['name'])
         
         # Jika file tidak ditemukan, coba download dengan scraper
         scraper_instance = get_scraper()
@@ -392,22 +418,11 @@ def download_pdf(filename):
         for possible_category in ['prakualifikasi', 'pelelangan']:
             if category and possible_category != category:
                 continue  # Skip jika kategori tidak cocok
-                
-            if scraper_instance.download_attachment(filename, project_root, possible_category):
-                # Cek lagi apakah file sudah ada di direktori attachments
-                attachments_dir = os.path.join(project_root, 'data', 'attachments', possible_category)
-                for file in os.listdir(attachments_dir):
-                    if decoded_file_name.replace(' ', '_') in file:
-                        file_path = os.path.join(attachments_dir, file)
-                        logger.info(f"Found PDF file after download: {file_path}")
-                        
-                        # Kirim file ke client
-                        return send_file(
-                            file_path,
-                            mimetype='application/pdf',
-                            as_attachment=True,
-                            download_name=decoded_file_name
-                        )
+            
+            file_path = scraper_instance.download_attachment(filename, data_dir, possible_category)
+            if file_path:
+                logger.info(f"Found PDF file after download: {file_path}")
+                return send_stored_attachment(file_path, decoded_file_name)
         
         # Jika semua metode gagal, tanyakan kepada pengguna apakah ingin mencoba dengan Selenium
         return render_template('download_failed.html', 
@@ -444,7 +459,7 @@ def download_with_selenium(filename):
             # Jalankan Selenium di thread terpisah untuk tidak memblokir aplikasi
             def selenium_download_thread():
                 try:
-                    scraper_instance.download_attachment_with_selenium(selenium_url, project_root, category, decoded_file_name)
+                    scraper_instance.download_attachment_with_selenium(selenium_url, data_dir, category, decoded_file_name)
                     logger.info("Selenium download completed")
                 except Exception as e:
                     logger.error(f"Error in Selenium download: {str(e)}")